@@ -0,0 +1,135 @@
+"""
+Listing of zip and tar archives by ``list_archive``, against ``zipfile`` and
+``tarfile`` loading every member, and the same archives listed by an
+``ArchiveInspector`` process pool against one after the other.
+
+Uso:
+    python benchmarks/bench_archives.py [--archives 8] [--members 100000] [--repeat 3] [--dir /tmp/pastro-bench]
+
+The archives hold members of a few bytes each: zip files hold photos and
+gzip-compressed tar files documents, with a few other files mixed in. Times
+are the fastest of `--repeat` runs; memory is the peak traced by tracemalloc
+in a separate run, so it is only measured in this process.
+"""
+
+import argparse
+import io
+import os
+import shutil
+import sys
+import tarfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from pastro.core.archives import ArchiveInspector, list_archive  # noqa: E402
+from pastro.core.classifier import AutoClassifier  # noqa: E402
+from pastro.core.filetable import FileTable  # noqa: E402
+
+
+def member_names(members: int, extension: str) -> List[str]:
+    """Names in a few folders, one in ten of them not of `extension`."""
+    return [
+        f"pasta-{number % 16}/arquivo-{number:07d}{'.txt' if number % 10 == 9 else extension}"
+        for number in range(members)
+    ]
+
+
+def write_archives(folder: Path, count: int, members: int) -> List[Path]:
+    photos, documents = member_names(members, ".jpg"), member_names(members, ".pdf")
+    paths = []
+    for number in range(count):
+        names = documents if number % 2 else photos
+        if number % 2:
+            path = folder / f"pacote-{number}.tar.gz"
+            with tarfile.open(path, "w:gz", compresslevel=1) as archive:
+                for name in names:
+                    info = tarfile.TarInfo(name)
+                    info.size = 16
+                    archive.addfile(info, io.BytesIO(b"0123456789abcdef"))
+        else:
+            path = folder / f"pacote-{number}.zip"
+            with zipfile.ZipFile(path, "w") as archive:
+                for name in names:
+                    archive.writestr(name, b"0123456789abcdef")
+        paths.append(path)
+    return paths
+
+
+def load_all(path: Path) -> int:
+    """Members of an archive as the standard library keeps them."""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            return len(archive.infolist())
+    with tarfile.open(path) as archive:
+        return len(archive.getmembers())
+
+
+def measure(function: Callable[[], object], repeat: int):
+    """Fastest time of `function`, and its peak memory (MiB)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 2 ** 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--archives", type=int, default=8)
+    parser.add_argument("--members", type=int, default=100_000)
+    parser.add_argument("--max-members", type=int, default=10_000, help="limite de membros listados por arquivo")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", type=Path, default=Path("pastro-bench-compactados"))
+    args = parser.parse_args()
+
+    folder = args.dir.resolve()
+    folder.mkdir(parents=True, exist_ok=True)
+    try:
+        paths = write_archives(folder, args.archives, args.members)
+        print(f"{len(paths)} arquivos com {args.members} membros cada")
+        print(f"{'arquivo':>22} | {'biblioteca':>19} | {'list_archive':>19} | {'sem limite':>19}")
+        for path in paths[:2]:
+            cells = []
+            for function in (
+                lambda: load_all(path),
+                lambda: list_archive(path, args.max_members),
+                lambda: list_archive(path, args.members + 1),
+            ):
+                seconds, peak = measure(function, args.repeat)
+                cells.append(f"{seconds:6.2f}s {peak:7.1f} MiB")
+            print(f"{path.name:>22} | {cells[0]:>19} | {cells[1]:>19} | {cells[2]:>19}")
+
+        classifier = AutoClassifier()
+        classifier.load_default_categories()
+        classify = classifier.get_category_for_name
+        started = time.perf_counter()
+        serial = [list_archive(path, args.max_members) for path in paths]
+        serial_seconds = time.perf_counter() - started
+
+        table = FileTable(classifier.categories)
+        for path in paths:
+            table.add_path(path, "Compactados")
+        started = time.perf_counter()
+        with ArchiveInspector(max_members=args.max_members) as inspector:
+            changed = inspector.reclassify_table(table, classify)
+        pool_seconds = time.perf_counter() - started
+        dominant = sorted({str(listing.dominant(classify)) for listing in serial if listing is not None})
+        print(f"em sequência: {serial_seconds:.2f}s; no pool de processos ({os.cpu_count()} CPUs): "
+              f"{pool_seconds:.2f}s; {changed} reclassificado(s), para {', '.join(dominant)}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Asynchronous organizer on a simulated network mount: a synthetic tree in a
+local folder, behind a ``LatencyFileSystem`` that delays every call, organized
+with growing concurrency.
+
+Uso:
+    python benchmarks/bench_async.py [--files 2000] [--latency 0.002] [--concurrency 1,8,32,128]
+
+Concurrency 1 makes one call at a time, like the synchronous core. Each run
+gets a fresh copy of the tree, generated from the same seed. Content sniffing
+reads the files directly, without the added latency.
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from synthetic_tree import TreeSpec, generate_tree  # noqa: E402
+
+from pastro.core.aio import AsyncOrganizer, LatencyFileSystem  # noqa: E402
+from pastro.core.classifier import AutoClassifier  # noqa: E402
+
+PHASES = ("scan", "classify", "plan", "apply")
+
+
+async def organize(organizer: AsyncOrganizer, root: Path) -> Dict[str, float]:
+    """Seconds spent in each step of `AsyncOrganizer.organize`."""
+    seconds: Dict[str, float] = {}
+    start = time.perf_counter()
+    table = await organizer.scan(root)
+    seconds["scan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await organizer.classify(table)
+    seconds["classify"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    plan = await organizer.plan(table.classification(), root)
+    seconds["plan"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = await organizer.apply(plan)
+    seconds["apply"] = time.perf_counter() - start
+    if report.failures:
+        raise SystemExit(f"{len(report.failures)} movimentações falharam")
+    return seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=3)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.002, help="segundos por chamada ao sistema de arquivos")
+    parser.add_argument("--concurrency", default="1,8,32,128", help="níveis de concorrência, separados por vírgula")
+    parser.add_argument("--dir", type=Path, help="onde gerar as árvores (padrão: pasta temporária do sistema)")
+    args = parser.parse_args()
+
+    levels: List[int] = [int(level) for level in args.concurrency.split(",")]
+    spec = TreeSpec(args.files, args.depth, args.fanout, max_size=4096)
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+    fs = LatencyFileSystem(args.latency)
+
+    print(f"{args.files} arquivos, latência de {args.latency * 1000:g} ms por chamada")
+    print(f"{'concorrência':>12} | " + " | ".join(f"{phase:>10}" for phase in PHASES) + " |      total")
+    for level in levels:
+        with tempfile.TemporaryDirectory(prefix="pastro-bench-", dir=args.dir) as folder:
+            root = Path(folder) / "arvore"
+            generate_tree(root, spec)
+            with AsyncOrganizer(classifier, level, fs, max_depth=None) as organizer:
+                seconds = asyncio.run(organize(organizer, root))
+        cells = [f"{seconds[phase]:9.2f}s" for phase in PHASES]
+        print(f"{level:>12} | " + " | ".join(cells) + f" | {sum(seconds.values()):9.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark of the compiled rules in ``src/auto_classifier.py`` against the
+original category-by-category implementation. The original, and the check
+that both agree, are in ``tests/test_auto_classifier.py``.
+
+Uso:
+    python benchmarks/bench_auto_classifier.py [--files 200000] [--seed 42]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tests"))
+
+from auto_classifier import AutoClassifier  # noqa: E402
+from test_auto_classifier import generate_names, reference_classify, rule_sets  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    paths = [Path(name) for name in generate_names(args.files, args.seed)]
+    classifier = AutoClassifier()
+
+    for label, categories in rule_sets().items():
+        classifier.categories = categories
+        classifier.compile_rules()
+
+        start = time.perf_counter()
+        for path in paths:
+            reference_classify(categories, path)
+        reference = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for path in paths:
+            classifier.classify_file(path)
+        compiled = time.perf_counter() - start
+
+        print(f"[{label}] {len(paths)} arquivos | original {reference:.3f}s | "
+              f"compilado {compiled:.3f}s | {reference / compiled:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
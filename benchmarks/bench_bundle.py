@@ -0,0 +1,137 @@
+"""
+Bundle size and time-to-window of each packaging profile, on Linux.
+
+Uso:
+    python benchmarks/bench_bundle.py [--profiles fonte onefile onedir] [--runs 5] [--no-build]
+
+Each profile is built with PyInstaller from its spec at the repo root
+(``fonte`` runs ``src/main.py`` and builds nothing) into ``--build-dir``, then
+launched `--runs` times with ``PASTRO_STARTUP_PROBE`` set: the time to window
+goes from the launch to the line the app prints once the main window is
+drawn. The app is closed right after. Runs use the ``offscreen`` Qt platform
+unless ``--display`` is given, and an empty configuration, so no journal or
+saved folder changes the startup. With ``--drop-caches`` (root only) the page
+cache is dropped before every run, for cold starts.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from main import STARTUP_PROBE_LINE  # noqa: E402
+
+# Spec of each built profile
+SPECS: Dict[str, str] = {
+    "onefile": "folder_organizer.spec",
+    "onedir": "folder_organizer_onedir.spec",
+}
+PROFILES = ("fonte",) + tuple(SPECS)
+
+
+def build(profile: str, build_dir: Path) -> None:
+    """Build a profile into `build_dir/<profile>`."""
+    target = build_dir / profile
+    subprocess.run(
+        [sys.executable, "-m", "PyInstaller", "--noconfirm", "--clean", "--log-level", "WARN",
+         "--distpath", str(target / "dist"), "--workpath", str(target / "build"), SPECS[profile]],
+        cwd=ROOT, check=True,
+    )
+
+
+def bundle(profile: str, build_dir: Path) -> Optional[Path]:
+    """What a profile ships: the executable, or its folder; None for the sources."""
+    if profile == "fonte":
+        return None
+    return build_dir / profile / "dist" / "FolderOrganizer"
+
+
+def command(profile: str, build_dir: Path) -> List[str]:
+    shipped = bundle(profile, build_dir)
+    if shipped is None:
+        return [sys.executable, str(ROOT / "src" / "main.py")]
+    return [str(shipped / "FolderOrganizer" if shipped.is_dir() else shipped)]
+
+
+def size_of(path: Path) -> int:
+    if path.is_file():
+        return path.stat().st_size
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file() and not file.is_symlink())
+
+
+def drop_caches() -> None:
+    os.sync()
+    with open("/proc/sys/vm/drop_caches", "w") as caches:
+        caches.write("3\n")
+
+
+def time_to_window(argv: List[str], env: Dict[str, str], timeout: float) -> float:
+    """Seconds from the launch to the window being drawn."""
+    started = time.perf_counter()
+    process = subprocess.Popen(argv, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        deadline = started + timeout
+        for line in process.stdout:
+            if line.strip() == STARTUP_PROBE_LINE:
+                return time.perf_counter() - started
+            if time.perf_counter() > deadline:
+                break
+        raise RuntimeError(f"{argv[0]} não abriu a janela (código {process.poll()})")
+    finally:
+        # The onefile bootloader passes the signal on and removes its temp dir
+        process.terminate()
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=list(PROFILES))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--build-dir", type=Path, default=Path("pastro-bench-bundle"))
+    parser.add_argument("--no-build", action="store_true", help="usar os pacotes já gerados em --build-dir")
+    parser.add_argument("--display", action="store_true", help="abrir a janela na tela em vez de offscreen")
+    parser.add_argument("--drop-caches", action="store_true", help="esvaziar o cache de páginas antes de cada execução")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    if not sys.platform.startswith("linux"):
+        parser.error("a medição só roda no Linux")
+    build_dir = args.build_dir.resolve()
+
+    settings = Path(tempfile.mkdtemp(prefix="pastro-bench-config-"))
+    env = dict(os.environ, PASTRO_STARTUP_PROBE="1", XDG_CONFIG_HOME=str(settings), XDG_CACHE_HOME=str(settings))
+    if not args.display:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    try:
+        print(f"{'perfil':>8} | {'tamanho':>10} | {'1ª execução':>11} | {'mediana':>8} | {'mínima':>8}")
+        for profile in args.profiles:
+            if profile in SPECS and not args.no_build:
+                build(profile, build_dir)
+            shipped = bundle(profile, build_dir)
+            argv = command(profile, build_dir)
+            times = []
+            for _ in range(args.runs):
+                if args.drop_caches:
+                    drop_caches()
+                times.append(time_to_window(argv, env, args.timeout))
+            size = "-" if shipped is None else f"{size_of(shipped) / 2 ** 20:7.1f} MiB"
+            print(f"{profile:>8} | {size:>10} | {times[0]:10.2f}s | {statistics.median(times):7.2f}s | "
+                  f"{min(times):7.2f}s")
+    finally:
+        shutil.rmtree(settings, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Micro-benchmark: linear category scan versus the extension index of
+``pastro.core.classifier.AutoClassifier``.
+
+Uso:
+    python benchmarks/bench_classifier.py [--sizes 10000 100000 1000000] [--categories 60]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pastro.core.classifier import AutoClassifier  # noqa: E402
+
+
+def linear_classify(classifier: AutoClassifier, files: List[Path]) -> Dict[str, List[Path]]:
+    """Reference implementation: one linear scan over the categories per file."""
+    classification: Dict[str, List[Path]] = {category: [] for category in classifier.categories}
+    for file_path in files:
+        extension = file_path.suffix.lower()
+        for category, extensions in classifier.categories.items():
+            if extension in extensions:
+                break
+        else:
+            category = "Outros"
+        classification[category].append(file_path)
+    return classification
+
+
+def build_classifier(extra_categories: int) -> AutoClassifier:
+    """Default categories plus `extra_categories` synthetic ones."""
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+    for number in range(extra_categories):
+        classifier.add_category(f"Custom{number}", [f".c{number}a", f".c{number}b", f"c{number}c"])
+    return classifier
+
+
+def generate_names(count: int, classifier: AutoClassifier, seed: int = 42) -> List[str]:
+    """Reproducible file names; ~10% have unknown extensions."""
+    rng = random.Random(seed)
+    extensions = sorted({ext for exts in classifier.categories.values() for ext in exts})
+    extensions += [".unknown", ".bak", ""]
+    return [f"file_{number}{rng.choice(extensions)}" for number in range(count)]
+
+
+def timed(function, *args) -> float:
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--categories", type=int, default=60, help="categorias extras")
+    args = parser.parse_args()
+
+    classifier = build_classifier(args.categories)
+    print(f"{'arquivos':>10} {'linear':>10} {'indexado':>10} {'nomes':>10} {'ganho':>8}")
+    for size in args.sizes:
+        names = generate_names(size, classifier)
+        paths = [Path(name) for name in names]
+
+        expected = linear_classify(classifier, paths)
+        if classifier.classify_files(paths) != expected:
+            raise SystemExit("classify_files diverge da varredura linear")
+
+        linear = timed(linear_classify, classifier, paths)
+        indexed = timed(classifier.classify_files, paths)
+        by_name = timed(classifier.classify_names, names)
+        print(f"{size:>10} {linear:>9.3f}s {indexed:>9.3f}s {by_name:>9.3f}s {linear / by_name:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
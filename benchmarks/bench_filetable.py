@@ -0,0 +1,107 @@
+"""
+Memory of a scan held as lists of ``Path`` objects by category, against the
+columnar ``FileTable``, for the classification and for the plan built from it.
+
+Uso:
+    python benchmarks/bench_filetable.py [--files 1000000] [--depth 4] [--fanout 4]
+
+Nothing is written to disk: the paths come from the plan of a synthetic tree
+(``synthetic_tree.plan_tree``). Names reach both representations as new
+strings, as they do from ``os.scandir``, and memory is what tracemalloc sees
+allocated and still alive after each step. Times include the tracemalloc
+overhead, so only compare them with each other.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from synthetic_tree import TreeSpec, plan_tree  # noqa: E402
+
+from pastro.core.classifier import AutoClassifier  # noqa: E402
+from pastro.core.filetable import FileTable  # noqa: E402
+from pastro.core.planner import plan_targets  # noqa: E402
+
+# (folder, encoded name, size) of each file
+Files = List[Tuple[str, bytes, int]]
+
+
+def build_paths(files: Files, classify: Callable[[str], str]) -> Dict[str, List[Path]]:
+    """The classification as the window built it before the table."""
+    classification: Dict[str, List[Path]] = {}
+    for folder, raw_name, _ in files:
+        name = raw_name.decode()
+        classification.setdefault(classify(name), []).append(Path(os.path.join(folder, name)))
+    return classification
+
+
+def build_table(files: Files, classify: Callable[[str], str]) -> FileTable:
+    table = FileTable()
+    for folder, raw_name, size in files:
+        name = raw_name.decode()
+        table.add(folder, name, classify(name), size, 0)
+    return table
+
+
+def measure(function: Callable):
+    """Result of `function`, the memory it left allocated and its peak, and its time."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, seconds
+
+
+def report(label: str, files: int, current: int, peak: int, seconds: float) -> None:
+    print(f"{label:34} {current / 2 ** 20:9.1f} MiB {current / files:8.0f} B/arquivo "
+          f"(pico {peak / 2 ** 20:7.1f} MiB) {seconds:7.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=TreeSpec._field_defaults["seed"])
+    args = parser.parse_args()
+
+    spec = TreeSpec(args.files, args.depth, args.fanout, seed=args.seed)
+    root = Path(os.path.abspath("pastro-bench-arvore"))
+    _, planned = plan_tree(root, spec)
+    files: Files = [(str(path.parent), path.name.encode(), size) for path, size, _ in planned]
+    del planned
+    target = root / "destino-inexistente"
+
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+    classify = classifier.get_category_for_name
+    count = len(files)
+    print(f"{count} arquivos")
+
+    classification, *measured = measure(lambda: build_paths(files, classify))
+    report("listas de Path", count, *measured)
+    plan, *measured = measure(lambda: plan_targets(classification, target))
+    report("  + plano", count, *measured)
+    del classification, plan
+
+    table, *measured = measure(lambda: build_table(files, classify))
+    report("FileTable", count, *measured)
+    groups, *measured = measure(table.classification)
+    report("  + índices por categoria", count, *measured)
+    plan, *measured = measure(lambda: plan_targets(groups, target))
+    report("  + plano", count, *measured)
+
+
+if __name__ == "__main__":
+    main()
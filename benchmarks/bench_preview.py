@@ -0,0 +1,129 @@
+"""
+Benchmark: open ``PreviewDialog`` for synthetic entries and record
+time-to-first-paint and memory (RSS).
+
+Uso:
+    python benchmarks/bench_preview.py [--files 1000000] [--categories 10] [--legacy]
+
+Runs with the offscreen Qt platform unless QT_QPA_PLATFORM is already set.
+`--legacy` builds the old QTreeWidget (one item per file, expandAll) for comparison.
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEvent, QObject  # noqa: E402
+from PyQt6.QtWidgets import QApplication, QTreeWidget, QTreeWidgetItem  # noqa: E402
+
+from pastro.core.planner import plan_targets  # noqa: E402
+from pastro.gui.dialogs import PreviewDialog  # noqa: E402
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (Linux)."""
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+def synthetic_classification(files: int, categories: int) -> Dict[str, List[Path]]:
+    root = Path("/synthetic/inbox")
+    classification: Dict[str, List[Path]] = {f"Categoria{number}": [] for number in range(categories)}
+    names = list(classification)
+    for number in range(files):
+        classification[names[number % categories]].append(root / f"arquivo_{number:07d}.dat")
+    return classification
+
+
+class FirstPaint(QObject):
+    """Records when a widget is painted for the first time."""
+
+    def __init__(self):
+        super().__init__()
+        self.painted_at = None
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def legacy_tree(classification: Dict[str, List[Path]]) -> QTreeWidget:
+    """The previous PreviewDialog tree, one item per file."""
+    tree = QTreeWidget()
+    tree.setHeaderLabels(["Categoria", "Arquivos"])
+    for category, files in classification.items():
+        if files:
+            category_item = QTreeWidgetItem(tree)
+            category_item.setText(0, category)
+            category_item.setText(1, f"{len(files)} arquivo(s)")
+            for file_path in files:
+                file_item = QTreeWidgetItem(category_item)
+                file_item.setText(0, file_path.name)
+                file_item.setText(1, str(file_path.parent))
+    tree.expandAll()
+    tree.resizeColumnToContents(0)
+    tree.resizeColumnToContents(1)
+    return tree
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--legacy", action="store_true", help="mede a árvore antiga (QTreeWidget)")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    rss_start = rss_mb()
+    classification = synthetic_classification(args.files, args.categories)
+    rss_data = rss_mb()
+
+    planning = 0.0
+    if not args.legacy:
+        # The target does not exist, so no folder is listed: this is the cost of the plan itself
+        start = time.perf_counter()
+        plan = plan_targets(classification, Path("/synthetic/organized"), case_insensitive=False)
+        planning = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if args.legacy:
+        widget = legacy_tree(classification)
+        view = widget
+    else:
+        widget = PreviewDialog(plan)
+        view = widget.tree
+    probe = FirstPaint()
+    view.viewport().installEventFilter(probe)
+    widget.show()
+    while probe.painted_at is None:
+        app.processEvents()
+    first_paint = probe.painted_at - start
+
+    # Expanding a category only loads the first batch of its files
+    start = time.perf_counter()
+    view.expand(view.model().index(0, 0))
+    app.processEvents()
+    expand = time.perf_counter() - start
+
+    print(f"arquivos:              {args.files}")
+    print(f"modo:                  {'legado (QTreeWidget)' if args.legacy else 'modelo virtual'}")
+    if not args.legacy:
+        print(f"planejamento:          {planning:.3f}s")
+    print(f"primeira pintura:      {first_paint:.3f}s")
+    print(f"expandir categoria:    {expand:.3f}s")
+    print(f"RSS dados sintéticos:  {rss_data - rss_start:.0f} MB")
+    print(f"RSS da prévia:         {rss_mb() - rss_data:.0f} MB")
+    print(f"RSS total:             {rss_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
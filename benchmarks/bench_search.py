@@ -0,0 +1,90 @@
+"""
+Filter queries on the ``SearchIndex`` of a synthetic tree, against a linear
+scan of the lowercased names, with the time to build the index as a scan
+would: in batches, while the table grows.
+
+Uso:
+    python benchmarks/bench_search.py [--files 1000000] [--batch 10000] [--repeat 5]
+
+Nothing is written to disk: the names come from the plan of a synthetic tree
+(``synthetic_tree.plan_tree``). Each query is timed as the fastest of
+`--repeat` runs.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from synthetic_tree import TreeSpec, plan_tree  # noqa: E402
+
+from pastro.core.classifier import AutoClassifier  # noqa: E402
+from pastro.core.search import SearchIndex  # noqa: E402
+
+QUERIES = (
+    "foto", "img_00012", "relatorio-000999", "*.pdf", "screenshot*7.png", "ext:mp4", "cat:vídeos >32KB", "x", "zzz",
+)
+
+
+def fastest(function: Callable, repeat: int):
+    """Result of `function` and its fastest time, in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, best * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=1_000_000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=10_000, help="linhas indexadas por vez, como na varredura")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    spec = TreeSpec(args.files, args.depth, args.fanout)
+    root = Path(os.path.abspath("pastro-bench-arvore"))
+    _, planned = plan_tree(root, spec)
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+    classify = classifier.get_category_for_name
+
+    index = SearchIndex()
+    table = index.table
+    index_seconds = 0.0
+    for start in range(0, len(planned), args.batch):
+        for path, size, _ in planned[start:start + args.batch]:
+            name = path.name
+            table.add(str(path.parent), name, classify(name), size)
+        started = time.perf_counter()
+        index.update()
+        index_seconds += time.perf_counter() - started
+    # Posting arrays and the names that differ once lowercased; the table is not counted
+    memory = sum(sys.getsizeof(posting) for posting in index._grams.values()) + sys.getsizeof(index._grams)
+    memory += sum(sys.getsizeof(folded) for folded, name in zip(index._folded, table.names) if folded is not name)
+    print(f"{len(index)} arquivos indexados em {index_seconds:.1f} s; índice com {memory / 2 ** 20:.0f} MiB "
+          f"({memory / len(index):.0f} B/arquivo)")
+
+    lowered: List[str] = [name.lower() for name in table.names]
+    print(f"{'consulta':>18} | {'resultados':>10} | {'índice':>10} | {'varredura':>10}")
+    for text in QUERIES:
+        rows, indexed = fastest(lambda: index.query(text), args.repeat)
+        needle = text.split()[0]
+        if needle.startswith(("ext:", "cat:")) or "*" in needle:
+            scan = "-"
+        else:
+            _, scanned = fastest(lambda: [row for row, name in enumerate(lowered) if needle in name], args.repeat)
+            scan = f"{scanned:8.1f}ms"
+        print(f"{text:>18} | {len(rows):>10} | {indexed:8.1f}ms | {scan:>10}")
+
+
+if __name__ == "__main__":
+    main()
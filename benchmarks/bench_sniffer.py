@@ -0,0 +1,135 @@
+"""
+Correctness check and benchmark of the content sniffer in ``pastro.core.sniffer``:
+bytes read and latency per 10k extensionless files.
+
+Uso:
+    python benchmarks/bench_sniffer.py [--files 10000] [--size 65536] [--workers 1 8 32]
+"""
+
+import argparse
+import gzip
+import io
+import os
+import random
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from pastro.core.sniffer import ContentSniffer  # noqa: E402
+
+
+def _zip(members: List[Tuple[str, bytes]], stored_first: bool = False) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for number, (name, data) in enumerate(members):
+            compression = zipfile.ZIP_STORED if stored_first and number == 0 else zipfile.ZIP_DEFLATED
+            archive.writestr(name, data, compress_type=compression)
+    return buffer.getvalue()
+
+
+def _tar() -> bytes:
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w", format=tarfile.USTAR_FORMAT) as archive:
+        data = b"conteudo"
+        info = tarfile.TarInfo("notas.txt")
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def samples() -> Dict[str, Tuple[bytes, Optional[str]]]:
+    """Headers of each format with the extension the sniffer must give them."""
+    odf = "application/vnd.oasis.opendocument.spreadsheet".encode()
+    return {
+        "jpg": (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00", ".jpg"),
+        "png": (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", ".png"),
+        "gif": (b"GIF89a\x01\x00\x01\x00", ".gif"),
+        "webp": (b"RIFF\x24\x00\x00\x00WEBPVP8 ", ".webp"),
+        "svg": (b'<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg">', ".svg"),
+        "pdf": (b"%PDF-1.7\n", ".pdf"),
+        "rtf": (b"{\\rtf1\\ansi", ".rtf"),
+        "doc": (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1\x00\x00", ".doc"),
+        "docx": (_zip([("[Content_Types].xml", b"<Types/>"), ("word/document.xml", b"<w/>")]), ".docx"),
+        "xlsx": (_zip([("[Content_Types].xml", b"<Types/>"), ("xl/workbook.xml", b"<x/>")]), ".xlsx"),
+        "ods": (_zip([("mimetype", odf), ("content.xml", b"<c/>")], stored_first=True), ".ods"),
+        "zip": (_zip([("fotos/a.jpg", b"\xff\xd8\xff")]), ".zip"),
+        "mp4": (b"\x00\x00\x00\x18ftypisom\x00\x00\x02\x00", ".mp4"),
+        "mov": (b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00", ".mov"),
+        "m4a": (b"\x00\x00\x00\x1cftypM4A \x00\x00\x00\x00", ".m4a"),
+        "mkv": (b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81", ".mkv"),
+        "wav": (b"RIFF\x24\x08\x00\x00WAVEfmt ", ".wav"),
+        "mp3": (b"ID3\x04\x00\x00\x00\x00\x00\x00", ".mp3"),
+        "ogg": (b"OggS\x00\x02\x00\x00", ".ogg"),
+        "rar": (b"Rar!\x1a\x07\x01\x00", ".rar"),
+        "7z": (b"7z\xbc\xaf\x27\x1c\x00\x04", ".7z"),
+        "gz": (gzip.compress(b"conteudo"), ".gz"),
+        "tar": (_tar(), ".tar"),
+        "exe": (b"MZ\x90\x00\x03\x00\x00\x00", ".exe"),
+        "sh": (b"#!/bin/sh\necho ok\n", ".sh"),
+        "py": (b"#!/usr/bin/env python3\nprint('ok')\n", ".py"),
+        "html": (b"<!DOCTYPE html>\n<html><body></body></html>", ".html"),
+        "desconhecido": (b"\x00\x01\x02\x03dados", None),
+    }
+
+
+def create_files(folder: Path, count: int, size: int, seed: int) -> List[Tuple[Path, Optional[str]]]:
+    """Extensionless files: a format header padded with random bytes up to `size`."""
+    rng = random.Random(seed)
+    padding = os.urandom(size)
+    kinds = list(samples().values())
+    files = []
+    for number in range(count):
+        header, expected = rng.choice(kinds)
+        path = folder / f"arquivo{number:06d}"
+        path.write_bytes(header + padding[:max(size - len(header), 0)])
+        files.append((path, expected))
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--size", type=int, default=64 * 1024, help="tamanho de cada arquivo")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="pastro-sniff-") as temporary:
+        files = create_files(Path(temporary), args.files, args.size, args.seed)
+        paths = [path for path, _ in files]
+        expected = dict(files)
+        scale = 10_000 / len(files)
+
+        # Reading whole files, the way a naive detector would
+        start = time.perf_counter()
+        whole = sum(len(path.read_bytes()) for path in paths)
+        elapsed = time.perf_counter() - start
+        print(f"arquivo inteiro        | {whole * scale / 2 ** 20:9.1f} MiB lidos | "
+              f"{elapsed * scale * 1000:8.1f} ms por 10k arquivos")
+
+        for workers in args.workers:
+            sniffer = ContentSniffer(workers=workers)
+            start = time.perf_counter()
+            results = dict(sniffer.sniff_many(paths))
+            elapsed = time.perf_counter() - start
+
+            wrong = [(path.name, expected[path], extension)
+                     for path, extension in results.items() if extension != expected[path]]
+            if wrong:
+                for name, wanted, extension in wrong[:10]:
+                    print(f"  {name}: esperado {wanted}, obtido {extension}")
+                raise SystemExit(f"{len(wrong)} arquivos identificados incorretamente")
+
+            print(f"sniffer, {workers:2d} threads    | {sniffer.bytes_read * scale / 2 ** 20:9.1f} MiB lidos | "
+                  f"{elapsed * scale * 1000:8.1f} ms por 10k arquivos | "
+                  f"orçamento {sniffer.budget} bytes por arquivo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Startup benchmark: import time (``-X importtime``) and time until the main
+window is shown, running ``src/main.py`` under the offscreen Qt platform.
+
+Uso:
+    python benchmarks/bench_startup.py [--runs 5] [--max-seconds 2.0]
+
+With `--max-seconds`, exits with status 1 when the median time-to-window
+exceeds the limit, so regressions can be caught in CI.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Runs main() and reports when the main window receives its first show event
+WINDOW_PROBE = """
+import sys
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+import pastro.gui.main_window as main_window
+
+original_show_event = main_window.FolderOrganizer.showEvent
+
+def show_event(self, event):
+    original_show_event(self, event)
+    print("shown", flush=True)
+    QTimer.singleShot(0, QApplication.quit)
+
+main_window.FolderOrganizer.showEvent = show_event
+
+import main
+try:
+    main.main()
+except SystemExit:
+    pass
+"""
+
+
+def environment() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    env["PYTHONPATH"] = str(SRC) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def time_to_window() -> float:
+    """Seconds from process start until the main window is shown."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", WINDOW_PROBE], cwd=SRC, env=environment(),
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    for line in process.stdout:
+        if line.strip() == "shown":
+            elapsed = time.perf_counter() - start
+            break
+    else:
+        raise SystemExit("a janela principal não foi exibida")
+    process.wait()
+    return elapsed
+
+
+def import_times(module: str) -> List[Tuple[int, int, str]]:
+    """(self µs, cumulative µs, module) for each import, from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC, env=environment(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(own), int(cumulative), name.rstrip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--module", default="main", help="módulo medido com -X importtime")
+    parser.add_argument("--top", type=int, default=10, help="imports mais caros exibidos")
+    parser.add_argument("--max-seconds", type=float, help="limite para a mediana até a janela")
+    args = parser.parse_args()
+
+    rows = import_times(args.module)
+    # Nested imports are indented past the single space that follows the "|"
+    top_level = [row for row in rows if not row[2][1:].startswith(" ")]
+    total = sum(cumulative for _, cumulative, _ in top_level)
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+    for own, cumulative, name in sorted(rows, key=lambda row: row[0], reverse=True)[:args.top]:
+        print(f"  {own / 1000:8.1f} ms próprio {cumulative / 1000:8.1f} ms acumulado  {name.strip()}")
+
+    samples = [time_to_window() for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"até a janela: mediana {median:.3f}s, mínimo {min(samples):.3f}s, máximo {max(samples):.3f}s")
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        raise SystemExit(f"regressão: {median:.3f}s > {args.max_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""
+Benchmark suite: scan, classify, plan and move phases, timed separately, on a
+reproducible synthetic tree for both classifiers (``pastro.core.classifier``
+and ``src/auto_classifier.py``). Results are written as JSON so runs of
+different versions can be compared.
+
+Uso:
+    python benchmarks/bench_suite.py [--files 100000] [--depth 4] [--fanout 4] [--sparse 0.5]
+                                     [--repeat 3] [--output resultado.json] [--compare anterior.json]
+
+Each classifier gets its own copy of the tree, generated from the same seed,
+since the move phase changes it. Scan, classify and plan run `--repeat` times
+and the best time is kept; the move phase runs once. The tree is generated
+just before it is measured, so the scan reads a warm page cache.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from synthetic_tree import TreeSpec, generate_tree, parse_extensions  # noqa: E402
+
+import pastro  # noqa: E402
+from auto_classifier import AutoClassifier as LegacyClassifier  # noqa: E402
+from pastro.core.classifier import AutoClassifier  # noqa: E402
+from pastro.core.mover import MoveExecutor  # noqa: E402
+from pastro.core.planner import plan_targets  # noqa: E402
+from pastro.core.scanner import Scanner  # noqa: E402
+
+PHASES = ("scan", "classify", "plan", "move")
+
+
+def core_classify() -> Callable[[List], Dict[str, List[Path]]]:
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+
+    def classify(entries: List) -> Dict[str, List[Path]]:
+        grouped = classifier.classify_names(entries)
+        return {category: [Path(entry.path) for entry in files] for category, files in grouped.items()}
+
+    return classify
+
+
+def legacy_classify() -> Callable[[List], Dict[str, List[Path]]]:
+    rules = LegacyClassifier().compile_rules()
+
+    def classify(entries: List) -> Dict[str, List[Path]]:
+        classification: Dict[str, List[Path]] = {}
+        for entry in entries:
+            classification.setdefault(rules.classify(entry.name), []).append(Path(entry.path))
+        return classification
+
+    return classify
+
+
+# Classifier name -> factory of a function classifying scanned entries
+CLASSIFIERS: Dict[str, Callable[[], Callable[[List], Dict[str, List[Path]]]]] = {
+    "pastro.core.classifier": core_classify,
+    "auto_classifier": legacy_classify,
+}
+
+
+def best_of(repeat: int, function: Callable):
+    """Best time of `repeat` calls, and the result of the last one."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_classifier(
+    name: str, spec: TreeSpec, repeat: int, workers: int, folder: Path, target_folder: Optional[Path]
+) -> Dict:
+    """Generate a tree in `folder` and time every phase with one classifier."""
+    root = folder / "arvore"
+    start = time.perf_counter()
+    stats = generate_tree(root, spec)
+    generation = time.perf_counter() - start
+    target = target_folder / "destino" if target_folder else root
+
+    scanner = Scanner(max_depth=None)
+    classify = CLASSIFIERS[name]()
+    seconds: Dict[str, float] = {}
+    seconds["scan"], entries = best_of(repeat, lambda: list(scanner.walk(root)))
+    entries = [entry for entry, _ in entries]
+    seconds["classify"], classification = best_of(repeat, lambda: classify(entries))
+    seconds["plan"], plan = best_of(repeat, lambda: plan_targets(classification, target))
+    operations = list(plan)
+    start = time.perf_counter()
+    report = MoveExecutor(workers=workers).execute(operations)
+    seconds["move"] = time.perf_counter() - start
+
+    if report.failures:
+        for failure in report.failures[:5]:
+            print(f"  {failure.operation.source}: {failure.error}", file=sys.stderr)
+        raise SystemExit(f"{len(report.failures)} movimentações falharam com {name}")
+    return {
+        "files": stats.files,
+        "folders": stats.folders,
+        "bytes": stats.bytes,
+        "sparse_files": stats.sparse_files,
+        "generation_seconds": round(generation, 4),
+        "categories": {category: len(files) for category, files in classification.items() if files},
+        "moved": report.moved_files,
+        "seconds": {phase: round(seconds[phase], 6) for phase in PHASES},
+        "files_per_second": {
+            phase: round(stats.files / seconds[phase], 1) if seconds[phase] else None for phase in PHASES
+        },
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "-C", str(ROOT), "describe", "--always", "--dirty"],
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output.stdout.strip() or None
+
+
+def environment() -> Dict:
+    return {
+        "pastro": pastro.__version__,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def print_results(results: Dict[str, Dict], previous: Optional[Dict] = None) -> None:
+    print(f"{'classificador':24} | " + " | ".join(f"{phase:>12}" for phase in PHASES))
+    for name, result in results.items():
+        cells = [f"{result['seconds'][phase] * 1000:9.1f} ms" for phase in PHASES]
+        print(f"{name:24} | " + " | ".join(cells))
+        if previous and name in previous.get("results", {}):
+            before = previous["results"][name]["seconds"]
+            ratios = [
+                f"{result['seconds'][phase] / before[phase]:11.2f}x" if before.get(phase) else f"{'-':>12}"
+                for phase in PHASES
+            ]
+            print(f"{'  / anterior':24} | " + " | ".join(ratios))
+
+
+def main() -> None:
+    defaults = TreeSpec._field_defaults
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--min-size", type=int, default=defaults["min_size"])
+    parser.add_argument("--max-size", type=int, default=defaults["max_size"])
+    parser.add_argument("--sparse", type=float, default=0.5, help="fração de arquivos esparsos")
+    parser.add_argument("--extensions", type=parse_extensions, help='pesos, ex.: ".jpg=30,.pdf=10,=5"')
+    parser.add_argument("--seed", type=int, default=defaults["seed"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4, help="cópias simultâneas entre dispositivos")
+    parser.add_argument("--classifier", choices=list(CLASSIFIERS), action="append",
+                        help="mede só este classificador (pode ser repetido)")
+    parser.add_argument("--dir", type=Path, help="onde gerar as árvores (padrão: pasta temporária do sistema)")
+    parser.add_argument("--target-dir", type=Path,
+                        help="move para outra pasta, por exemplo em outro disco, em vez de organizar no lugar")
+    parser.add_argument("--output", type=Path, help="arquivo JSON (padrão: bench-suite-<data>.json)")
+    parser.add_argument("--compare", type=Path, help="resultado JSON de uma execução anterior")
+    args = parser.parse_args()
+
+    spec = TreeSpec(args.files, args.depth, args.fanout, args.min_size, args.max_size,
+                    args.sparse, args.extensions, args.seed)
+    previous = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    if previous and previous.get("spec") != json.loads(json.dumps(spec.to_dict())):
+        print("aviso: a execução anterior usou outra árvore", file=sys.stderr)
+
+    results: Dict[str, Dict] = {}
+    for name in args.classifier or CLASSIFIERS:
+        targets = (
+            tempfile.TemporaryDirectory(prefix="pastro-bench-", dir=args.target_dir)
+            if args.target_dir else contextlib.nullcontext()
+        )
+        with tempfile.TemporaryDirectory(prefix="pastro-bench-", dir=args.dir) as folder, targets as target_folder:
+            results[name] = run_classifier(
+                name, spec, args.repeat, args.workers, Path(folder),
+                Path(target_folder) if target_folder else None,
+            )
+
+    document = {"environment": environment(), "spec": spec.to_dict(), "repeat": args.repeat, "results": results}
+    output = args.output or Path(f"bench-suite-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    output.write_text(json.dumps(document, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    print_results(results, previous)
+    print(f"resultado gravado em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Moves across two filesystems with ``shutil.move`` against ``move_file``, with
+and without verification, for a workload of small files and one of large files.
+
+Uso:
+    python benchmarks/bench_transfer.py --source-dir /mnt/ext4 --target-dir /mnt/tmpfs [--small 2000x16] [--large 4x256]
+
+Workloads are given as COUNTxKIB for small files and COUNTxMIB for large
+ones. The two folders must be on different filesystems, or every move is a
+rename. For example, a tmpfs and an ext4 loop image (as root)::
+
+    mkdir -p /mnt/tmpfs /mnt/ext4
+    mount -t tmpfs -o size=4G tmpfs /mnt/tmpfs
+    truncate -s 4G /tmp/pastro-ext4.img && mkfs.ext4 -q /tmp/pastro-ext4.img
+    mount -o loop /tmp/pastro-ext4.img /mnt/ext4
+
+The source files are written right before each run, so they are read from
+the page cache; the times measure the copies, not the source disk.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from pastro.core.transfer import move_file  # noqa: E402
+
+
+def shutil_move(source: str, target: str) -> str:
+    """The move done before `move_file`."""
+    shutil.move(source, target)
+    return "shutil"
+
+
+MOVES: List[Tuple[str, Callable[[str, str], str]]] = [
+    ("shutil.move", shutil_move),
+    ("move_file", move_file),
+    ("move_file --verify", lambda source, target: move_file(source, target, verify=True)),
+]
+
+
+def parse_workload(text: str) -> Tuple[int, int]:
+    count, size = text.lower().split("x")
+    return int(count), int(size)
+
+
+def write_files(folder: str, count: int, size: int) -> List[str]:
+    block = os.urandom(min(size, 1024 * 1024))
+    paths = []
+    for index in range(count):
+        path = os.path.join(folder, f"arquivo-{index:06d}.bin")
+        with open(path, "wb") as file:
+            for offset in range(0, size, len(block)):
+                file.write(block[:size - offset])
+        paths.append(path)
+    return paths
+
+
+def run(move: Callable, source_dir: Path, target_dir: Path, count: int, size: int) -> Tuple[float, Counter]:
+    """Seconds to move `count` files of `size` bytes, and the methods used."""
+    with tempfile.TemporaryDirectory(prefix="pastro-bench-", dir=source_dir) as source, \
+            tempfile.TemporaryDirectory(prefix="pastro-bench-", dir=target_dir) as target:
+        paths = write_files(source, count, size)
+        methods: Counter = Counter()
+        start = time.perf_counter()
+        for path in paths:
+            methods[move(path, os.path.join(target, os.path.basename(path)))] += 1
+        return time.perf_counter() - start, methods
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source-dir", type=Path, required=True, help="pasta no primeiro sistema de arquivos")
+    parser.add_argument("--target-dir", type=Path, required=True, help="pasta no segundo sistema de arquivos")
+    parser.add_argument("--small", default="2000x16", help="QUANTIDADExKiB dos arquivos pequenos")
+    parser.add_argument("--large", default="4x256", help="QUANTIDADExMiB dos arquivos grandes")
+    parser.add_argument("--repeat", type=int, default=3, help="execuções de cada combinação; vale a mais rápida")
+    args = parser.parse_args()
+
+    if os.stat(args.source_dir).st_dev == os.stat(args.target_dir).st_dev:
+        print("aviso: as duas pastas estão no mesmo sistema de arquivos", file=sys.stderr)
+    small_count, small_kib = parse_workload(args.small)
+    large_count, large_mib = parse_workload(args.large)
+    workloads = [
+        (f"{small_count} x {small_kib} KiB", small_count, small_kib * 1024),
+        (f"{large_count} x {large_mib} MiB", large_count, large_mib * 1024 * 1024),
+    ]
+
+    print(f"{args.source_dir} -> {args.target_dir}")
+    print(f"{'carga':>16} | {'método':>18} | {'tempo':>8} | {'arquivos/s':>10} | {'MB/s':>8} | cópias")
+    for label, count, size in workloads:
+        for name, move in MOVES:
+            runs = [run(move, args.source_dir, args.target_dir, count, size) for _ in range(args.repeat)]
+            seconds, methods = min(runs, key=lambda item: item[0])
+            used = ", ".join(f"{method} {number}" for method, number in methods.most_common())
+            print(f"{label:>16} | {name:>18} | {seconds:7.2f}s | {count / seconds:10.0f} | "
+                  f"{count * size / 2 ** 20 / seconds:8.1f} | {used}")
+
+
+if __name__ == "__main__":
+    main()
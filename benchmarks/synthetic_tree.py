@@ -0,0 +1,149 @@
+"""
+Reproducible synthetic folder trees for the benchmarks.
+
+The same spec and seed always give the same folders, names and sizes.
+Sparse files get their size from ``truncate`` without writing any data, so
+trees of many gigabytes cost almost no disk; the others are filled with
+random bytes.
+
+Uso:
+    python benchmarks/synthetic_tree.py DESTINO [--files 10000] [--depth 3] [--fanout 4]
+"""
+
+import argparse
+import math
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Share of each extension among the generated files; "" is a file without extension
+DEFAULT_EXTENSIONS: Dict[str, float] = {
+    ".jpg": 22, ".png": 8, ".JPG": 3, ".pdf": 12, ".docx": 5, ".txt": 6, ".xlsx": 3, ".csv": 2,
+    ".mp4": 4, ".mkv": 1, ".mp3": 5, ".wav": 1, ".zip": 4, ".tar.gz": 1, ".7z": 1, ".py": 6,
+    ".js": 3, ".html": 2, ".exe": 1, ".part": 1, ".dat": 4, "": 5,
+}
+
+STEMS = ("IMG_", "Screenshot ", "documento_", "relatorio-", "download_", "foto ", "backup-", "notas_")
+
+# Random data written into non-sparse files, sliced as needed
+FILL_BLOCK = 1024 * 1024
+
+
+class TreeSpec(NamedTuple):
+    """Shape of a synthetic tree."""
+    files: int = 10_000
+    depth: int = 3            # Levels of folders below the root
+    fanout: int = 4           # Subfolders per folder, up to `depth`
+    min_size: int = 0         # Bytes; sizes are log-uniform in [min_size, max_size]
+    max_size: int = 64 * 1024
+    sparse: float = 0.0       # Share of files created sparse
+    extensions: Optional[Dict[str, float]] = None  # Defaults to DEFAULT_EXTENSIONS
+    seed: int = 42
+
+    def to_dict(self) -> Dict:
+        data = self._asdict()
+        data["extensions"] = self.extensions or DEFAULT_EXTENSIONS
+        return data
+
+
+class TreeStats(NamedTuple):
+    files: int
+    folders: int
+    bytes: int          # Apparent size
+    sparse_files: int
+
+
+def parse_extensions(text: str) -> Dict[str, float]:
+    """Weights from text such as ".jpg=30,.pdf=10,=5" (an empty extension is no extension)."""
+    weights = {}
+    for item in text.split(","):
+        extension, _, weight = item.partition("=")
+        weights[extension.strip()] = float(weight or 1)
+    return weights
+
+
+def _folders(root: Path, spec: TreeSpec) -> List[Path]:
+    """Every folder of the tree, the root first, breadth-first."""
+    folders = [root]
+    level = [root]
+    for depth in range(spec.depth):
+        level = [folder / f"pasta_{depth + 1}_{number}" for folder in level for number in range(spec.fanout)]
+        folders.extend(level)
+    return folders
+
+
+def _size(rng: random.Random, spec: TreeSpec) -> int:
+    if spec.max_size <= spec.min_size:
+        return spec.min_size
+    low = math.log(spec.min_size + 1)
+    high = math.log(spec.max_size + 1)
+    return int(math.exp(rng.uniform(low, high))) - 1
+
+
+def plan_tree(root: Path, spec: TreeSpec) -> Tuple[List[Path], List[Tuple[Path, int, bool]]]:
+    """Folders and files (path, size, sparse) of a tree, without creating anything."""
+    rng = random.Random(spec.seed)
+    folders = _folders(root, spec)
+    weights = spec.extensions or DEFAULT_EXTENSIONS
+    extensions = list(weights)
+    cumulative = []
+    total = 0.0
+    for extension in extensions:
+        total += weights[extension]
+        cumulative.append(total)
+
+    files = []
+    for number in range(spec.files):
+        extension = rng.choices(extensions, cum_weights=cumulative)[0]
+        folder = folders[rng.randrange(len(folders))]
+        name = f"{rng.choice(STEMS)}{number:07d}{extension}"
+        files.append((folder / name, _size(rng, spec), rng.random() < spec.sparse))
+    return folders, files
+
+
+def generate_tree(root: Path, spec: TreeSpec) -> TreeStats:
+    """Create the tree of `spec` under `root`, which may already exist."""
+    folders, files = plan_tree(Path(root), spec)
+    for folder in folders:
+        folder.mkdir(parents=True, exist_ok=True)
+    fill = random.Random(spec.seed).randbytes(FILL_BLOCK)
+    total = sparse_files = 0
+    for path, size, sparse in files:
+        with open(path, "wb") as file:
+            if sparse:
+                file.truncate(size)
+                sparse_files += 1
+            else:
+                remaining = size
+                while remaining > 0:
+                    remaining -= file.write(fill[:min(remaining, FILL_BLOCK)])
+        total += size
+    return TreeStats(len(files), len(folders), total, sparse_files)
+
+
+def main() -> None:
+    defaults = TreeSpec._field_defaults
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("destination", type=Path)
+    parser.add_argument("--files", type=int, default=defaults["files"])
+    parser.add_argument("--depth", type=int, default=defaults["depth"])
+    parser.add_argument("--fanout", type=int, default=defaults["fanout"])
+    parser.add_argument("--min-size", type=int, default=defaults["min_size"])
+    parser.add_argument("--max-size", type=int, default=defaults["max_size"])
+    parser.add_argument("--sparse", type=float, default=defaults["sparse"], help="fração de arquivos esparsos")
+    parser.add_argument("--extensions", type=parse_extensions, help='pesos, ex.: ".jpg=30,.pdf=10,=5"')
+    parser.add_argument("--seed", type=int, default=defaults["seed"])
+    args = parser.parse_args()
+
+    if args.destination.exists() and any(args.destination.iterdir()):
+        sys.exit(f"{args.destination} não está vazia")
+    spec = TreeSpec(args.files, args.depth, args.fanout, args.min_size, args.max_size,
+                    args.sparse, args.extensions, args.seed)
+    stats = generate_tree(args.destination, spec)
+    print(f"{stats.files} arquivos em {stats.folders} pastas, {stats.bytes / 2 ** 20:.1f} MiB "
+          f"({stats.sparse_files} esparsos)")
+
+
+if __name__ == "__main__":
+    main()
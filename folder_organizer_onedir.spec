@@ -0,0 +1,123 @@
+# -*- mode: python ; coding: utf-8 -*-
+
+# Light build: a folder instead of a single file, so nothing is unpacked to a
+# temp dir at launch. Build with:
+#     pyinstaller folder_organizer_onedir.spec
+# The program ends up in dist/FolderOrganizer/.
+
+block_cipher = None
+
+# Qt plugin folders the app needs: windowing, input methods, native dialogs
+# and styles, and the image formats of src/resources (PNG is built into QtGui)
+QT_PLUGINS = {
+    'platforms': ('qwindows', 'qxcb', 'qwayland', 'qcocoa', 'qoffscreen'),
+    'platforminputcontexts': None,
+    'platformthemes': None,
+    'styles': None,
+    'wayland-decoration-client': None,
+    'wayland-shell-integration': None,
+    'wayland-graphics-integration-client': None,
+    'xcbglintegrations': None,
+    'imageformats': ('qico',),
+}
+
+# Qt libraries collected only for the plugins left out
+QT_LIBRARIES_DROPPED = ('Qt6Pdf', 'Qt6Network', 'Qt6EglFSDeviceIntegration')
+
+# Qt bindings the app never loads
+QT_EXCLUDES = [
+    f'PyQt6.{module}' for module in (
+        'QtBluetooth', 'QtDBus', 'QtDesigner', 'QtHelp', 'QtMultimedia', 'QtMultimediaWidgets',
+        'QtNetwork', 'QtNfc', 'QtOpenGL', 'QtOpenGLWidgets', 'QtPdf', 'QtPdfWidgets', 'QtPositioning',
+        'QtPrintSupport', 'QtQml', 'QtQuick', 'QtQuick3D', 'QtQuickWidgets', 'QtRemoteObjects',
+        'QtSensors', 'QtSerialPort', 'QtSpatialAudio', 'QtSql', 'QtStateMachine', 'QtSvg',
+        'QtSvgWidgets', 'QtTest', 'QtTextToSpeech', 'QtWebChannel', 'QtWebSockets', 'QtXml',
+        'lupdate', 'uic',
+    )
+]
+
+
+def qt_file_kept(name):
+    """Whether a collected file is kept: Qt translations go (the interface is
+    in Portuguese already), and so do the plugins not listed in QT_PLUGINS
+    and the libraries only they need."""
+    parts = name.replace('\\', '/').split('/')
+    if parts[-1].split('.')[0].removeprefix('lib') in QT_LIBRARIES_DROPPED:
+        return False
+    if 'Qt6' not in parts:
+        return True
+    parts = parts[parts.index('Qt6') + 1:]
+    if parts[0] == 'translations':
+        return False
+    if parts[0] != 'plugins' or len(parts) < 3:
+        return True
+    if parts[1] not in QT_PLUGINS:
+        return False
+    kept = QT_PLUGINS[parts[1]]
+    stem = parts[-1].split('.')[0]
+    return kept is None or stem.removeprefix('lib') in kept
+
+
+a = Analysis(
+    ['src/main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[
+        ('src/resources', 'resources'),
+    ],
+    hiddenimports=[
+        'PyQt6.QtCore',
+        'PyQt6.QtGui',
+        'PyQt6.QtWidgets'
+    ],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[
+        'tkinter',
+        'matplotlib',
+        'numpy',
+        'pandas',
+        'PIL',
+    ] + QT_EXCLUDES,
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    # Modules are compiled at build time into the archive, asserts left out
+    noarchive=False,
+    optimize=1,
+)
+
+a.binaries = [entry for entry in a.binaries if qt_file_kept(entry[0])]
+a.datas = [entry for entry in a.datas if qt_file_kept(entry[0])]
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='FolderOrganizer',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    # UPX would make every Qt library be decompressed again at each launch
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='FolderOrganizer',
+)
@@ -2,11 +2,112 @@
 Auto classifier module for the Folder Organizer System.
 """
 
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterator, List, Optional, Set
 import mimetypes
+import posixpath
 import re
 
+from pastro.core.scanner import ScanEntry, Scanner
+from pastro.core.sniffer import ContentSniffer
+
+
+@lru_cache(maxsize=4096)
+def _mime_category(suffix_key: str) -> str:
+    """
+    Map the MIME type guessed for a suffix key to a category.
+    The key holds the last two suffixes of the name, which is all
+    `mimetypes.guess_type` looks at.
+    """
+    mime_type, _ = mimetypes.guess_type("_" + suffix_key)
+    if mime_type:
+        if mime_type.startswith("image/"):
+            return "Imagens"
+        elif mime_type.startswith("video/"):
+            return "Vídeos"
+        elif mime_type.startswith("audio/"):
+            return "Áudio"
+        elif mime_type.startswith("text/"):
+            return "Documentos"
+        elif mime_type.startswith("application/"):
+            if "compressed" in mime_type or "zip" in mime_type:
+                return "Compactados"
+            return "Documentos"
+
+    # If still no match, classify as "Outros"
+    return "Outros"
+
+
+class CompiledRules:
+    """
+    Categories compiled into an extension table, one combined pattern regex
+    and a memoized MIME fallback, keeping the precedence of a category-by-category scan.
+    """
+
+    def __init__(self, categories: Dict[str, Dict]):
+        self.names: List[str] = list(categories)
+        self.extensions: Dict[str, int] = {}
+        patterns: List[tuple] = []
+
+        for position, rules in enumerate(categories.values()):
+            for extension in rules["extensions"]:
+                self.extensions.setdefault(extension, position)
+            for pattern in rules["patterns"]:
+                patterns.append((position, pattern))
+
+        # Categories after this one can never win through a pattern
+        self.first_pattern = min((position for position, _ in patterns), default=len(self.names))
+        self.group_owner: Dict[str, int] = {}
+        self.combined: Optional[re.Pattern] = None
+        self.fallback: List[tuple] = [(position, re.compile(pattern)) for position, pattern in patterns]
+        if patterns and all(compiled.groups == 0 for _, compiled in self.fallback):
+            self._build_combined(patterns)
+
+    def _build_combined(self, patterns: List[tuple]) -> None:
+        """
+        Join all patterns into one alternation of anchored lookaheads, so the
+        first pattern that matches anywhere in the name wins, like `re.search` in order.
+        """
+        alternatives = []
+        for number, (position, pattern) in enumerate(patterns):
+            group = f"r{number}"
+            self.group_owner[group] = position
+            alternatives.append(f"(?P<{group}>(?=[\\s\\S]*?(?:{pattern})))")
+        try:
+            self.combined = re.compile("|".join(alternatives))
+        except re.error:
+            # e.g. inline global flags, which are only valid at the start of a regex
+            self.combined = None
+
+    def match_pattern(self, file_name: str) -> Optional[int]:
+        """Return the position of the first category whose pattern matches."""
+        if self.combined is not None:
+            match = self.combined.match(file_name)
+            return self.group_owner[match.lastgroup] if match else None
+        for position, compiled in self.fallback:
+            if compiled.search(file_name):
+                return position
+        return None
+
+    def classify(self, name: str) -> str:
+        """Classify a file name."""
+        dot = name.rfind(".")
+        # Same rules as `Path.suffix`
+        extension = name[dot:] if 0 < dot < len(name) - 1 else ""
+        position = self.extensions.get(extension.lower())
+
+        if position is None or position > self.first_pattern:
+            pattern_position = self.match_pattern(name.lower())
+            if pattern_position is not None and (position is None or pattern_position < position):
+                position = pattern_position
+
+        if position is not None:
+            return self.names[position]
+        base, last = posixpath.splitext(name)
+        return _mime_category(posixpath.splitext(base)[1] + last)
+
+
 class AutoClassifier:
     def __init__(self):
         # Default categories with their file extensions and patterns
@@ -41,42 +142,34 @@ class AutoClassifier:
             }
         }
 
+    @property
+    def categories(self) -> Dict[str, Dict]:
+        return self._categories
+
+    @categories.setter
+    def categories(self, categories: Dict[str, Dict]) -> None:
+        self._categories = categories
+        # Compiled again on the next `classify_file`
+        self._compiled: Optional[CompiledRules] = None
+
+    def compile_rules(self) -> "CompiledRules":
+        """
+        Compile the current categories into a single matcher. Assigning
+        `categories` drops the compiled matcher; after changing them in place,
+        this must be called again.
+        """
+        self._compiled = CompiledRules(self.categories)
+        return self._compiled
+
     def classify_file(self, file_path: Path) -> str:
         """
-        Classify a single file based on its extension and name pattern.
+        Classify a single file based on its extension and name pattern,
+        with the rules compiled from `categories` (see `compile_rules`).
         Returns the category name.
         """
-        file_ext = file_path.suffix.lower()
-        file_name = file_path.name.lower()
-
-        # Try to classify by extension first
-        for category, rules in self.categories.items():
-            if file_ext in rules["extensions"]:
-                return category
-
-            # Check patterns if no extension match
-            for pattern in rules["patterns"]:
-                if re.search(pattern, file_name):
-                    return category
-
-        # If no match found, try to get MIME type
-        mime_type, _ = mimetypes.guess_type(file_path)
-        if mime_type:
-            if mime_type.startswith("image/"):
-                return "Imagens"
-            elif mime_type.startswith("video/"):
-                return "Vídeos"
-            elif mime_type.startswith("audio/"):
-                return "Áudio"
-            elif mime_type.startswith("text/"):
-                return "Documentos"
-            elif mime_type.startswith("application/"):
-                if "compressed" in mime_type or "zip" in mime_type:
-                    return "Compactados"
-                return "Documentos"
-
-        # If still no match, classify as "Outros"
-        return "Outros"
+        if self._compiled is None:
+            self.compile_rules()
+        return self._compiled.classify(file_path.name)
 
     def classify_files(self, folder_path: Path) -> Dict[str, List[Path]]:
         """
@@ -84,16 +177,26 @@ class AutoClassifier:
         Returns a dictionary with categories as keys and lists of file paths as values.
         """
         classification = {}
-        
-        for file_path in folder_path.glob("*"):
-            if file_path.is_file():
-                category = self.classify_file(file_path)
-                if category not in classification:
-                    classification[category] = []
-                classification[category].append(file_path)
-        
+        rules = self.compile_rules()
+
+        for entry in self.iter_classified(folder_path, rules):
+            classification.setdefault(entry.category, []).append(Path(entry.path))
+
+        # Files nothing recognized by name are identified by their content
+        ContentSniffer().reclassify(classification, rules.classify)
         return classification
 
+    def iter_classified(
+        self, folder_path: Path, rules: Optional[CompiledRules] = None, scanner: Optional[Scanner] = None
+    ) -> Iterator[ScanEntry]:
+        """
+        Lazily yield the classified files of a folder.
+        By default only the top level is scanned, like `classify_files`.
+        """
+        rules = rules or self.compile_rules()
+        scanner = scanner or Scanner(max_depth=0)
+        return scanner.scan(folder_path, rules.classify)
+
     def get_categories(self) -> Set[str]:
         """Return all available categories"""
         return set(self.categories.keys()) | {"Outros"} 
\ No newline at end of file
@@ -5,39 +5,46 @@
 Main entry point for the Pastro application.
 """
 
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
 from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
 
-from pastro.gui import SplashScreen, FolderOrganizer
+from pastro.gui.splash_screen import SplashScreen
+
+# Printed when the main window is up and PASTRO_STARTUP_PROBE is set
+STARTUP_PROBE_LINE = "pastro: janela pronta"
 
 def main():
     """Main application entry point."""
     app = QApplication(sys.argv)
     
-    # Create and show splash screen
+    # Show the splash as early as possible; each step reports a real phase
     splash = SplashScreen()
     splash.show()
     
-    # Simulate loading
-    splash.update_status("Inicializando interface...", 20)
-    QTimer.singleShot(100, lambda: splash.update_status("Carregando componentes...", 40))
-    QTimer.singleShot(200, lambda: splash.update_status("Preparando classificador...", 60))
-    QTimer.singleShot(300, lambda: splash.update_status("Finalizando...", 80))
+    splash.update_status("Carregando componentes...", 30)
+    from pastro.gui.main_window import FolderOrganizer
     
-    # Create the main window
+    splash.update_status("Preparando classificador...", 70)
     window = FolderOrganizer()
     
-    # Finish splash and show main window
-    QTimer.singleShot(400, lambda: (
-        splash.update_status("Pronto!", 100),
-        QTimer.singleShot(200, lambda: (
-            splash.finish(window),
-            window.show()
-        ))
-    ))
+    # Show the main window as soon as it is ready
+    splash.update_status("Pronto!", 100)
+    window.show()
+    splash.finish(window)
+    # Runs in the background, after the window is up
+    window.check_interrupted_run()
+
+    # Startup measurement (benchmarks/bench_bundle.py): tell once the window is drawn
+    if os.environ.get("PASTRO_STARTUP_PROBE"):
+        QTimer.singleShot(0, lambda: print(STARTUP_PROBE_LINE, flush=True))
     
     sys.exit(app.exec())
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # Required by the process pools when running as a frozen executable;
+    # imported only when run as the program, not by whoever imports this module
+    from multiprocessing import freeze_support
+    freeze_support()
+    main()
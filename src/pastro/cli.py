@@ -0,0 +1,322 @@
+"""
+Command line interface for the Pastro application.
+Drives ``pastro.core`` directly (never imports PyQt6) and writes JSON Lines to stdout.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from .core.archives import ARCHIVE_ERRORS, ArchiveInspector, ExtractedMember, extract_archive, list_archive
+from .core.cache import CachingScanner, ScanCache
+from .core.classifier import AutoClassifier
+from .core.journal import STATUS_FINISHED, STATUS_INTERRUPTED, MoveJournal, latest_journal
+from .core.mover import MoveExecutor, MoveOperation, MoveResult
+from .core.planner import plan_moves
+from .core.scanner import SYMLINK_POLICIES, SYMLINKS_FILES, ScanEntry, Scanner
+from .core.sniffer import ContentSniffer
+
+
+def emit(record: Dict) -> None:
+    """Write one JSON Lines record."""
+    sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def build_classifier(args: argparse.Namespace) -> AutoClassifier:
+    """Classifier with the rules file given on the command line, or the user's."""
+    classifier = AutoClassifier()
+    try:
+        classifier.load_rules(args.rules)
+    except (OSError, ValueError) as error:
+        print(f"erro: regras inválidas ({error})", file=sys.stderr)
+        raise SystemExit(2)
+    return classifier
+
+
+def build_scanner(args: argparse.Namespace, classifier: AutoClassifier) -> Scanner:
+    """Scanner configured from the command line, backed by the scan cache unless disabled."""
+    options = dict(
+        max_depth=args.depth,
+        include=args.include,
+        exclude=args.exclude,
+        symlinks=args.symlinks,
+        on_error=lambda error: print(f"aviso: {error}", file=sys.stderr),
+    )
+    if not args.no_cache:
+        try:
+            cache = ScanCache()
+        except (OSError, sqlite3.Error) as error:
+            print(f"aviso: cache indisponível ({error})", file=sys.stderr)
+        else:
+            return CachingScanner(cache, classifier.get_category_for_name, classifier.config_hash(), **options)
+    return Scanner(**options)
+
+
+def scan_entries(args: argparse.Namespace, classifier: AutoClassifier) -> Iterator[ScanEntry]:
+    return classifier.scan(build_scanner(args, classifier), args.root)
+
+
+def plan(args: argparse.Namespace, classifier: AutoClassifier) -> List[MoveOperation]:
+    """Plan the moves for the root folder."""
+    archive_category = classifier.get_category_for_extension(".zip")
+    with ArchiveInspector(archive_category) if args.archives else nullcontext() as archives:
+        # Sizes are not needed to plan: no file is stat'ed
+        table = classifier.classify_table(build_scanner(args, classifier), args.root, stat=False, archives=archives)
+        ContentSniffer().reclassify_table(table, classifier.get_category_for_name)
+        if archives is not None:
+            archives.reclassify_table(table, classifier.get_category_for_name)
+    return plan_moves(table.classification(), args.target or args.root)
+
+
+def operation_record(operation: MoveOperation) -> Dict:
+    return {
+        "source": str(operation.source),
+        "target": str(operation.target),
+        "category": operation.category,
+    }
+
+
+def result_record(result: MoveResult) -> Dict:
+    record = operation_record(result.operation)
+    record.update(ok=result.ok, method=result.method, size=result.size, error=result.error)
+    return record
+
+
+def run_moves(
+    journal: Optional[MoveJournal],
+    operations: List[MoveOperation],
+    jobs: int,
+    undo: bool = False,
+    conflicts: Sequence[MoveResult] = (),
+    verify: bool = False,
+) -> int:
+    """Execute journaled moves, streaming each result; returns the exit status."""
+    def on_result(result: MoveResult) -> None:
+        emit(result_record(result))
+
+    for result in conflicts:
+        on_result(result)
+    executor = MoveExecutor(workers=jobs, verify=verify)
+    if journal is not None:
+        report = journal.execute(executor, operations, on_result, undo)
+    else:
+        report = executor.execute(operations, on_result)
+    for result in conflicts:
+        report.add(result)
+
+    emit({"summary": {
+        "moved": report.moved_files,
+        "failed": len(report.failures),
+        "bytes": report.moved_bytes,
+        "seconds": round(report.elapsed, 3),
+        "files_per_second": round(report.files_per_second, 1),
+        "mb_per_second": round(report.mb_per_second, 2),
+        "journal": str(journal.path) if journal else None,
+    }})
+    return 1 if report.failures else 0
+
+
+def command_scan(args: argparse.Namespace) -> int:
+    classifier = build_classifier(args)
+    sniffer = ContentSniffer()
+    archive_category = classifier.get_category_for_extension(".zip")
+    for entry in scan_entries(args, classifier):
+        category = entry.category
+        if category == "Outros":
+            # Streamed one by one, so no thread pool here
+            extension = sniffer.sniff(Path(entry.path))
+            if extension:
+                category = classifier.get_category_for_name("_" + extension)
+        if args.archives and category == archive_category:
+            # Nor a process pool
+            listing = list_archive(entry.path)
+            dominant = listing.dominant(classifier.get_category_for_name) if listing is not None else None
+            category = dominant or category
+        try:
+            size = entry.entry.stat().st_size
+        except OSError as error:
+            # Gone or unreadable since it was listed, like the scanner's own errors
+            print(f"aviso: {error}", file=sys.stderr)
+            size = None
+        emit({
+            "path": entry.path,
+            "category": category,
+            "size": size,
+            "depth": entry.depth,
+        })
+    return 0
+
+
+def command_plan(args: argparse.Namespace) -> int:
+    for operation in plan(args, build_classifier(args)):
+        emit(operation_record(operation))
+    return 0
+
+
+def command_apply(args: argparse.Namespace) -> int:
+    operations = plan(args, build_classifier(args))
+    if args.dry_run:
+        for operation in operations:
+            emit(operation_record(operation))
+        return 0
+
+    journal = None
+    if operations:
+        journal = MoveJournal.create()
+        journal.start(operations, args.root)
+    return run_moves(journal, operations, args.jobs, verify=args.verify)
+
+
+def find_journal(path: Optional[Path], statuses: Sequence[str]) -> Optional[MoveJournal]:
+    """The given journal, or the latest one in one of `statuses`."""
+    return MoveJournal(path) if path is not None else latest_journal(statuses)
+
+
+def command_resume(args: argparse.Namespace) -> int:
+    journal = find_journal(args.journal, (STATUS_INTERRUPTED,))
+    if journal is None:
+        print("erro: nenhuma execução interrompida", file=sys.stderr)
+        return 2
+    operations = journal.resume_operations()
+    if args.dry_run:
+        for operation in operations:
+            emit(operation_record(operation))
+        return 0
+    return run_moves(journal, operations, args.jobs, verify=args.verify)
+
+
+def command_undo(args: argparse.Namespace) -> int:
+    # An interrupted run can be undone as well, instead of resumed
+    journal = find_journal(args.journal, (STATUS_FINISHED, STATUS_INTERRUPTED))
+    if journal is None:
+        print("erro: nenhuma execução para desfazer", file=sys.stderr)
+        return 2
+    operations, conflicts = journal.undo_operations()
+    if args.dry_run:
+        for operation in operations:
+            emit(operation_record(operation))
+        return 0
+    return run_moves(journal, operations, args.jobs, undo=True, conflicts=conflicts, verify=args.verify)
+
+
+def command_extract(args: argparse.Namespace) -> int:
+    classifier = build_classifier(args)
+
+    def on_member(member: ExtractedMember) -> None:
+        emit({
+            "member": member.member,
+            "category": member.category,
+            "target": str(member.target) if member.target else None,
+            "ok": member.ok,
+            "error": member.error,
+        })
+
+    try:
+        report = extract_archive(
+            args.archive, classifier.get_category_for_name, args.target or args.archive.parent, on_member, args.remove
+        )
+    except ARCHIVE_ERRORS as error:
+        print(f"erro: {error}", file=sys.stderr)
+        return 2
+    emit({"summary": {
+        "extracted": len(report.extracted),
+        "failed": len(report.failures),
+        "removed": report.removed,
+    }})
+    return 1 if report.failures else 0
+
+
+def command_watch(args: argparse.Namespace) -> int:
+    # Imported here so the other commands do not pay for watchdog
+    from .core.watcher import main as watch_main
+
+    watch_main([str(folder) for folder in args.folders] + (["--existing"] if args.existing else []))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pastro",
+        description="Organizador de pastas sem interface gráfica. A saída é JSON Lines.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_scan_options(command: argparse.ArgumentParser) -> None:
+        command.add_argument("root", type=Path, help="pasta a organizar")
+        command.add_argument("--depth", type=int, default=0,
+                             help="profundidade máxima (0 = só a pasta; -1 = sem limite)")
+        command.add_argument("--include", action="append", default=[], help="glob de arquivos incluídos")
+        command.add_argument("--exclude", action="append", default=[], help="glob de arquivos ou pastas ignorados")
+        command.add_argument("--symlinks", choices=SYMLINK_POLICIES, default=SYMLINKS_FILES)
+        command.add_argument("--no-cache", action="store_true", help="não usa o cache de varredura")
+        command.add_argument("--rules", type=Path, help="arquivo de regras TOML ou JSON (padrão: o do usuário)")
+        command.add_argument("--archives", action="store_true",
+                             help="classifica arquivos zip e tar pelo conteúdo, sem extraí-los")
+
+    scan = commands.add_parser("scan", help="lista os arquivos e suas categorias")
+    add_scan_options(scan)
+    scan.set_defaults(handler=command_scan)
+
+    for name, help_text, handler in (
+        ("plan", "mostra as movimentações planejadas", command_plan),
+        ("apply", "organiza a pasta", command_apply),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        add_scan_options(command)
+        command.add_argument("--target", type=Path, help="pasta onde criar as categorias (padrão: a própria pasta)")
+        command.set_defaults(handler=handler)
+        if name == "apply":
+            command.add_argument("--jobs", type=int, default=4, help="cópias simultâneas entre dispositivos")
+            command.add_argument("--verify", action="store_true",
+                                 help="confere cada cópia entre dispositivos antes de apagar o original")
+            command.add_argument("--dry-run", action="store_true", help="apenas mostra o plano")
+
+    for name, help_text, default_help, handler in (
+        ("resume", "retoma uma execução interrompida", "a última interrompida", command_resume),
+        ("undo", "desfaz uma execução de apply", "a última", command_undo),
+    ):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("journal", type=Path, nargs="?", help=f"diário da execução (padrão: {default_help})")
+        command.add_argument("--jobs", type=int, default=4, help="cópias simultâneas entre dispositivos")
+        command.add_argument("--verify", action="store_true",
+                             help="confere cada cópia entre dispositivos antes de apagar o original")
+        command.add_argument("--dry-run", action="store_true", help="apenas mostra o plano")
+        command.set_defaults(handler=handler)
+
+    extract = commands.add_parser("extract", help="extrai um arquivo zip ou tar direto nas pastas das categorias")
+    extract.add_argument("archive", type=Path)
+    extract.add_argument("--target", type=Path, help="pasta onde criar as categorias (padrão: a do arquivo)")
+    extract.add_argument("--rules", type=Path, help="arquivo de regras TOML ou JSON (padrão: o do usuário)")
+    extract.add_argument("--remove", action="store_true", help="apaga o arquivo se tudo for extraído")
+    extract.set_defaults(handler=command_extract)
+
+    watch = commands.add_parser("watch", help="organiza continuamente os arquivos que chegam")
+    watch.add_argument("folders", nargs="+", type=Path)
+    watch.add_argument("--existing", action="store_true", help="organiza também os arquivos já presentes")
+    watch.set_defaults(handler=command_watch)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "depth", None) is not None and args.depth < 0:
+        args.depth = None
+    if args.handler in (command_plan, command_apply):
+        # Absolute paths in the plan and its journal, so the run can be undone from any folder
+        args.root = Path(os.path.abspath(args.root))
+        if args.target is not None:
+            args.target = Path(os.path.abspath(args.target))
+    try:
+        status = args.handler(args)
+        sys.stdout.flush()
+        return status
+    except BrokenPipeError:
+        # Output piped into a command that stopped reading, e.g. `head`
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
@@ -1,8 +1,51 @@
 """
 Core module for the Pastro application.
 Contains the main business logic and file operations.
+
+Submodules are imported on first access, to keep startup fast.
 """
 
-from .classifier import AutoClassifier
+import importlib
+
+_EXPORTS = {
+    'ArchiveInspector': '.archives',
+    'AsyncOrganizer': '.aio',
+    'AutoClassifier': '.classifier',
+    'CachingScanner': '.cache',
+    'extract_archive': '.archives',
+    'FileGroup': '.filetable',
+    'FileTable': '.filetable',
+    'MoveExecutor': '.mover',
+    'move_file': '.transfer',
+    'MoveJournal': '.journal',
+    'MoveOperation': '.mover',
+    'MoveReport': '.mover',
+    'MoveResult': '.mover',
+    'MovePlan': '.planner',
+    'OrganizeRoot': '.roots',
+    'plan_moves': '.planner',
+    'plan_roots': '.roots',
+    'plan_targets': '.planner',
+    'RootsExecutor': '.mover',
+    'Rule': '.rules',
+    'RuleMatcher': '.rules',
+    'ScanCache': '.cache',
+    'ScanEntry': '.scanner',
+    'SearchIndex': '.search',
+    'Scanner': '.scanner',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
 
-__all__ = ['AutoClassifier'] 
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,316 @@
+"""
+Asynchronous organizer for high-latency filesystems such as SMB or NFS
+mounts, where each stat, mkdir or rename costs a network round-trip: the
+blocking calls run in a thread pool, many of them in flight, driven by
+asyncio.
+
+The steps reuse the synchronous core: folders are listed by a `Scanner`,
+files classified by the `AutoClassifier`, sniffed by a `ContentSniffer` and
+planned by `plan_targets`. Filesystem calls go through a `FileSystem`;
+`LatencyFileSystem` delays each one, so a local folder behaves like a
+network mount in tests and benchmarks::
+
+    with AsyncOrganizer(classifier, fs=LatencyFileSystem(0.005), max_depth=None) as organizer:
+        report = asyncio.run(organizer.organize(folder))
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .classifier import AutoClassifier
+from .filetable import FileTable
+from .journal import MoveJournal
+from .mover import METHOD_COPY, METHOD_RENAME, MoveOperation, MoveReport, MoveResult
+from .planner import MovePlan, list_names, plan_targets
+from .scanner import Scanner
+from .sniffer import ContentSniffer
+from .transfer import move_file
+
+# Blocking calls in flight at once
+DEFAULT_CONCURRENCY = 32
+
+
+class FileSystem:
+    """The blocking calls of the asynchronous organizer, on the local filesystem."""
+
+    def scandir(self, folder: str):
+        return os.scandir(folder)
+
+    def stat(self, path) -> os.stat_result:
+        return os.stat(path)
+
+    def lstat(self, path) -> os.stat_result:
+        return os.lstat(path)
+
+    def listdir(self, folder) -> List[str]:
+        """Names in a folder; none if it does not exist (yet)."""
+        return list_names(folder)
+
+    def makedirs(self, folder) -> None:
+        os.makedirs(folder, exist_ok=True)
+
+    def rename(self, source, target) -> None:
+        os.rename(source, target)
+
+    def move(self, source, target) -> str:
+        """Move across filesystems: copy data and metadata, then remove the source; returns the copy method."""
+        return move_file(source, target)
+
+
+class LatencyFileSystem(FileSystem):
+    """
+    The local filesystem, sleeping `latency` seconds before every call like
+    the round-trip of a network mount. For tests and benchmarks.
+    """
+
+    def __init__(self, latency: float = 0.002):
+        self.latency = latency
+
+    def scandir(self, folder: str):
+        time.sleep(self.latency)
+        return super().scandir(folder)
+
+    def stat(self, path) -> os.stat_result:
+        time.sleep(self.latency)
+        return super().stat(path)
+
+    def lstat(self, path) -> os.stat_result:
+        time.sleep(self.latency)
+        return super().lstat(path)
+
+    def listdir(self, folder) -> List[str]:
+        time.sleep(self.latency)
+        return super().listdir(folder)
+
+    def makedirs(self, folder) -> None:
+        time.sleep(self.latency)
+        super().makedirs(folder)
+
+    def rename(self, source, target) -> None:
+        time.sleep(self.latency)
+        super().rename(source, target)
+
+    def move(self, source, target) -> str:
+        time.sleep(self.latency)
+        return super().move(source, target)
+
+
+class FileSystemScanner(Scanner):
+    """Scanner listing folders through a `FileSystem`."""
+
+    def __init__(self, fs: FileSystem, **options):
+        super().__init__(**options)
+        self.fs = fs
+
+    def _list(self, folder: str):
+        return self.fs.scandir(folder)
+
+
+class AsyncOrganizer:
+    """
+    Scans, classifies, plans and moves with up to `concurrency` blocking
+    calls in flight, in a pool of as many threads. The coroutines run in a
+    single event loop, where results are reported; the classifier is only
+    read, from the pool threads. Scanner options (`max_depth`, `include`...)
+    are given as keywords. `cancel` may be called from any thread.
+    """
+
+    def __init__(
+        self,
+        classifier: AutoClassifier,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        fs: Optional[FileSystem] = None,
+        **scanner_options,
+    ):
+        self.classifier = classifier
+        self.concurrency = concurrency
+        self.fs = fs or FileSystem()
+        self.scanner = FileSystemScanner(self.fs, **scanner_options)
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pastro-aio")
+        self._cancelled = False
+
+    def __enter__(self) -> "AsyncOrganizer":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+    def cancel(self) -> None:
+        """Start no more moves; the ones in flight still finish."""
+        self._cancelled = True
+
+    async def _run(self, function: Callable, *args):
+        """Call a blocking function in the pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._pool, function, *args)
+
+    async def _each(self, items: Iterable, handle: Callable[..., Awaitable]) -> None:
+        """Handle every item, `concurrency` at a time, without a task per item."""
+        iterator = iter(items)
+
+        async def worker() -> None:
+            for item in iterator:
+                if self._cancelled:
+                    return
+                await handle(item)
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    # Scan and classify
+
+    async def scan(self, root: Union[str, Path]) -> FileTable:
+        """Classified files under `root`, listing up to `concurrency` folders at once."""
+        root = os.fspath(root)
+        table = FileTable(self.classifier.categories)
+        visited = await self._run(self.scanner.visited_root, root)
+        folders: asyncio.Queue = asyncio.Queue()
+        folders.put_nowait((root, "", 0))
+
+        async def worker() -> None:
+            while True:
+                folder, prefix, depth = await folders.get()
+                try:
+                    files, subfolders = await self._run(self._list, folder, prefix, depth, visited)
+                except OSError as error:
+                    if self.scanner.on_error is not None:
+                        self.scanner.on_error(error)
+                else:
+                    for name, category in files:
+                        table.add(folder, name, category)
+                    for subfolder in subfolders:
+                        folders.put_nowait(subfolder)
+                finally:
+                    folders.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        joined = asyncio.create_task(folders.join())
+        try:
+            # Workers only stop by raising: the first error ends the scan
+            # instead of leaving the queue waiting for folders nobody lists
+            done, _ = await asyncio.wait([joined, *workers], return_when=asyncio.FIRST_COMPLETED)
+            for task in workers:
+                if task in done:
+                    task.result()
+        finally:
+            for task in (joined, *workers):
+                task.cancel()
+            await asyncio.gather(joined, *workers, return_exceptions=True)
+        return table
+
+    def _list(self, folder: str, prefix: str, depth: int, visited) -> Tuple[List[Tuple[str, str]], List]:
+        """(name, category) of the files of a folder, and its subfolders; runs in the pool."""
+        files, subfolders = self.scanner.list_folder(folder, prefix, depth, visited)
+        if self.classifier.needs_entry:
+            classify_entry = self.classifier.classify_entry
+            return [(entry.name, classify_entry(entry)) for entry, _ in files], subfolders
+        classify = self.classifier.get_category_for_name
+        return [(entry.name, classify(entry.name)) for entry, _ in files], subfolders
+
+    async def classify(self, table: FileTable, unknown: str = "Outros") -> FileTable:
+        """
+        Recognize by content the files of the `unknown` category, reading
+        `concurrency` of them at once. Reads go to the files directly, not
+        through the `FileSystem`.
+        """
+        sniffer = ContentSniffer(workers=self.concurrency)
+        await self._run(sniffer.reclassify_table, table, self.classifier.get_category_for_name, unknown)
+        return table
+
+    # Plan and apply
+
+    async def plan(self, classification: Dict[str, Iterable], target_root: Union[str, Path]) -> MovePlan:
+        """`plan_targets`, with the target folders all listed at once beforehand."""
+        target_root = Path(target_root)
+        folders = [target_root] + [target_root / category for category in classification]
+        names = await asyncio.gather(*(self._run(self.fs.listdir, folder) for folder in folders))
+        listings = dict(zip(folders, names))
+        return await self._run(plan_targets, classification, target_root, None, listings.__getitem__)
+
+    async def apply(
+        self,
+        plan: MovePlan,
+        progress: Optional[Callable[[MoveResult], None]] = None,
+        journal: Optional[MoveJournal] = None,
+    ) -> MoveReport:
+        """
+        Carry out a plan, `concurrency` moves at a time; target folders are
+        created first, each once. A new `journal` records the plan before
+        anything moves, then every move that completes.
+        """
+        operations = list(plan)
+        report = MoveReport()
+        start = time.perf_counter()
+        self._cancelled = False
+        on_result = progress
+        if journal is not None:
+            await self._run(journal.start, operations, plan.root)
+            on_result = journal.recorder(progress)
+
+        def finish(result: MoveResult) -> None:
+            report.add(result)
+            if on_result is not None:
+                on_result(result)
+
+        folders = list(dict.fromkeys(operation.target.parent for operation in operations))
+        prepared = await asyncio.gather(*(self._run(self._prepare, folder) for folder in folders), return_exceptions=True)
+        # Target folder -> its device, or why it could not be created
+        devices: Dict[Path, Union[int, BaseException]] = dict(zip(folders, prepared))
+
+        async def move(operation: MoveOperation) -> None:
+            device = devices[operation.target.parent]
+            if isinstance(device, BaseException):
+                finish(MoveResult(operation, False, 0, METHOD_RENAME, str(device)))
+            else:
+                finish(await self._run(self._move, operation, device))
+
+        try:
+            await self._each(operations, move)
+            report.cancelled = self._cancelled
+            if journal is not None and not report.cancelled:
+                journal.end()
+        finally:
+            if journal is not None:
+                journal.close()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def _prepare(self, folder: Path) -> int:
+        """Create a target folder and return its device; runs in the pool."""
+        self.fs.makedirs(folder)
+        return self.fs.stat(folder).st_dev
+
+    def _move(self, operation: MoveOperation, target_device: int) -> MoveResult:
+        """Rename within a device, copy across devices; runs in the pool."""
+        start = time.perf_counter()
+        size = 0
+        method = METHOD_RENAME
+        try:
+            stat = self.fs.lstat(operation.source)
+            size = stat.st_size
+            if stat.st_dev == target_device:
+                self.fs.rename(operation.source, operation.target)
+            else:
+                method = METHOD_COPY
+                method = self.fs.move(operation.source, operation.target)
+        except OSError as error:
+            return MoveResult(operation, False, size, method, str(error), time.perf_counter() - start)
+        return MoveResult(operation, True, size, method, None, time.perf_counter() - start)
+
+    async def organize(
+        self,
+        root: Union[str, Path],
+        target: Optional[Union[str, Path]] = None,
+        progress: Optional[Callable[[MoveResult], None]] = None,
+        journal: Optional[MoveJournal] = None,
+    ) -> MoveReport:
+        """Scan, classify, plan and move the files of `root` into `target`, or into itself."""
+        table = await self.scan(root)
+        await self.classify(table)
+        plan = await self.plan(table.classification(), target or root)
+        return await self.apply(plan, progress, journal)
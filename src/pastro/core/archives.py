@@ -0,0 +1,466 @@
+"""
+Archive contents: zip and tar archives are listed without extracting
+anything, so an archive that is mostly photos or documents can go with
+them, and can be extracted straight into the category folders.
+
+Zip archives are listed from their central directory, read one record at a
+time; tar archives header by header, compressed ones decompressed as a
+stream. Only counts and sizes per member extension are kept, and listing
+stops after `max_members` members, so memory stays bounded whatever the
+archive holds. Listing runs in a process pool (`ArchiveInspector`), which
+takes the decompression off the threads scanning the rest of the folder.
+"""
+
+import multiprocessing
+import os
+import shutil
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .classifier import split_suffix
+from .filetable import FileTable
+from .planner import _free_name, is_case_insensitive, list_names
+from .scanner import ScanEntry
+from .transfer import BUFFER_SIZE, PARTIAL_SUFFIX
+
+# Members read from an archive at most when listing it
+MAX_MEMBERS = 10_000
+# Share of the content (in bytes) a category needs for the archive to go with it
+DOMINANT_SHARE = 0.75
+# Folders of metadata some archivers add, never counted nor extracted
+IGNORED_FOLDERS = ("__MACOSX/",)
+
+PathLike = Union[str, Path]
+
+# Zip records, as in the APPNOTE: end of central directory, its zip64
+# locator and record, and central directory file headers
+_END = struct.Struct("<4s4H2LH")
+_END64_LOCATOR = struct.Struct("<4sLQL")
+_END64 = struct.Struct("<4sQ2H2L4Q")
+_CENTRAL = struct.Struct("<4s4B4HL2L5H2L")
+_EXTRA = struct.Struct("<2H")
+# Largest end of central directory record: fixed part and comment
+_END_SEARCH = _END.size + 0xFFFF
+# Flag of names encoded as UTF-8 (cp437 otherwise)
+_UTF8_FLAG = 0x800
+_ZIP64_EXTRA = 0x0001
+# Starts of the files a zip archive may follow: another zip record, or a
+# Windows executable (self-extracting archives)
+_ZIP_PREFIXES = (b"PK", b"MZ")
+# Magic of POSIX and GNU tar headers, and where it is in the first one
+_TAR_MAGIC = b"ustar"
+_TAR_MAGIC_OFFSET = 257
+
+# Errors of an archive that cannot be read, or is not an archive at all
+ARCHIVE_ERRORS = (OSError, ValueError, EOFError, zlib.error, tarfile.TarError, zipfile.BadZipFile)
+
+
+class ArchiveListing(NamedTuple):
+    """What an archive holds: (members, bytes) per lowercased member extension."""
+    extensions: Dict[str, Tuple[int, int]]
+    members: int
+    size: int  # Bytes of the members, uncompressed
+    complete: bool  # False when listing stopped at the member cap
+
+    def dominant(self, classify: Callable[[str], str], unknown: str = "Outros",
+                 share: float = DOMINANT_SHARE) -> Optional[str]:
+        """
+        The category `classify` gives to at least `share` of the content, by
+        size (by member count when all members are empty); None if there is
+        none, or if it is `unknown`.
+        """
+        weights: Dict[str, int] = {}
+        for extension, (count, size) in self.extensions.items():
+            category = classify("_" + extension) if extension else unknown
+            weights[category] = weights.get(category, 0) + (size if self.size else count)
+        total = sum(weights.values())
+        if not total:
+            return None
+        category, weight = max(weights.items(), key=lambda item: item[1])
+        if category == unknown or weight < share * total:
+            return None
+        return category
+
+
+def _member_name(name: str) -> str:
+    """Name of a member without its folders; empty for folders and unsafe names."""
+    name = name.replace("\\", "/").rsplit("/", 1)[-1]
+    return "" if name in (".", "..") else name
+
+
+def _ignored(name: str) -> bool:
+    return name.startswith(IGNORED_FOLDERS) or any(f"/{folder}" in name for folder in IGNORED_FOLDERS)
+
+
+def _zip_directory(file: BinaryIO) -> Optional[Tuple[int, int]]:
+    """Offset and number of records of the central directory of a zip file; None if it is not one."""
+    size = file.seek(0, os.SEEK_END)
+    tail_start = max(0, size - _END_SEARCH)
+    file.seek(tail_start)
+    tail = file.read()
+    position = tail.rfind(b"PK\x05\x06")
+    if position < 0 or len(tail) - position < _END.size:
+        return None
+    _, _, _, _, count, directory_size, offset, _ = _END.unpack_from(tail, position)
+    end = tail_start + position
+    if count == 0xFFFF or directory_size == 0xFFFFFFFF or offset == 0xFFFFFFFF:
+        if end < _END64_LOCATOR.size:
+            return None
+        file.seek(end - _END64_LOCATOR.size)
+        signature, _, record_offset, _ = _END64_LOCATOR.unpack(file.read(_END64_LOCATOR.size))
+        if signature != b"PK\x06\x07":
+            return None
+        file.seek(record_offset)
+        record = file.read(_END64.size)
+        if len(record) < _END64.size or not record.startswith(b"PK\x06\x06"):
+            return None
+        _, _, _, _, _, _, _, count, directory_size, offset = _END64.unpack(record)
+        end = record_offset
+    # Data before the archive (self-extracting archives) shifts every offset
+    shift = end - directory_size - offset
+    if shift < 0:
+        return None
+    if shift:
+        file.seek(0)
+        if file.read(2) not in _ZIP_PREFIXES:
+            return None  # A zip file inside another file, such as the last member of a tar
+    return offset + shift, count
+
+
+def _is_tar(file: BinaryIO) -> bool:
+    """Whether a file is an uncompressed POSIX or GNU tar archive."""
+    file.seek(_TAR_MAGIC_OFFSET)
+    return file.read(len(_TAR_MAGIC)) == _TAR_MAGIC
+
+
+def _zip64_size(extra: bytes) -> int:
+    """Uncompressed size from the zip64 extra field of a member."""
+    position = 0
+    while position + _EXTRA.size <= len(extra):
+        tag, length = _EXTRA.unpack_from(extra, position)
+        position += _EXTRA.size
+        if tag == _ZIP64_EXTRA and length >= 8:
+            return struct.unpack_from("<Q", extra, position)[0]
+        position += length
+    return 0
+
+
+def _zip_members(file: BinaryIO, max_members: int) -> Optional[Iterator[Tuple[str, int]]]:
+    """(name, size) of the members of a zip file, one central directory record at a time."""
+    directory = None if _is_tar(file) else _zip_directory(file)
+    if directory is None:
+        return None
+    offset, count = directory
+
+    def members() -> Iterator[Tuple[str, int]]:
+        file.seek(offset)
+        for _ in range(min(count, max_members)):
+            header = file.read(_CENTRAL.size)
+            if len(header) < _CENTRAL.size or not header.startswith(b"PK\x01\x02"):
+                raise zipfile.BadZipFile("diretório central truncado")
+            fields = _CENTRAL.unpack(header)
+            flags, size = fields[5], fields[11]
+            name_length, extra_length, comment_length = fields[12:15]
+            name = file.read(name_length).decode("utf-8" if flags & _UTF8_FLAG else "cp437", "replace")
+            extra = file.read(extra_length)
+            file.seek(comment_length, os.SEEK_CUR)
+            if size == 0xFFFFFFFF:
+                size = _zip64_size(extra)
+            yield name, size
+
+    return members()
+
+
+def _tar_members(path: PathLike, max_members: int) -> Iterator[Tuple[str, int]]:
+    """(name, size) of the regular files of a tar archive, compressed or not, header by header."""
+    with tarfile.open(path, "r:*") as archive:
+        for _ in range(max_members):
+            member = archive.next()
+            if member is None:
+                return
+            # Kept by tarfile for random access, which is never needed here
+            archive.members.clear()
+            yield (member.name, member.size) if member.isfile() else ("", 0)
+
+
+def _members(path: PathLike, max_members: int) -> Iterator[Tuple[str, int]]:
+    """(name, size) of the members of a zip or tar archive."""
+    with open(path, "rb") as file:
+        members = _zip_members(file, max_members)
+        if members is not None:
+            yield from members
+            return
+    yield from _tar_members(path, max_members)
+
+
+def list_archive(path: PathLike, max_members: int = MAX_MEMBERS) -> Optional[ArchiveListing]:
+    """
+    Member extensions of a zip or tar archive, from at most `max_members`
+    members; None if it is neither or cannot be read. Runs in worker processes.
+    """
+    extensions: Dict[str, List[int]] = {}
+    read = members = total = 0
+    try:
+        for name, size in _members(path, max_members):
+            read += 1
+            member = _member_name(name)
+            if not member or _ignored(name):
+                continue
+            counts = extensions.setdefault(split_suffix(member).lower(), [0, 0])
+            counts[0] += 1
+            counts[1] += size
+            members += 1
+            total += size
+    except ARCHIVE_ERRORS:
+        return None
+    return ArchiveListing(
+        {extension: (count, size) for extension, (count, size) in extensions.items()},
+        members, total, read < max_members,
+    )
+
+
+class ArchiveInspector:
+    """
+    Lists the archives of a scan in a process pool and moves the ones whose
+    content is mostly of one category there. Archives are the files of
+    `category`; they can be handed over while the scan is still running
+    (`submit_found`), and are listed meanwhile. Shared by threads planning
+    different folders; `close` ends the pool.
+    """
+
+    def __init__(
+        self,
+        category: str = "Compactados",
+        processes: Optional[int] = None,
+        max_members: int = MAX_MEMBERS,
+        share: float = DOMINANT_SHARE,
+    ):
+        self.category = category
+        self.processes = processes
+        self.max_members = max_members
+        self.share = share
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "ArchiveInspector":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._pending.clear()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    def submit(self, path: PathLike) -> None:
+        """Start listing an archive, unless it already was."""
+        path = os.fspath(path)
+        with self._lock:
+            if path in self._pending:
+                return
+            if self._pool is None:
+                # Created with the first archive; most folders have none. Spawned,
+                # since forking a process that runs threads (scanners, Qt) may deadlock
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            self._pending[path] = self._pool.submit(list_archive, path, self.max_members)
+
+    def submit_found(self, entries: Iterable[ScanEntry]) -> Iterator[ScanEntry]:
+        """Pass scanned files through, submitting the archives among them."""
+        category = self.category
+        for entry in entries:
+            if entry.category == category:
+                self.submit(entry.path)
+            yield entry
+
+    def listing(self, path: PathLike) -> Optional[ArchiveListing]:
+        """The listing of an archive, waiting for it; submitted now if it was not."""
+        path = os.fspath(path)
+        self.submit(path)
+        with self._lock:
+            future = self._pending.pop(path)
+        return future.result()
+
+    def reclassify_table(self, table: FileTable, classify: Callable[[str], str], unknown: str = "Outros") -> int:
+        """
+        Give the archives of a `FileTable` the category that dominates their
+        content, if any; returns how many changed category.
+        """
+        rows = table.rows_in(self.category)
+        for row in rows:
+            self.submit(table.path(row))
+        changed = 0
+        for row in rows:
+            listing = self.listing(table.path(row))
+            category = listing.dominant(classify, unknown, self.share) if listing is not None else None
+            if category is not None and category != self.category:
+                table.set_category(row, category)
+                changed += 1
+        return changed
+
+
+class ExtractedMember(NamedTuple):
+    """A member of an extracted archive and where it went, or why it did not."""
+    member: str
+    category: str
+    target: Optional[Path]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ExtractReport(NamedTuple):
+    members: List[ExtractedMember]
+    removed: bool  # Whether the archive was deleted afterwards
+
+    @property
+    def extracted(self) -> List[ExtractedMember]:
+        return [member for member in self.members if member.ok]
+
+    @property
+    def failures(self) -> List[ExtractedMember]:
+        return [member for member in self.members if not member.ok]
+
+
+# Members to extract: (name, opener of the content, modification time, and
+# why it is not extracted, if it is not)
+Entries = Iterator[Tuple[str, Callable[[], BinaryIO], float, Optional[str]]]
+
+
+def _zip_entries(path: PathLike) -> Entries:
+    now = time.time()
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            try:
+                mtime = datetime(*info.date_time).timestamp()
+            except (ValueError, OverflowError):
+                mtime = now  # Zeroed or invalid DOS date
+            yield info.filename, lambda info=info: archive.open(info), mtime, None
+
+
+def _tar_entries(path: PathLike, extracted: Dict[str, Path]) -> Entries:
+    """
+    Members of a tar archive. A hard link is copied from the file extracted
+    for its target, found in `extracted` (member name -> extracted file):
+    the stream cannot go back to the target's data.
+    """
+    def open_link(name: str) -> BinaryIO:
+        target = extracted.get(name)
+        if target is None:
+            raise OSError(f"O destino do link não foi extraído: {name}")
+        return open(target, "rb")
+
+    # A stream: members are read in order, and compressed data decompressed only once
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            archive.members.clear()
+            if member.isfile():
+                yield member.name, lambda member=member: archive.extractfile(member), member.mtime, None
+            elif member.islnk():
+                yield member.name, lambda member=member: open_link(member.linkname), member.mtime, None
+            elif member.issym():
+                yield member.name, None, member.mtime, "Links simbólicos não são extraídos"
+            elif not member.isdir():
+                yield member.name, None, member.mtime, "Arquivos especiais não são extraídos"
+
+
+def extract_archive(
+    path: PathLike,
+    classify: Callable[[str], str],
+    target_root: PathLike,
+    on_member: Optional[Callable[[ExtractedMember], None]] = None,
+    remove: bool = False,
+) -> ExtractReport:
+    """
+    Extract the files of a zip or tar archive into `target_root / category`,
+    each streamed from the archive to its folder, without its own folders. A
+    name taken in a category folder gets a free one, as when organizing. Each
+    member is written to a partial file, renamed once complete. Symbolic
+    links and special files are reported as not extracted. With `remove`,
+    the archive is deleted if every member was extracted.
+    Raises ValueError if it is neither a zip nor a tar archive.
+    """
+    target_root = Path(target_root)
+    with open(path, "rb") as file:
+        # A tar file may end with a zip member, which `zipfile` would take for the archive
+        is_zip = not _is_tar(file) and _zip_directory(file) is not None
+    # Member name -> extracted file, for the hard links of tar archives
+    extracted: Dict[str, Path] = {}
+    if is_zip:
+        entries = _zip_entries(path)
+    elif tarfile.is_tarfile(path):
+        entries = _tar_entries(path, extracted)
+    else:
+        raise ValueError(f"Formato de arquivo compactado não suportado: {path}")
+    key: Callable[[str], str] = str.casefold if is_case_insensitive(target_root, list_names(target_root)) else str
+    taken: Dict[str, set] = {}
+    members: List[ExtractedMember] = []
+
+    def report(result: ExtractedMember) -> None:
+        members.append(result)
+        if on_member is not None:
+            on_member(result)
+
+    for name, open_member, mtime, skipped in entries:
+        member_name = _member_name(name)
+        if not member_name or _ignored(name):
+            continue
+        category = classify(member_name)
+        if skipped is not None:
+            report(ExtractedMember(name, category, None, skipped))
+            continue
+        folder = target_root / category
+        names = taken.get(category)
+        if names is None:
+            names = taken[category] = {key(existing) for existing in list_names(folder)}
+        if key(member_name) in names:
+            member_name, _ = _free_name(member_name, 0, names, key)
+        names.add(key(member_name))
+        target = folder / member_name
+        partial = folder / (member_name + PARTIAL_SUFFIX)
+        created = False
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            try:
+                with open_member() as source, open(partial, "xb") as output:
+                    created = True
+                    shutil.copyfileobj(source, output, BUFFER_SIZE)
+                os.utime(partial, (mtime, mtime))
+                os.replace(partial, target)
+            except BaseException:
+                # A partial file that was there already belongs to someone else
+                if created:
+                    try:
+                        os.unlink(partial)
+                    except OSError:
+                        pass
+                raise
+        except (OSError, RuntimeError, NotImplementedError, zlib.error, tarfile.TarError, zipfile.BadZipFile) as error:
+            # Password-protected members and unsupported compressions raise RuntimeError and NotImplementedError
+            result = ExtractedMember(name, category, None, str(error))
+        else:
+            result = ExtractedMember(name, category, target)
+            extracted[name] = target
+        report(result)
+    removed = False
+    if remove and all(member.ok for member in members):
+        os.unlink(path)
+        removed = True
+    return ExtractReport(members, removed)
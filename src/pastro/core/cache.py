@@ -0,0 +1,337 @@
+"""
+Persistent scan cache, so unchanged folders are not listed or classified again.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .scanner import ScanEntry, Scanner
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    dir TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    device INTEGER NOT NULL,
+    category TEXT,
+    PRIMARY KEY (dir, name)
+) WITHOUT ROWID;
+"""
+
+# Entry kinds, as bit flags
+KIND_FILE = 1
+KIND_DIR = 2
+KIND_LINK = 4
+
+# Folders modified less than this many seconds before the scan are not cached,
+# since a change within the same mtime tick would go unnoticed
+RACY_SECONDS = 2.0
+
+# Changed folders written between two commits
+COMMIT_EVERY = 100
+
+
+def default_cache_path() -> Path:
+    """Location of the cache file in the user's cache folder."""
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    folder = Path(base) if base else Path.home() / ".cache"
+    return folder / "pastro" / "scan-cache.sqlite3"
+
+
+class CachedStat(NamedTuple):
+    """The subset of ``os.stat_result`` kept in the cache."""
+    st_size: int
+    st_mtime_ns: int
+    st_ino: int
+    st_dev: int
+
+    @property
+    def st_mtime(self) -> float:
+        return self.st_mtime_ns / 1e9
+
+
+class CachedEntry:
+    """
+    A ``os.DirEntry`` look-alike rebuilt from the cache. `stat` returns the
+    cached size and mtime until `expire` is called: a file edited in place
+    changes them without changing its folder's mtime, so whatever depends on
+    them asks the filesystem again (rules on size or age, duplicates, moves).
+    """
+    __slots__ = ("name", "path", "kind", "category", "_stat", "_stale")
+
+    def __init__(self, folder: str, name: str, kind: int, stat: CachedStat, category: Optional[str]):
+        self.name = name
+        self.path = os.path.join(folder, name)
+        self.kind = kind
+        self.category = category
+        self._stat: Union[CachedStat, os.stat_result] = stat
+        self._stale = False
+
+    def is_file(self, follow_symlinks: bool = True) -> bool:
+        return bool(self.kind & KIND_FILE) and (follow_symlinks or not self.kind & KIND_LINK)
+
+    def is_dir(self, follow_symlinks: bool = True) -> bool:
+        return bool(self.kind & KIND_DIR) and (follow_symlinks or not self.kind & KIND_LINK)
+
+    def is_symlink(self) -> bool:
+        return bool(self.kind & KIND_LINK)
+
+    def inode(self) -> int:
+        return self._stat.st_ino
+
+    def stat(self, follow_symlinks: bool = True) -> Union[CachedStat, os.stat_result]:
+        """The cached stat result, or the file's current one once `expire`d."""
+        if not follow_symlinks and self.kind & KIND_LINK:
+            return os.lstat(self.path)
+        if self._stale:
+            self._stat = os.stat(self.path)
+            self._stale = False
+        return self._stat
+
+    def expire(self) -> None:
+        """Make the next `stat` ask the filesystem, once."""
+        self._stale = True
+
+    def __fspath__(self) -> str:
+        return self.path
+
+
+class ScanCache:
+    """
+    SQLite store of folder listings keyed by folder mtime.
+    A folder is listed again only when its mtime changed; cached categories are
+    dropped when the classifier rules hash changes, without listing anything again.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else default_cache_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Shared by the GUI thread and the workers, serialized by the lock
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def use_rules(self, rules_hash: str) -> None:
+        """Forget cached categories if they were computed with other rules."""
+        with self._lock, self._connection:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'rules_hash'").fetchone()
+            if row and row[0] == rules_hash:
+                return
+            self._connection.execute("UPDATE entries SET category = NULL WHERE category IS NOT NULL")
+            self._connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rules_hash', ?)", (rules_hash,)
+            )
+
+    def listing(self, folder: str, mtime_ns: int) -> Optional[List[CachedEntry]]:
+        """Cached entries of a folder, or None if the folder changed since it was cached."""
+        with self._lock:
+            row = self._connection.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (folder,)).fetchone()
+            if row is None or row[0] != mtime_ns:
+                return None
+            rows = self._connection.execute(
+                "SELECT name, kind, size, mtime_ns, inode, device, category FROM entries WHERE dir = ?",
+                (folder,),
+            ).fetchall()
+        return [
+            CachedEntry(folder, name, kind, CachedStat(size, entry_mtime, inode, device), category)
+            for name, kind, size, entry_mtime, inode, device, category in rows
+        ]
+
+    def store(self, folder: str, mtime_ns: int, rows: List[Tuple], commit: bool = True) -> None:
+        """
+        Replace the cached listing of a folder.
+        Rows are (name, kind, size, mtime_ns, inode, device, category).
+        """
+        with self._lock:
+            connection = self._connection
+            previous = {
+                name for name, kind in connection.execute(
+                    "SELECT name, kind FROM entries WHERE dir = ?", (folder,)
+                ) if kind & KIND_DIR
+            }
+            current = {row[0] for row in rows if row[1] & KIND_DIR}
+            # Folders that disappeared take their whole cached subtree with them
+            for name in previous - current:
+                self._forget_tree(os.path.join(folder, name))
+            connection.execute("DELETE FROM entries WHERE dir = ?", (folder,))
+            connection.executemany(
+                "INSERT INTO entries (dir, name, kind, size, mtime_ns, inode, device, category)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(folder, *row) for row in rows],
+            )
+            connection.execute("INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)", (folder, mtime_ns))
+            if commit:
+                connection.commit()
+
+    def set_categories(self, folder: str, categories: List[Tuple[str, str]]) -> None:
+        """Store categories computed for cached entries, as (name, category) pairs."""
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "UPDATE entries SET category = ? WHERE dir = ? AND name = ?",
+                [(category, folder, name) for name, category in categories],
+            )
+
+    def commit(self) -> None:
+        with self._lock:
+            self._connection.commit()
+
+    def _forget_tree(self, folder: str) -> None:
+        """Delete a folder and everything below it. The lock must be held."""
+        # Every descendant path sorts between "folder/" and "folder0" ("0" follows "/")
+        low, high = folder + os.sep, folder + chr(ord(os.sep) + 1)
+        for table, column in (("entries", "dir"), ("dirs", "path")):
+            self._connection.execute(
+                f"DELETE FROM {table} WHERE {column} = ? OR ({column} >= ? AND {column} < ?)",
+                (folder, low, high),
+            )
+
+
+class _RecordingListing:
+    """Wraps ``os.scandir`` and stores the listing once it was fully read."""
+
+    def __init__(self, scanner: "CachingScanner", folder: str, mtime_ns: int, cacheable: bool):
+        self.scanner = scanner
+        self.folder = folder
+        self.mtime_ns = mtime_ns
+        self.cacheable = cacheable
+        self.rows: List[Tuple] = []
+        self.complete = False
+        self._listing = os.scandir(folder)
+
+    def __enter__(self):
+        return self
+
+    def __iter__(self):
+        classify = self.scanner.classify
+        for entry in self._listing:
+            if self.cacheable:
+                try:
+                    kind = (KIND_FILE if entry.is_file() else 0) | (KIND_DIR if entry.is_dir() else 0)
+                    kind |= KIND_LINK if entry.is_symlink() else 0
+                    stat = entry.stat() if kind & (KIND_FILE | KIND_DIR) else None
+                except OSError:
+                    self.cacheable = False
+                else:
+                    category = classify(entry.name) if kind & KIND_FILE else None
+                    self.rows.append((
+                        entry.name, kind,
+                        stat.st_size if stat else 0, stat.st_mtime_ns if stat else 0,
+                        stat.st_ino if stat else 0, stat.st_dev if stat else 0,
+                        category,
+                    ))
+            yield entry
+        self.complete = True
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._listing.close()
+        if exc_type is None and self.complete and self.cacheable:
+            self.scanner.stored_folder(self.folder, self.mtime_ns, self.rows)
+        return False
+
+
+class CachingScanner(Scanner):
+    """
+    Scanner that reads unchanged folders from a `ScanCache`.
+    `classify` and `rules_hash` must describe the same classifier rules.
+    """
+
+    def __init__(
+        self,
+        cache: ScanCache,
+        classify: Callable[[str], str],
+        rules_hash: str,
+        **options,
+    ):
+        super().__init__(**options)
+        self.cache = cache
+        self.classify = classify
+        self.rules_hash = rules_hash
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._pending_commits = 0
+
+    def _list(self, folder: str):
+        stat = os.stat(folder)
+        cached = self.cache.listing(folder, stat.st_mtime_ns)
+        if cached is not None:
+            self.cache_hits += 1
+            return _CachedListing(self, folder, cached)
+        self.cache_misses += 1
+        cacheable = time.time() - stat.st_mtime >= RACY_SECONDS
+        return _RecordingListing(self, folder, stat.st_mtime_ns, cacheable)
+
+    def stored_folder(self, folder: str, mtime_ns: int, rows: List[Tuple]) -> None:
+        """Store a listing, committing every `COMMIT_EVERY` folders."""
+        self._pending_commits += 1
+        commit = self._pending_commits >= COMMIT_EVERY
+        if commit:
+            self._pending_commits = 0
+        self.cache.store(folder, mtime_ns, rows, commit=commit)
+
+    def walk(self, root: Union[str, Path]) -> Iterator[Tuple[os.DirEntry, int]]:
+        self.cache.use_rules(self.rules_hash)
+        try:
+            yield from super().walk(root)
+        finally:
+            self.cache.commit()
+
+    def scan(
+        self, root: Union[str, Path], classify: Optional[Callable] = None, by_entry: bool = False
+    ) -> Iterator[ScanEntry]:
+        """
+        Like `Scanner.scan`, reusing cached categories. `classify` defaults to the cache's.
+        With `by_entry` cached categories are not used, since they depend on the name
+        only; rules on size or age get the files' current stat results.
+        """
+        if by_entry:
+            for entry, depth in self.walk(root):
+                if isinstance(entry, CachedEntry):
+                    entry.expire()
+                yield ScanEntry(entry, depth, classify(entry))
+            return
+        classify = classify or self.classify
+        for entry, depth in self.walk(root):
+            category = entry.category if isinstance(entry, CachedEntry) else None
+            yield ScanEntry(entry, depth, category or classify(entry.name))
+
+
+class _CachedListing:
+    """Cached entries of a folder; categories missing after a rules change are filled in."""
+
+    def __init__(self, scanner: CachingScanner, folder: str, entries: List[CachedEntry]):
+        self.scanner = scanner
+        self.folder = folder
+        self.entries = entries
+
+    def __enter__(self):
+        missing = [entry for entry in self.entries if entry.category is None and entry.kind & KIND_FILE]
+        if missing:
+            for entry in missing:
+                entry.category = self.scanner.classify(entry.name)
+            self.scanner.cache.set_categories(self.folder, [(entry.name, entry.category) for entry in missing])
+        return iter(self.entries)
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
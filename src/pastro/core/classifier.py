@@ -2,15 +2,54 @@
 File classifier module for automatically categorizing files.
 """
 
+import hashlib
+import json
+import os
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Union
+
+from .filetable import FileTable
+from .scanner import ScanEntry, Scanner
+
+if TYPE_CHECKING:
+    # Only for annotations: rules depend on this module
+    from .archives import ArchiveInspector
+    from .metrics import Metrics
+    from .rules import Rule, RuleMatcher
+
+FileEntry = Union[str, os.DirEntry]
+
+
+def split_suffix(name: str) -> str:
+    """Return the suffix of a file name with the same rules as ``Path.suffix``."""
+    index = name.rfind(".")
+    if 0 < index < len(name) - 1:
+        return name[index:]
+    return ""
+
 
 class AutoClassifier:
-    """Automatic file classifier based on extensions."""
-    
+    """
+    Automatic file classifier based on extensions, optionally refined by
+    declarative rules (see ``pastro.core.rules``) on names, sizes, ages and
+    folders. Rules and extension lists are tried by decreasing priority,
+    then in the order of the rules file; categories and rules added since
+    come last.
+    """
+
     def __init__(self):
         self.categories: Dict[str, Set[str]] = {}
-    
+        # Inverted index extension -> category, kept in sync with `categories`
+        self._extension_index: Dict[str, str] = {}
+        # Rules beyond a plain list of extensions
+        self.rules: List["Rule"] = []
+        # Order of the rules file: rules, and category names standing for
+        # their extension list in `categories`
+        self._order: List[Union[str, "Rule"]] = []
+        # File the rules were loaded from, and where changes are saved
+        self.rules_path: Optional[Path] = None
+        self._matcher: Optional["RuleMatcher"] = None
+
     def load_default_categories(self):
         """Load default categories and their extensions."""
         self.categories = {
@@ -25,28 +64,235 @@ class AutoClassifier:
             "Executáveis": {".exe", ".msi", ".bat", ".sh"},
             "Outros": set()  # Categoria padrão para extensões não reconhecidas
         }
-    
+        self.rules = []
+        self._order = []
+        self._rebuild_index()
+
+    def load_rules(self, path: Optional[Path] = None) -> None:
+        """
+        Load the rules file at `path`, by default the user's, if any. Without
+        one, the default categories are loaded and changes go to a new JSON
+        file. Raises ValueError for invalid rules and OSError if unreadable.
+        """
+        from .rules import RULES_FILE_NAMES, default_rules_folder, find_rules_file, load_rules_file
+
+        path = path or find_rules_file()
+        if path is None or not path.exists():
+            self.load_default_categories()
+            self.rules_path = path or default_rules_folder() / RULES_FILE_NAMES[-1]
+            return
+
+        categories: Dict[str, Set[str]] = {}
+        rules = []
+        order: List[Union[str, "Rule"]] = []
+        for rule in load_rules_file(path):
+            if rule.extension_only:
+                # Lists of the same category are joined where the first one is
+                if rule.category not in order:
+                    order.append(rule.category)
+                categories.setdefault(rule.category, set()).update(rule.extensions)
+            else:
+                categories.setdefault(rule.category, set())
+                rules.append(rule)
+                order.append(rule)
+        categories.setdefault("Outros", set())
+        self.categories = categories
+        self.rules = rules
+        self._order = order
+        self.rules_path = path
+        self._rebuild_index()
+
+    def save_rules(self, path: Optional[Path] = None) -> None:
+        """Save the categories and rules, by default where they were loaded from."""
+        from .rules import default_rules_folder, save_rules_file
+
+        path = path or self.rules_path or default_rules_folder() / "rules.json"
+        save_rules_file(path, self.ordered_rules())
+        self.rules_path = path
+
     def add_category(self, name: str, extensions: List[str]) -> None:
         """Add a new category with its extensions."""
         # Ensure extensions start with dot
         extensions_set = {ext if ext.startswith(".") else f".{ext}" for ext in extensions}
+        previous = self.categories.get(name, set())
         self.categories[name] = extensions_set
-    
+        self._update_index(name, previous, extensions_set)
+        self._matcher = None
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the extension index from scratch."""
+        index: Dict[str, str] = {}
+        for category, extensions in self.categories.items():
+            for extension in extensions:
+                # The first category declaring an extension wins, as in a linear scan
+                index.setdefault(extension, category)
+        self._extension_index = index
+        self._matcher = None
+
+    def _update_index(self, name: str, previous: Set[str], current: Set[str]) -> None:
+        """Update the index after the extensions of a single category changed."""
+        order = {category: position for position, category in enumerate(self.categories)}
+        position = order[name]
+
+        # Extensions removed from the category fall back to the next owner, if any
+        for extension in previous - current:
+            if self._extension_index.get(extension) != name:
+                continue
+            del self._extension_index[extension]
+            for category, extensions in self.categories.items():
+                if extension in extensions:
+                    self._extension_index[extension] = category
+                    break
+
+        # New extensions are claimed unless an earlier category already owns them
+        for extension in current - previous:
+            owner = self._extension_index.get(extension)
+            if owner is None or order[owner] > position:
+                self._extension_index[extension] = name
+
+    def config_hash(self) -> str:
+        """Hash of the category rules, to detect when cached classifications are stale."""
+        rules = [rule.to_dict() for rule in self.ordered_rules()]
+        return hashlib.sha1(json.dumps(rules).encode("utf-8")).hexdigest()
+
+    def ordered_rules(self) -> List["Rule"]:
+        """
+        The extension lists of `categories` as rules, with the other rules, in
+        the order of the rules file; categories and rules not in it follow.
+        """
+        from .rules import Rule
+
+        ordered: List["Rule"] = []
+        placed: Set[Union[str, int]] = set()
+        for item in [*self._order, *self.categories, *self.rules]:
+            key = item if isinstance(item, str) else id(item)
+            if key in placed:
+                continue
+            placed.add(key)
+            if not isinstance(item, str):
+                ordered.append(item)
+            elif self.categories.get(item):
+                ordered.append(Rule(item, extensions=frozenset(self.categories[item])))
+        return ordered
+
+    def matcher(self) -> "RuleMatcher":
+        """The categories and rules compiled together; rebuilt after a change."""
+        if self._matcher is None:
+            from .rules import RuleMatcher
+
+            self._matcher = RuleMatcher(self.ordered_rules())
+        return self._matcher
+
+    @property
+    def needs_entry(self) -> bool:
+        """Whether some rule looks at sizes, ages or folders, not only names."""
+        return bool(self.rules) and self.matcher().needs_entry
+
     def get_category_for_extension(self, extension: str) -> str:
         """Get the category for a given file extension."""
-        extension = extension.lower()
-        for category, extensions in self.categories.items():
-            if extension in extensions:
-                return category
-        return "Outros"
-    
+        if self.rules:
+            return self.matcher().classify_name("_" + extension)
+        return self._extension_index.get(extension.lower(), "Outros")
+
+    def get_category_for_name(self, name: str) -> str:
+        """Get the category for a file name. Rules on sizes, ages or folders never match."""
+        if self.rules:
+            return self.matcher().classify_name(name)
+        return self._extension_index.get(split_suffix(name).lower(), "Outros")
+
+    def classify_entry(self, entry) -> str:
+        """Category of a DirEntry-like file, using the stat result it holds."""
+        if self.rules:
+            return self.matcher().classify(entry)
+        return self._extension_index.get(split_suffix(entry.name).lower(), "Outros")
+
+    def scan(self, scanner: Scanner, root: Union[str, Path], metrics: Optional["Metrics"] = None) -> Iterator[ScanEntry]:
+        """
+        Classified files under `root`. Rules on sizes or ages use the metadata
+        the scanner already has, so no file is stat'ed twice. With `metrics`,
+        classification latencies go to the "varredura" phase.
+        """
+        by_entry = self.needs_entry
+        classify = self.classify_entry if by_entry else self.get_category_for_name
+        if metrics is not None:
+            classify = metrics.timed("varredura", "classificação", classify)
+        return scanner.scan(root, classify, by_entry=by_entry)
+
+    def classify_table(
+        self,
+        scanner: Scanner,
+        root: Union[str, Path],
+        metrics: Optional["Metrics"] = None,
+        stat: bool = True,
+        table: Optional[FileTable] = None,
+        archives: Optional["ArchiveInspector"] = None,
+    ) -> FileTable:
+        """
+        Classified files under `root` as a `FileTable`, every category present
+        even when empty, or added to `table`. With `stat`, sizes and
+        modification times are kept; for folders read from the scan cache
+        they are the cached ones, unless rules on size or age needed the
+        current ones. Duplicate detection and moves stat the files again.
+        Archives found are handed to `archives`, to be listed while the scan goes on.
+        """
+        if table is None:
+            table = FileTable(self.categories)
+        entries = self.scan(scanner, root, metrics)
+        if archives is not None:
+            entries = archives.submit_found(entries)
+        if stat:
+            add = table.add_entry
+            for entry in entries:
+                add(entry.entry, entry.category)
+        else:
+            add = table.add_path
+            for entry in entries:
+                add(entry.path, entry.category)
+        return table
+
     def classify_files(self, files: List[Path]) -> Dict[str, List[Path]]:
         """Classify a list of files into categories."""
         classification: Dict[str, List[Path]] = {category: [] for category in self.categories}
-        
+        if self.needs_entry:
+            from .rules import PathEntry
+
+            classify = self.matcher().classify
+            for file_path in files:
+                classification.setdefault(classify(PathEntry(file_path)), []).append(file_path)
+            return classification
+
+        if self.rules:
+            classify = self.matcher().classify_name
+            for file_path in files:
+                classification.setdefault(classify(file_path.name), []).append(file_path)
+            return classification
+
+        index = self._extension_index
         for file_path in files:
-            extension = file_path.suffix.lower()
-            category = self.get_category_for_extension(extension)
-            classification[category].append(file_path)
-        
-        return classification 
\ No newline at end of file
+            category = index.get(file_path.suffix.lower(), "Outros")
+            classification.setdefault(category, []).append(file_path)
+
+        return classification
+
+    def classify_names(
+        self, entries: Iterable[FileEntry]
+    ) -> Dict[str, List[FileEntry]]:
+        """
+        Classify file names or ``os.DirEntry`` objects without building ``Path`` objects.
+        The entries are returned grouped by category, as given.
+        """
+        classification: Dict[str, List[FileEntry]] = {category: [] for category in self.categories}
+        if self.rules:
+            matcher = self.matcher()
+            for entry in entries:
+                category = matcher.classify_name(entry) if isinstance(entry, str) else matcher.classify(entry)
+                classification.setdefault(category, []).append(entry)
+            return classification
+
+        index = self._extension_index
+        for entry in entries:
+            name = entry if isinstance(entry, str) else entry.name
+            category = index.get(split_suffix(name).lower(), "Outros")
+            classification.setdefault(category, []).append(entry)
+
+        return classification
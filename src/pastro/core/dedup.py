@@ -0,0 +1,207 @@
+"""
+Duplicate detection by content: size buckets, then a partial hash, then a full hash.
+"""
+
+import hashlib
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from .filetable import FileTable
+
+# What to do with duplicates when organizing
+DUPLICATES_MOVE = "move"  # Move them like any other file
+DUPLICATES_SKIP = "skip"  # Leave them where they are
+DUPLICATES_LINK = "link"  # Replace them with a link to the organized original
+
+DUPLICATE_POLICIES = (DUPLICATES_MOVE, DUPLICATES_SKIP, DUPLICATES_LINK)
+
+# Bytes read from the start and from the end of a file for the partial hash
+SAMPLE_SIZE = 16 * 1024
+# Files at least this large are hashed through mmap
+MMAP_THRESHOLD = 4 * 1024 * 1024
+# Full hashing only goes to a process pool above this many bytes
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+PathLike = Union[str, Path]
+
+
+class DuplicateGroup(NamedTuple):
+    """Files with identical content; `original` is the oldest one."""
+    original: Path
+    duplicates: List[Path]
+    size: int
+
+
+def partial_hash(path: PathLike, size: int) -> bytes:
+    """Hash of the first and last `SAMPLE_SIZE` bytes; the whole content for small files."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as file:
+        digest.update(file.read(SAMPLE_SIZE))
+        if size > 2 * SAMPLE_SIZE:
+            file.seek(-SAMPLE_SIZE, os.SEEK_END)
+        digest.update(file.read(SAMPLE_SIZE))
+    return digest.digest()
+
+
+def full_hash(path: PathLike) -> Tuple[PathLike, Optional[bytes]]:
+    """Hash of the whole content; None if the file cannot be read. Runs in worker processes."""
+    digest = hashlib.blake2b(digest_size=32)
+    try:
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size >= MMAP_THRESHOLD:
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    view = memoryview(mapped)
+                    try:
+                        for offset in range(0, size, CHUNK_SIZE):
+                            digest.update(view[offset:offset + CHUNK_SIZE])
+                    finally:
+                        view.release()
+            else:
+                for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+    except (OSError, ValueError):
+        return path, None
+    return path, digest.digest()
+
+
+def find_duplicates(
+    files: Iterable[Path],
+    processes: Optional[int] = None,
+    min_size: int = 1,
+) -> List[DuplicateGroup]:
+    """
+    Group files with identical content.
+
+    Only files sharing their size are read, and only their first and last
+    bytes unless those match too. Empty files (below `min_size`) are ignored.
+    """
+    # 1. Size buckets
+    by_size: Dict[int, List[Tuple[Path, float]]] = {}
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size >= min_size:
+            by_size.setdefault(stat.st_size, []).append((path, stat.st_mtime))
+
+    return _duplicates_by_size(by_size, processes)
+
+
+def find_table_duplicates(
+    table: FileTable,
+    processes: Optional[int] = None,
+    min_size: int = 1,
+) -> List[DuplicateGroup]:
+    """
+    `find_duplicates` for the files of a `FileTable`. Every row is stat'ed
+    and bucketed by the size it has now, not the one stored by the scan:
+    files may have changed since, and a stale size would hide a duplicate.
+    """
+    by_size: Dict[int, List[Tuple[PathLike, float]]] = {}
+    for row in range(len(table)):
+        path = table.path(row)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        if stat.st_size >= min_size:
+            by_size.setdefault(stat.st_size, []).append((path, stat.st_mtime))
+    return _duplicates_by_size(by_size, processes)
+
+
+def _duplicates_by_size(
+    by_size: Dict[int, List[Tuple[PathLike, float]]], processes: Optional[int]
+) -> List[DuplicateGroup]:
+    """Steps 2 and 3 of `find_duplicates`: (path, modification time) pairs bucketed by size."""
+    # 2. Partial hash within each bucket
+    candidates: List[Tuple[int, List[Tuple[PathLike, float]]]] = []
+    groups: List[DuplicateGroup] = []
+    for size, bucket in by_size.items():
+        if len(bucket) < 2:
+            continue
+        by_sample: Dict[bytes, List[Tuple[PathLike, float]]] = {}
+        for path, mtime in bucket:
+            try:
+                by_sample.setdefault(partial_hash(path, size), []).append((path, mtime))
+            except OSError:
+                continue
+        for same in by_sample.values():
+            if len(same) < 2:
+                continue
+            if size <= 2 * SAMPLE_SIZE:
+                # The sample already covered the whole content
+                groups.append(_group(same, size))
+            else:
+                candidates.append((size, same))
+
+    # 3. Full hash of the remaining candidates
+    to_hash = [path for _, same in candidates for path, _ in same]
+    total_bytes = sum(size * len(same) for size, same in candidates)
+    if total_bytes >= PARALLEL_THRESHOLD and len(to_hash) > 1:
+        # Spawned: forking a process that runs threads (scanners, Qt) may deadlock
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as pool:
+            hashes = dict(pool.map(full_hash, to_hash, chunksize=16))
+    else:
+        hashes = dict(map(full_hash, to_hash))
+
+    for size, same in candidates:
+        by_hash: Dict[bytes, List[Tuple[PathLike, float]]] = {}
+        for path, mtime in same:
+            digest = hashes.get(path)
+            if digest is not None:
+                by_hash.setdefault(digest, []).append((path, mtime))
+        groups.extend(_group(identical, size) for identical in by_hash.values() if len(identical) > 1)
+
+    return groups
+
+
+def _group(files: List[Tuple[PathLike, float]], size: int) -> DuplicateGroup:
+    """The oldest file is kept as the original; names break ties, shortest first."""
+    ordered = sorted(files, key=lambda item: (item[1], len(os.path.basename(item[0])), str(item[0])))
+    return DuplicateGroup(Path(ordered[0][0]), [Path(path) for path, _ in ordered[1:]], size)
+
+
+def without_duplicates(
+    classification: Dict[str, List[Path]], groups: Sequence[DuplicateGroup]
+) -> Dict[str, List[Path]]:
+    """The classification minus every duplicate, which then stays where it is."""
+    duplicates = {path for group in groups for path in group.duplicates}
+    if not duplicates:
+        return classification
+    return {
+        category: [path for path in files if path not in duplicates]
+        for category, files in classification.items()
+    }
+
+
+def link_duplicates(groups: Sequence[DuplicateGroup], moved: Dict[Path, Path]) -> List[Tuple[Path, str]]:
+    """
+    Replace each duplicate with a hard link to its original at its new place
+    (`moved` maps sources to targets), or a symbolic link across filesystems.
+    Returns the (duplicate, error) pairs that failed.
+    """
+    failures = []
+    for group in groups:
+        original = moved.get(group.original, group.original)
+        for duplicate in group.duplicates:
+            temporary = duplicate.with_name(f".{duplicate.name}.pastro-link")
+            try:
+                try:
+                    os.link(original, temporary)
+                except OSError:
+                    os.symlink(os.path.abspath(original), temporary)
+                os.replace(temporary, duplicate)
+            except OSError as error:
+                failures.append((duplicate, str(error)))
+                try:
+                    os.unlink(temporary)
+                except OSError:
+                    pass
+    return failures
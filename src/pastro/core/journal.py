@@ -0,0 +1,333 @@
+"""
+Move journal: an append-only record of the planned and completed moves of a run,
+so an interrupted run can be resumed and a finished one undone.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from .cache import default_cache_path
+from .mover import MoveExecutor, MoveOperation, MoveReport, MoveResult
+
+JOURNAL_SUFFIX = ".journal"
+
+# Record types
+RECORD_RUN = "run"            # Header: root folder and creation time
+RECORD_PLAN = "plan"          # A planned move, numbered by its position
+RECORD_DONE = "done"          # A planned move that completed
+RECORD_END = "end"            # Every planned move was attempted
+RECORD_CANCELLED = "cancelled"  # The run was cancelled, or not resumed: it is over as well
+RECORD_UNDONE = "undone"      # A completed move that was reversed
+RECORD_UNDO_END = "undo-end"  # Every completed move was reversed
+
+# Completion records are written and synced in batches: at most this many
+# records, or this many seconds, may be lost in a crash. Replaying the journal
+# checks the files themselves, so lost records are recovered.
+SYNC_EVERY = 1000
+SYNC_INTERVAL = 1.0
+
+# Status of a journal
+STATUS_INTERRUPTED = "interrupted"
+STATUS_FINISHED = "finished"
+STATUS_UNDONE = "undone"
+
+# Shared encoder: `json.dumps` with options builds a new one on every call
+_encode = json.JSONEncoder(ensure_ascii=False).encode
+
+
+def default_journal_folder() -> Path:
+    """Folder of the journals, next to the scan cache."""
+    return default_cache_path().parent / "journals"
+
+
+def list_journals(folder: Optional[Path] = None) -> List[Path]:
+    """Journals in a folder, oldest first (their names sort by creation time)."""
+    folder = folder or default_journal_folder()
+    if not folder.exists():
+        return []
+    return sorted(folder.glob(f"*{JOURNAL_SUFFIX}"))
+
+
+def latest_journal(statuses: Sequence[str], folder: Optional[Path] = None) -> Optional["MoveJournal"]:
+    """The most recent journal in one of `statuses`."""
+    for path in reversed(list_journals(folder)):
+        journal = MoveJournal(path)
+        try:
+            status = journal.state().status
+        except OSError:
+            continue
+        if status in statuses:
+            return journal
+    return None
+
+
+class JournalState(NamedTuple):
+    """Contents of a journal."""
+    root: Optional[Path]
+    operations: List[MoveOperation]
+    done: Set[int]
+    undone: Set[int]
+    finished: bool
+    undo_finished: bool
+
+    @property
+    def status(self) -> str:
+        if self.undo_finished:
+            return STATUS_UNDONE
+        return STATUS_FINISHED if self.finished else STATUS_INTERRUPTED
+
+
+def _sync_folder(folder: Path) -> None:
+    """Make a new file's directory entry durable; not possible on every platform."""
+    try:
+        descriptor = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+class MoveJournal:
+    """
+    Journal of one run. Plans are synced before any file moves; completion
+    records are batched (see `SYNC_EVERY`). Not thread-safe: records are
+    written from the thread that receives the executor's results.
+    """
+
+    def __init__(self, path: Path, sync_every: int = SYNC_EVERY, sync_interval: float = SYNC_INTERVAL):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = None
+        self._buffer: List[str] = []
+        self._last_sync = 0.0
+        # Completion records written by the current `recorder`
+        self.recorded = 0
+        # Root folder and planned operations, once written or read
+        self.root: Optional[Path] = None
+        self._operations: Optional[List[MoveOperation]] = None
+
+    @classmethod
+    def create(cls, folder: Optional[Path] = None, **options) -> "MoveJournal":
+        """A journal with a new, time-ordered name."""
+        folder = folder or default_journal_folder()
+        folder.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+        # Microseconds, fixed width, so names keep sorting by time; a name
+        # taken by a journal of the same microsecond moves to the next one
+        microseconds = int(now % 1 * 1_000_000)
+        path = folder / f"{stamp}-{microseconds:06d}{JOURNAL_SUFFIX}"
+        while path.exists():
+            microseconds = min(microseconds + 1, 999_999)
+            path = folder / f"{stamp}-{microseconds:06d}{JOURNAL_SUFFIX}"
+        return cls(path, **options)
+
+    # Writing
+
+    def _write(self, record: Dict) -> None:
+        self._append(_encode(record))
+
+    def _append(self, line: str) -> None:
+        self._buffer.append(line)
+        if len(self._buffer) >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def sync(self) -> None:
+        """Write the buffered records and flush them to disk."""
+        if self._file is None:
+            created = not self.path.exists()
+            self._file = open(self.path, "a", encoding="utf-8")
+            if created:
+                _sync_folder(self.path.parent)
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    # Reading
+
+    def state(self) -> JournalState:
+        """Read the journal. A record cut short by a crash is ignored."""
+        root = None
+        operations: List[MoveOperation] = []
+        done: Set[int] = set()
+        undone: Set[int] = set()
+        finished = undo_finished = False
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                kind = record.get("type")
+                if kind == RECORD_PLAN:
+                    operations.append(
+                        MoveOperation(Path(record["source"]), Path(record["target"]), record["category"])
+                    )
+                elif kind == RECORD_DONE:
+                    done.add(record["index"])
+                elif kind == RECORD_UNDONE:
+                    undone.add(record["index"])
+                elif kind in (RECORD_END, RECORD_CANCELLED):
+                    finished = True
+                elif kind == RECORD_UNDO_END:
+                    undo_finished = True
+                elif kind == RECORD_RUN:
+                    root = Path(record["root"]) if record.get("root") else None
+        self.root = root
+        self._operations = operations
+        return JournalState(root, operations, done, undone, finished, undo_finished)
+
+    # Runs
+
+    def start(self, operations: List[MoveOperation], root: Optional[Path] = None) -> None:
+        """Record the plan of a new run; it is on disk before anything moves."""
+        self.root = root
+        self._operations = list(operations)
+        self._buffer.append(_encode({"type": RECORD_RUN, "root": str(root) if root else None, "created": time.time()}))
+        # Same as encoding a dict per record, several times faster
+        record = '{"type": "%s", "index": %%d, "source": %%s, "target": %%s, "category": %%s}' % RECORD_PLAN
+        self._buffer.extend(
+            record % (index, _encode(str(operation.source)), _encode(str(operation.target)), _encode(operation.category))
+            for index, operation in enumerate(self._operations)
+        )
+        self.sync()
+
+    def resume_operations(self) -> List[MoveOperation]:
+        """
+        Planned moves still to do. Moves that happened without being recorded
+        (the source is gone and the target exists) are recorded now.
+        """
+        state = self.state()
+        remaining = []
+        for index, operation in enumerate(state.operations):
+            if index in state.done:
+                continue
+            if os.path.lexists(operation.source):
+                # A copy cut short leaves both; moving again completes it
+                remaining.append(operation)
+            elif os.path.lexists(operation.target):
+                self._write({"type": RECORD_DONE, "index": index})
+        self.sync()
+        return remaining
+
+    def undo_operations(self) -> Tuple[List[MoveOperation], List[MoveResult]]:
+        """
+        Reverse moves still to do, last moved first, and the conflicts: files
+        whose original place is taken again, which are left alone.
+        Reversals that happened without being recorded are recorded now.
+        """
+        state = self.state()
+        operations, conflicts = [], []
+        for index in range(len(state.operations) - 1, -1, -1):
+            if index in state.undone:
+                continue
+            operation = state.operations[index]
+            moved = os.path.lexists(operation.target)
+            back = os.path.lexists(operation.source)
+            if index not in state.done and not (moved and not back):
+                continue  # Never moved
+            reverse = MoveOperation(operation.target, operation.source, operation.category)
+            if moved and back:
+                conflicts.append(MoveResult(reverse, False, 0, "undo", "o local original já está ocupado"))
+            elif moved:
+                operations.append(reverse)
+            elif back:
+                self._write({"type": RECORD_UNDONE, "index": index})
+        self.sync()
+        return operations, conflicts
+
+    def execute(
+        self,
+        executor: MoveExecutor,
+        operations: Iterable[MoveOperation],
+        progress: Optional[Callable[[MoveResult], None]] = None,
+        undo: bool = False,
+    ) -> MoveReport:
+        """
+        Run planned moves (or their reversals, with `undo`) through the executor,
+        recording each one that completes. The run (or its undo) is ended only
+        if some move was recorded or nothing is left to do, so operations that
+        match none of the plan do not end it; a cancelled run is not resumed.
+        """
+        on_result = self.recorder(progress, undo)
+        try:
+            report = executor.execute(operations, on_result)
+            if report.cancelled:
+                if not undo:
+                    self.abandon()
+            elif self.recorded or self._complete(undo):
+                self.end(undo)
+        finally:
+            self.close()
+        if undo and not report.cancelled:
+            _remove_empty_folders({result.operation.source.parent for result in report.results if result.ok})
+        return report
+
+    def recorder(
+        self, progress: Optional[Callable[[MoveResult], None]] = None, undo: bool = False
+    ) -> Callable[[MoveResult], None]:
+        """
+        Result callback recording each planned move (or reversal) that
+        completes, then passing the result on to `progress`. For executors
+        other than `MoveExecutor`; `execute` uses it.
+        """
+        planned = self._operations if self._operations is not None else self.state().operations
+        # Keyed by strings, which hash much faster than paths
+        indexes = {(str(operation.source), str(operation.target)): index for index, operation in enumerate(planned)}
+        # Completion records have a fixed shape, so they skip the encoder
+        record = '{"type": "%s", "index": %%d}' % (RECORD_UNDONE if undo else RECORD_DONE)
+        self.recorded = 0
+
+        def on_result(result: MoveResult) -> None:
+            if result.ok:
+                operation = result.operation
+                source, target = str(operation.source), str(operation.target)
+                index = indexes.get((target, source) if undo else (source, target))
+                if index is not None:
+                    self._append(record % index)
+                    self.recorded += 1
+            if progress is not None:
+                progress(result)
+
+        return on_result
+
+    def end(self, undo: bool = False) -> None:
+        """Record that every planned move (or reversal) was attempted."""
+        self._write({"type": RECORD_UNDO_END if undo else RECORD_END})
+
+    def abandon(self) -> None:
+        """Record that the rest of the run will not be done; it can still be undone."""
+        self._write({"type": RECORD_CANCELLED})
+
+    def _complete(self, undo: bool) -> bool:
+        """Whether every planned move is recorded done (with `undo`, every done move undone)."""
+        self.sync()
+        state = self.state()
+        if undo:
+            return state.done <= state.undone
+        return len(state.done) == len(state.operations)
+
+
+def _remove_empty_folders(folders: Iterable[Path]) -> None:
+    """Remove category folders left empty by an undo."""
+    for folder in folders:
+        try:
+            folder.rmdir()
+        except OSError:
+            pass  # Not empty, or already gone
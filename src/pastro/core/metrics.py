@@ -0,0 +1,322 @@
+"""
+Run metrics: time, counters and latency histograms per phase, with optional
+cProfile and tracemalloc captures.
+
+A disabled `Metrics` does nothing: its phases are a shared no-op context,
+its recording methods return at once and `timed` hands functions back
+unwrapped, so instrumented code costs a method call per phase.
+"""
+
+import cProfile
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Environment variable enabling metrics: "1", or captures among "profile" and "memory", e.g. "profile,memory"
+METRICS_VARIABLE = "PASTRO_METRICS"
+
+# Lines of the profile and of the allocation statistics kept in the dump
+PROFILE_LINES = 25
+MEMORY_LINES = 10
+
+_NO_PHASE = nullcontext()
+
+
+def default_metrics_folder() -> Path:
+    """Folder of the metrics dumps, next to the scan cache."""
+    from .cache import default_cache_path
+
+    return default_cache_path().parent / "metrics"
+
+
+class Histogram:
+    """
+    Latencies (or sizes) in power-of-two buckets. For latencies the unit is
+    the microsecond: bucket 0 holds values under 1 µs, bucket n values in
+    [2^(n-1), 2^n) µs.
+    """
+    __slots__ = ("scale", "buckets", "count", "total", "minimum", "maximum")
+
+    def __init__(self, scale: float = 1e6):
+        self.scale = scale
+        self.buckets: List[int] = []
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def add(self, value: float) -> None:
+        bucket = int(value * self.scale).bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of the values."""
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= wanted:
+                return min((1 << bucket) / self.scale, self.maximum)
+        return self.maximum
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.minimum if self.count else 0.0,
+            "max": self.maximum,
+            "mean": self.mean,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            # Upper bound of each bucket -> values in it
+            "buckets": {f"{(1 << bucket) / self.scale:g}": count for bucket, count in enumerate(self.buckets) if count},
+        }
+
+
+class PhaseStats:
+    """What was recorded in one phase."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.runs = 0
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.peak_memory: Optional[int] = None
+
+    def to_dict(self) -> Dict:
+        data = {
+            "seconds": self.seconds,
+            "runs": self.runs,
+            "counters": self.counters,
+            "histograms": {name: histogram.to_dict() for name, histogram in self.histograms.items()},
+        }
+        if self.peak_memory is not None:
+            data["peak_memory"] = self.peak_memory
+        return data
+
+
+class Metrics:
+    """
+    Metrics of one run, recorded from any thread. `profile` captures a cProfile
+    of every phase, in the thread that runs it; `memory` traces allocations with
+    tracemalloc, reporting the peak of each phase.
+    """
+
+    def __init__(self, enabled: bool = True, profile: bool = False, memory: bool = False):
+        self.enabled = enabled
+        self.profile = enabled and profile
+        self.memory = enabled and memory
+        self.phases: Dict[str, PhaseStats] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._memory_top: List[str] = []
+        # Imported only when used, like pstats: both are slow to import
+        self._tracemalloc = None
+        if self.memory:
+            import tracemalloc
+
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    @classmethod
+    def from_environment(cls) -> "Metrics":
+        """Metrics configured by `PASTRO_METRICS`; disabled when it is unset."""
+        value = os.environ.get(METRICS_VARIABLE, "").lower()
+        if value in ("", "0"):
+            return cls(enabled=False)
+        options = {option.strip() for option in value.split(",")}
+        return cls(profile="profile" in options, memory="memory" in options)
+
+    def _phase(self, name: str) -> PhaseStats:
+        stats = self.phases.get(name)
+        if stats is None:
+            stats = self.phases.setdefault(name, PhaseStats())
+        return stats
+
+    def phase(self, name: str):
+        """Context timing a phase; phases with the same name add up."""
+        if not self.enabled:
+            return _NO_PHASE
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name: str) -> Iterator[None]:
+        profiler = None
+        if self.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                profiler = None  # Another profiler is active in this thread
+        if self._tracemalloc is not None:
+            self._tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            with self._lock:
+                stats = self._phase(name)
+                stats.seconds += elapsed
+                stats.runs += 1
+                if self._tracemalloc is not None:
+                    peak = self._tracemalloc.get_traced_memory()[1]
+                    stats.peak_memory = max(stats.peak_memory or 0, peak)
+                if profiler is not None:
+                    self._profiles.append(profiler)
+
+    def count(self, phase: str, name: str, value: float = 1) -> None:
+        """Add to a counter of a phase."""
+        if not self.enabled:
+            return
+        with self._lock:
+            counters = self._phase(phase).counters
+            counters[name] = counters.get(name, 0) + value
+
+    def observe(self, phase: str, name: str, value: float, scale: float = 1e6) -> None:
+        """Add a value to a histogram of a phase; `scale` only applies to a new histogram."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histograms = self._phase(phase).histograms
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = Histogram(scale)
+            histogram.add(value)
+
+    def timed(self, phase: str, name: str, function: Callable) -> Callable:
+        """`function`, recording the latency of each call; itself when disabled."""
+        if not self.enabled:
+            return function
+        with self._lock:
+            histograms = self._phase(phase).histograms
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = Histogram()
+        clock = time.perf_counter
+        lock = self._lock
+
+        # Functions timed under the same name may run in several threads at once
+        def wrapper(*args):
+            start = clock()
+            try:
+                return function(*args)
+            finally:
+                elapsed = clock() - start
+                with lock:
+                    histogram.add(elapsed)
+
+        return wrapper
+
+    def finish(self) -> None:
+        """Stop the captures."""
+        tracemalloc = self._tracemalloc
+        if tracemalloc is not None and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            self._memory_top = [str(stat) for stat in snapshot.statistics("lineno")[:MEMORY_LINES]]
+            tracemalloc.stop()
+
+    def _profile_stats(self, stream=None):
+        """The profiles of all phases combined."""
+        import pstats
+
+        stats = pstats.Stats(self._profiles[0], stream=stream)
+        for profiler in self._profiles[1:]:
+            stats.add(profiler)
+        return stats
+
+    def profile_text(self) -> str:
+        """The combined profile, by cumulative time."""
+        if not self._profiles:
+            return ""
+        import io
+
+        output = io.StringIO()
+        self._profile_stats(output).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        return output.getvalue()
+
+    def summary(self) -> str:
+        """Readable summary, one line per phase and histogram."""
+        lines = []
+        for name, stats in self.phases.items():
+            # Phases fed only by counters and histograms have no time of their own
+            line = f"{name}: {stats.seconds * 1000:.1f} ms" if stats.runs else f"{name}:"
+            if stats.runs > 1:
+                line += f" em {stats.runs} vezes"
+            counters = ", ".join(f"{counter} {_number(value)}" for counter, value in stats.counters.items())
+            if counters:
+                line += f" ({counters})" if stats.runs else f" {counters}"
+            if stats.peak_memory is not None:
+                line += f", pico de memória {stats.peak_memory / 2 ** 20:.1f} MiB"
+            lines.append(line)
+            for histogram_name, histogram in stats.histograms.items():
+                if histogram.scale == 1e6:
+                    values = (histogram.mean, histogram.percentile(0.5), histogram.percentile(0.99), histogram.maximum)
+                    lines.append(f"    {histogram_name}: {histogram.count} × média {_duration(values[0])}, "
+                                 f"p50 ≤ {_duration(values[1])}, p99 ≤ {_duration(values[2])}, "
+                                 f"máx {_duration(values[3])}")
+                else:
+                    lines.append(f"    {histogram_name}: {histogram.count} × média {_number(histogram.mean)}, "
+                                 f"p50 ≤ {_number(histogram.percentile(0.5))}, máx {_number(histogram.maximum)}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        return {
+            "started": self.started,
+            "phases": {name: stats.to_dict() for name, stats in self.phases.items()},
+            "memory_top": self._memory_top,
+        }
+
+    def dump(self, folder: Optional[Path] = None) -> Path:
+        """
+        Write the metrics as JSON, with the combined profile beside them
+        (``.prof`` for pstats and snakeviz, ``.txt`` to read). Returns the JSON path.
+        """
+        folder = folder or default_metrics_folder()
+        folder.mkdir(parents=True, exist_ok=True)
+        stem = folder / time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = stem.with_suffix(".json")
+        path.write_text(json.dumps(self.to_dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+        if self._profiles:
+            self._profile_stats().dump_stats(stem.with_suffix(".prof"))
+            stem.with_suffix(".txt").write_text(self.profile_text(), encoding="utf-8")
+        return path
+
+
+def _duration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} ms"
+    return f"{seconds:.2f} s"
+
+
+def _number(value: float) -> str:
+    return f"{value:.0f}" if float(value).is_integer() else f"{value:.2f}"
+
+
+# Shared disabled instance, for callers without metrics
+DISABLED = Metrics(enabled=False)
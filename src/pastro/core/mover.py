@@ -0,0 +1,304 @@
+"""
+Move execution engine: runs planned file moves with per-device worker pools.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+from .transfer import move_file
+
+METHOD_RENAME = "rename"
+METHOD_COPY = "copy"
+
+
+class MoveOperation(NamedTuple):
+    """A single planned move."""
+    source: Path
+    target: Path
+    category: str
+
+
+class MoveResult(NamedTuple):
+    """Outcome of a single move."""
+    operation: MoveOperation
+    ok: bool
+    size: int
+    method: str
+    error: Optional[str] = None
+    seconds: float = 0.0  # Time spent moving
+
+
+class MoveReport:
+    """Per-operation results and throughput of a batch of moves."""
+
+    def __init__(self):
+        self.results: List[MoveResult] = []
+        self.moved_files = 0
+        self.moved_bytes = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    def add(self, result: MoveResult) -> None:
+        self.results.append(result)
+        if result.ok:
+            self.moved_files += 1
+            self.moved_bytes += result.size
+
+    @property
+    def failures(self) -> List[MoveResult]:
+        return [result for result in self.results if not result.ok]
+
+    @property
+    def files_per_second(self) -> float:
+        return self.moved_files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.moved_bytes / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        """Human readable summary."""
+        return (
+            f"{self.moved_files} arquivo(s) movido(s), {len(self.failures)} falha(s) em {self.elapsed:.1f}s "
+            f"({self.files_per_second:.0f} arquivos/s, {self.mb_per_second:.1f} MB/s)"
+        )
+
+
+class MoveExecutor:
+    """
+    Runs planned moves. Moves within a filesystem are done with ``os.rename``;
+    moves across filesystems are copied by a thread pool per (source, target)
+    device pair. Results are reported in the calling thread.
+    `pause`, `resume` and `cancel` may be called from any thread.
+
+    `device_workers` maps any path on a device to the number of workers for
+    that device; a pool uses the smaller limit of its two devices.
+    `io_limit`, a semaphore shared with other executors or scanners, caps
+    the moves in flight across all of them. With `verify`, copies are read
+    back and checked before their source is removed (see `move_file`).
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        device_workers: Optional[Dict[Union[str, Path], int]] = None,
+        io_limit: Optional[threading.Semaphore] = None,
+        verify: bool = False,
+    ):
+        self.workers = workers
+        self.verify = verify
+        self.device_workers: Dict[int, int] = {}
+        for path, count in (device_workers or {}).items():
+            self.device_workers[os.stat(path).st_dev] = count
+        self.io_limit = io_limit
+        self._io = io_limit if io_limit is not None else nullcontext()
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    def pause(self) -> None:
+        """Hold operations that have not started yet."""
+        self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    def cancel(self) -> None:
+        """Skip every operation that has not started yet."""
+        self._cancelled.set()
+        self._running.set()
+
+    def _may_start(self) -> bool:
+        """Block while paused; False once cancelled."""
+        self._running.wait()
+        return not self._cancelled.is_set()
+
+    def workers_for(self, source_device: int, target_device: int) -> int:
+        """Number of workers for copies between two devices."""
+        return max(1, min(
+            self.device_workers.get(source_device, self.workers),
+            self.device_workers.get(target_device, self.workers),
+        ))
+
+    def execute(
+        self,
+        operations: Iterable[MoveOperation],
+        progress: Optional[Callable[[MoveResult], None]] = None,
+    ) -> MoveReport:
+        """Run all operations; a failure only affects its own operation."""
+        report = MoveReport()
+        start = time.perf_counter()
+
+        def finish(result: MoveResult) -> None:
+            report.add(result)
+            if progress is not None:
+                progress(result)
+
+        target_devices: Dict[Path, int] = {}
+        copies: Dict[Tuple[int, int], List[Tuple[MoveOperation, int]]] = {}
+
+        for operation in operations:
+            if not self._may_start():
+                break
+            try:
+                stat = os.lstat(operation.source)
+                target_device = self._prepare_target(operation.target.parent, target_devices)
+            except OSError as error:
+                finish(MoveResult(operation, False, 0, METHOD_RENAME, str(error)))
+                continue
+
+            if stat.st_dev == target_device:
+                with self._io:
+                    result = _rename(operation, stat.st_size)
+                finish(result)
+            else:
+                copies.setdefault((stat.st_dev, target_device), []).append((operation, stat.st_size))
+
+        if copies:
+            self._run_copies(copies, finish)
+
+        report.cancelled = self._cancelled.is_set()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    @staticmethod
+    def _prepare_target(folder: Path, known: Dict[Path, int]) -> int:
+        """Create a target folder once and return its device."""
+        device = known.get(folder)
+        if device is None:
+            folder.mkdir(parents=True, exist_ok=True)
+            device = known[folder] = os.stat(folder).st_dev
+        return device
+
+    def _run_copies(
+        self,
+        copies: Dict[Tuple[int, int], List[Tuple[MoveOperation, int]]],
+        finish: Callable[[MoveResult], None],
+    ) -> None:
+        """Copy across devices, one bounded pool per device pair."""
+        pools = [
+            ThreadPoolExecutor(max_workers=self.workers_for(*devices), thread_name_prefix="pastro-move")
+            for devices in copies
+        ]
+        try:
+            pending: Set[Future] = set()
+            for pool, items in zip(pools, copies.values()):
+                for operation, size in items:
+                    pending.add(pool.submit(self._guarded_copy, operation, size))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is not None:
+                        finish(result)
+        finally:
+            for pool in pools:
+                pool.shutdown(wait=True)
+
+    def _guarded_copy(self, operation: MoveOperation, size: int) -> Optional[MoveResult]:
+        if not self._may_start():
+            return None
+        with self._io:
+            return _copy(operation, size, self.verify)
+
+
+class RootsExecutor(MoveExecutor):
+    """
+    Runs the moves of several roots at once, one lane per root, so a slow
+    mount only holds up its own files. An operation belongs to the
+    innermost root holding its target or, for undos, its source; the others
+    share a last lane. Lanes run in threads, sharing `io_limit`, and their results
+    are still reported in the calling thread.
+    """
+
+    def __init__(self, roots: Sequence[Union[str, Path]], workers: int = 4, **options):
+        super().__init__(workers, **options)
+        self.roots = [Path(root) for root in roots]
+        # Innermost roots are tried first
+        prefixes = [os.path.join(root, "") for root in self.roots]
+        self._by_depth = sorted(enumerate(prefixes), key=lambda item: -len(item[1]))
+        self._lanes: Dict[Path, int] = {}
+
+    def lane_of(self, operation: MoveOperation) -> int:
+        """Index of the root of an operation; `len(roots)` for none."""
+        folder = operation.target.parent
+        lane = self._lanes.get(folder)
+        if lane is None:
+            lane = self._lanes[folder] = self._find_lane(operation)
+        return lane
+
+    def _find_lane(self, operation: MoveOperation) -> int:
+        for path in (os.path.join(operation.target.parent, ""), os.path.join(operation.source.parent, "")):
+            for lane, prefix in self._by_depth:
+                if path.startswith(prefix):
+                    return lane
+        return len(self.roots)
+
+    def _lane_executor(self) -> MoveExecutor:
+        executor = MoveExecutor(self.workers, io_limit=self.io_limit, verify=self.verify)
+        executor.device_workers = self.device_workers
+        # Pausing or cancelling this executor holds every lane
+        executor._cancelled = self._cancelled
+        executor._running = self._running
+        return executor
+
+    def execute(
+        self,
+        operations: Iterable[MoveOperation],
+        progress: Optional[Callable[[MoveResult], None]] = None,
+    ) -> MoveReport:
+        lanes: Dict[int, List[MoveOperation]] = {}
+        for operation in operations:
+            lanes.setdefault(self.lane_of(operation), []).append(operation)
+        if len(lanes) <= 1:
+            return super().execute(next(iter(lanes.values()), []), progress)
+
+        report = MoveReport()
+        start = time.perf_counter()
+        results: "queue.SimpleQueue[Optional[MoveResult]]" = queue.SimpleQueue()
+        with ThreadPoolExecutor(max_workers=len(lanes), thread_name_prefix="pastro-root") as pool:
+            futures = [
+                pool.submit(self._lane_executor().execute, lane_operations, results.put)
+                for lane_operations in lanes.values()
+            ]
+            for future in futures:
+                future.add_done_callback(lambda _: results.put(None))
+            running = len(futures)
+            while running:
+                result = results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                report.add(result)
+                if progress is not None:
+                    progress(result)
+            for future in futures:
+                future.result()  # Raises what a lane raised
+        report.cancelled = self._cancelled.is_set()
+        report.elapsed = time.perf_counter() - start
+        return report
+
+
+def _rename(operation: MoveOperation, size: int) -> MoveResult:
+    start = time.perf_counter()
+    try:
+        os.rename(operation.source, operation.target)
+    except OSError as error:
+        return MoveResult(operation, False, size, METHOD_RENAME, str(error), time.perf_counter() - start)
+    return MoveResult(operation, True, size, METHOD_RENAME, None, time.perf_counter() - start)
+
+
+def _copy(operation: MoveOperation, size: int, verify: bool = False) -> MoveResult:
+    start = time.perf_counter()
+    try:
+        # Copies data and metadata, then removes the source
+        method = move_file(operation.source, operation.target, verify)
+    except OSError as error:
+        return MoveResult(operation, False, size, METHOD_COPY, str(error), time.perf_counter() - start)
+    return MoveResult(operation, True, size, method, None, time.perf_counter() - start)
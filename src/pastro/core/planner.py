@@ -0,0 +1,184 @@
+"""
+Move planning: the target of every file is chosen before anything moves,
+with name collisions resolved in bulk.
+"""
+
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from .classifier import split_suffix
+from .filetable import FileGroup
+from .mover import MoveOperation
+
+# Name given to a file whose name is taken in its category folder
+RENAME_FORMAT = "{stem} ({number}){suffix}"
+
+# A planned file: its path, or its row in a `FileTable`
+Handle = Union[str, int]
+
+
+def list_names(folder: Path) -> List[str]:
+    """Names in a folder; none if it does not exist (yet)."""
+    try:
+        with os.scandir(folder) as entries:
+            return [entry.name for entry in entries]
+    except OSError:
+        return []
+
+
+def is_case_insensitive(folder: Path, names: Iterable[str] = ()) -> bool:
+    """
+    Whether a folder ignores the case of names, as on Windows or on shares
+    mounted from it. `names` are names listed in the folder: one of them is
+    looked up with its case swapped. Without any, the platform decides.
+    """
+    listed = set(names)
+    for name in listed:
+        swapped = name.swapcase()
+        if swapped != name and swapped not in listed:
+            return os.path.lexists(os.path.join(folder, swapped))
+    return sys.platform in ("win32", "darwin")
+
+
+class MovePlan:
+    """
+    Planned moves, by category, into `root / category`. Sources are kept as
+    strings, or as `FileGroup` rows of the scanned `FileTable`, and target
+    names only for the files renamed to avoid a collision, so a plan stays
+    small and serializes as it is (`to_dict`). Iterating a plan yields its
+    `MoveOperation`s, ready for `MoveExecutor`.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        categories: Optional[Dict[str, Sequence[str]]] = None,
+        renamed: Optional[Dict[str, str]] = None,
+    ):
+        self.root = Path(root)
+        self.categories: Dict[str, Sequence[str]] = categories or {}
+        # Source -> new name, for the files whose name was taken
+        self.renamed: Dict[str, str] = renamed or {}
+
+    def __len__(self) -> int:
+        return sum(len(sources) for sources in self.categories.values())
+
+    def __iter__(self) -> Iterator[MoveOperation]:
+        for category, sources in self.categories.items():
+            folder = self.root / category
+            for source in sources:
+                yield MoveOperation(Path(source), folder / self.target_name(source), category)
+
+    def target_name(self, source: str) -> str:
+        """Name of a planned file in its category folder."""
+        return self.renamed.get(source) or os.path.basename(source)
+
+    def to_dict(self) -> Dict:
+        categories = {category: list(sources) for category, sources in self.categories.items()}
+        return {"root": str(self.root), "categories": categories, "renamed": self.renamed}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "MovePlan":
+        return cls(Path(data["root"]), data["categories"], data.get("renamed"))
+
+
+def plan_targets(
+    classification: Dict[str, Sequence],
+    target_root: Path,
+    case_insensitive: Optional[bool] = None,
+    list_folder: Callable[[Path], List[str]] = list_names,
+) -> MovePlan:
+    """
+    Plan one move per file into `target_root / category`; files already there
+    are skipped. Each category folder is listed once, and a file whose name is
+    taken, by a file already there or by another planned file, gets a free
+    name such as "foto (1).jpg". Among files sharing a name, the first in path
+    order keeps it, so the same files always get the same names. Case is
+    ignored in names when the target ignores it (detected unless
+    `case_insensitive` is given). Categories given as `FileGroup`s are
+    planned as `FileGroup`s, without building a path per file.
+    `list_folder` lists the target folders, e.g. from listings fetched ahead.
+    """
+    target_root = Path(target_root)
+    if case_insensitive is None:
+        case_insensitive = is_case_insensitive(target_root, list_folder(target_root))
+    key: Callable[[str], str] = str.casefold if case_insensitive else str
+    separator = os.sep
+
+    plan = MovePlan(target_root)
+    for category, files in classification.items():
+        folder = target_root / category
+        folder_name = str(folder)
+        # Files are handled by row in a table, by path string otherwise
+        table = files.table if isinstance(files, FileGroup) else None
+        if table is not None:
+            sources: Union[array, List[str]] = array("I")
+            entries: Iterable[Tuple[Handle, str, str]] = files.items()
+            path_of: Callable[[Handle], str] = table.path
+        else:
+            sources = []
+            entries = _split_paths(files, separator)
+            path_of = str
+        keep = sources.append
+        # Name key -> first planned source with it; sources sharing a key
+        first: Dict[str, Handle] = {}
+        clashes: Dict[str, List[Handle]] = {}
+        for handle, directory, name in entries:
+            if directory == folder_name:
+                continue
+            keep(handle)
+            name_key = name.casefold() if case_insensitive else name
+            if name_key in first:
+                clashes.setdefault(name_key, [first[name_key]]).append(handle)
+            else:
+                first[name_key] = handle
+        if not sources:
+            continue
+        plan.categories[category] = FileGroup(table, sources) if table is not None else sources
+
+        existing = {key(name) for name in list_folder(folder)}
+        for name_key in existing.intersection(first):
+            clashes.setdefault(name_key, [first[name_key]])
+        if not clashes:
+            continue
+        taken = existing.union(first)
+        for name_key, group in clashes.items():
+            paths = sorted(map(path_of, group))
+            # The first keeps its name, unless a file in the folder has it
+            number = 0
+            for source in paths[0 if name_key in existing else 1:]:
+                name, number = _free_name(os.path.basename(source), number, taken, key)
+                taken.add(key(name))
+                plan.renamed[source] = name
+    return plan
+
+
+def _split_paths(files: Iterable, separator: str) -> Iterator[Tuple[str, str, str]]:
+    """(source, folder, name) of each path."""
+    for file_path in files:
+        # String operations: building Path objects costs more than the rest of the plan
+        source = str(file_path)
+        directory, _, name = source.rpartition(separator)
+        yield source, directory, name
+
+
+def _free_name(name: str, number: int, taken: Set[str], key: Callable[[str], str]) -> Tuple[str, int]:
+    """The first free numbered name after `number`, and its number."""
+    suffix = split_suffix(name)
+    stem = name[:len(name) - len(suffix)]
+    if stem.lower().endswith(".tar") and len(stem) > 4:
+        # "backup (1).tar.gz", like browsers do
+        stem, suffix = stem[:-4], stem[-4:] + suffix
+    while True:
+        number += 1
+        candidate = RENAME_FORMAT.format(stem=stem, number=number, suffix=suffix)
+        if key(candidate) not in taken:
+            return candidate, number
+
+
+def plan_moves(classification: Dict[str, List[Path]], target_root: Path) -> List[MoveOperation]:
+    """The operations of `plan_targets`, as a list."""
+    return list(plan_targets(classification, target_root))
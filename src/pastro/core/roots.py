@@ -0,0 +1,167 @@
+"""
+Organization of several folders in one run. Folders are planned concurrently,
+one thread per destination, and moved in one lane per destination (see
+`RootsExecutor`), with a cap on the I/O in flight shared by all of them.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .archives import ArchiveInspector
+from .classifier import AutoClassifier
+from .dedup import DuplicateGroup, find_table_duplicates
+from .metrics import DISABLED, Metrics
+from .mover import MoveOperation
+from .planner import MovePlan, plan_targets
+from .scanner import Scanner
+from .sniffer import ContentSniffer
+
+# Folder listings, file reads and moves in flight at once, across all folders
+DEFAULT_IO_LIMIT = 8
+
+
+class OrganizeRoot(NamedTuple):
+    """A folder to organize into `target`, or into itself by default."""
+    folder: Path
+    target: Optional[Path] = None
+
+    @property
+    def destination(self) -> Path:
+        return self.target or self.folder
+
+
+class RootPlan(NamedTuple):
+    """What was planned for the folders organized into one destination."""
+    destination: Path
+    folders: List[Path]
+    plan: MovePlan  # Duplicates left in place
+    duplicates: List[DuplicateGroup]
+    plan_with_duplicates: MovePlan
+    files: int  # Files found
+    error: Optional[str] = None  # Why the folders could not be planned
+
+
+def plan_root(
+    classifier: AutoClassifier,
+    scanner: Scanner,
+    folders: Sequence[Path],
+    destination: Path,
+    metrics: Metrics = DISABLED,
+    io_limit: Optional[threading.Semaphore] = None,
+    archives: Optional[ArchiveInspector] = None,
+) -> RootPlan:
+    """
+    Scan, sniff, find duplicates and plan the moves of `folders` into
+    `destination`. Folders sharing a destination are planned together, so
+    their files never claim the same name there. With `archives`, archives
+    go with the category dominating their content, if any.
+    """
+    for folder in folders:
+        if not os.path.isdir(folder):
+            raise FileNotFoundError(f"Pasta não encontrada: {folder}")
+    table = None
+    with metrics.phase("varredura"):
+        for folder in folders:
+            table = classifier.classify_table(scanner, folder, metrics, table=table, archives=archives)
+    metrics.count("varredura", "arquivos", len(table))
+    if not len(table):
+        return RootPlan(destination, list(folders), MovePlan(destination), [], MovePlan(destination), 0)
+    with metrics.phase("conteúdo"):
+        sniffer = ContentSniffer(io_limit=io_limit)
+        sniffer.reclassify_table(table, classifier.get_category_for_name)
+    metrics.count("conteúdo", "bytes lidos", sniffer.bytes_read)
+    if archives is not None:
+        with metrics.phase("compactados"):
+            reclassified = archives.reclassify_table(table, classifier.get_category_for_name)
+        metrics.count("compactados", "reclassificados", reclassified)
+    with metrics.phase("duplicados"):
+        duplicates = find_table_duplicates(table)
+    metrics.count("duplicados", "grupos", len(duplicates))
+    with metrics.phase("planejamento"):
+        excluded = table.rows_of(path for group in duplicates for path in group.duplicates)
+        plan = plan_targets(table.classification(excluded), destination)
+        # Moving the duplicates too changes the collisions, so that choice has its own plan
+        plan_with_duplicates = plan_targets(table.classification(), destination) if duplicates else plan
+    metrics.count("planejamento", "renomeados", len(plan.renamed))
+    return RootPlan(destination, list(folders), plan, duplicates, plan_with_duplicates, len(table))
+
+
+def plan_roots(
+    classifier: AutoClassifier,
+    roots: Sequence[OrganizeRoot],
+    create_scanner: Callable[[threading.Semaphore], Scanner],
+    metrics: Metrics = DISABLED,
+    io_limit: Optional[threading.Semaphore] = None,
+    archives: bool = False,
+) -> List[RootPlan]:
+    """
+    Plan every destination in its own thread, in the order of `roots`.
+    `create_scanner` builds a scanner sharing the given I/O limit. A
+    destination whose folders cannot be planned gets empty plans and an
+    `error`; the others are planned all the same. With `archives`, the
+    content of zip and tar archives is listed, in one process pool for all
+    destinations, and decides their category.
+    """
+    if io_limit is None:
+        io_limit = threading.BoundedSemaphore(DEFAULT_IO_LIMIT)
+    groups: Dict[Path, List[Path]] = {}
+    for root in roots:
+        groups.setdefault(Path(root.destination), []).append(Path(root.folder))
+
+    def plan_group(group: Tuple[Path, List[Path]]) -> RootPlan:
+        destination, folders = group
+        try:
+            return plan_root(classifier, create_scanner(io_limit), folders, destination, metrics, io_limit, inspector)
+        except OSError as error:
+            return RootPlan(destination, folders, MovePlan(destination), [], MovePlan(destination), 0, str(error))
+
+    archive_category = classifier.get_category_for_extension(".zip")
+    with ArchiveInspector(archive_category) if archives else nullcontext() as inspector:
+        if len(groups) == 1:
+            return [plan_group(next(iter(groups.items())))]
+        with ThreadPoolExecutor(max_workers=len(groups), thread_name_prefix="pastro-root") as pool:
+            return list(pool.map(plan_group, groups.items()))
+
+
+class CombinedPlan:
+    """
+    The `MovePlan`s of several destinations read as one, for the preview and
+    the journal. With more than one, categories are labelled with their
+    destination; `root` is only set for a single destination.
+    """
+
+    def __init__(self, plans: Sequence[MovePlan]):
+        self.plans = list(plans)
+        self.root: Optional[Path] = self.plans[0].root if len(self.plans) == 1 else None
+        self.categories: Dict[str, Sequence[str]] = {}
+        # Sources are absolute, so renames of all plans fit in one mapping
+        self.renamed: Dict[str, str] = {}
+        for plan in self.plans:
+            for category, sources in plan.categories.items():
+                label = category if self.root is not None else f"{category} ({plan.root})"
+                self.categories[label] = sources
+            self.renamed.update(plan.renamed)
+
+    @property
+    def roots(self) -> List[Path]:
+        return [plan.root for plan in self.plans]
+
+    def __len__(self) -> int:
+        return sum(len(plan) for plan in self.plans)
+
+    def __iter__(self) -> Iterator[MoveOperation]:
+        return chain.from_iterable(self.plans)
+
+
+def combine_plans(plans: Sequence[RootPlan]) -> Tuple[CombinedPlan, List[DuplicateGroup], CombinedPlan]:
+    """The plans, duplicates and plans moving duplicates of every destination together."""
+    return (
+        CombinedPlan([root_plan.plan for root_plan in plans]),
+        [group for root_plan in plans for group in root_plan.duplicates],
+        CombinedPlan([root_plan.plan_with_duplicates for root_plan in plans]),
+    )
@@ -0,0 +1,324 @@
+"""
+Declarative classification rules, loaded from TOML or JSON files and
+compiled into a matcher.
+
+A rules file holds a list of rules:
+
+    [[rules]]
+    category = "Imagens"
+    extensions = [".jpg", ".png"]
+
+    [[rules]]
+    category = "Vídeos grandes"
+    extensions = [".mp4", ".mkv"]
+    min_size = "1 GB"
+    priority = 10
+
+    [[rules]]
+    category = "Faturas"
+    name = "(?i)fatura|boleto"       # regex searched in the file name
+    parent = "*/Downloads"            # glob on the folder of the file
+    max_age_days = 30
+    priority = 5
+
+Rules are tried by decreasing priority, then in file order; the first one
+whose predicates all hold gives the category, and files no rule matches
+go to "Outros".
+"""
+
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .classifier import split_suffix
+from .scanner import compile_globs
+
+DEFAULT_CATEGORY = "Outros"
+
+# Looked up in this order in the rules folder
+RULES_FILE_NAMES = ("rules.toml", "rules.json")
+
+SIZE_UNITS = {"": 1, "b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3, "tb": 1024 ** 4}
+DAY = 24 * 60 * 60
+
+RULE_KEYS = {
+    "category", "priority", "extensions", "name", "min_size", "max_size",
+    "min_age_days", "max_age_days", "parent",
+}
+
+
+def default_rules_folder() -> Path:
+    """The user's configuration folder for Pastro."""
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_CONFIG_HOME")
+    folder = Path(base) if base else Path.home() / ".config"
+    return folder / "pastro"
+
+
+def find_rules_file(folder: Optional[Path] = None) -> Optional[Path]:
+    """The rules file of the user, if there is one."""
+    folder = folder or default_rules_folder()
+    for name in RULES_FILE_NAMES:
+        path = folder / name
+        if path.is_file():
+            return path
+    return None
+
+
+def parse_size(value: Any) -> int:
+    """Bytes from a number or a text such as "10 MB"."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", str(value))
+    unit = match.group(2).lower() if match else None
+    if unit not in SIZE_UNITS:
+        raise ValueError(f"Tamanho inválido: {value!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[unit])
+
+
+class Rule(NamedTuple):
+    """One rule as declared; unset predicates always hold."""
+    category: str
+    priority: int = 0
+    extensions: FrozenSet[str] = frozenset()
+    name: Optional[str] = None          # Regex searched in the file name
+    min_size: Optional[int] = None      # Bytes
+    max_size: Optional[int] = None
+    min_age_days: Optional[float] = None  # Days since the last modification
+    max_age_days: Optional[float] = None
+    parent: Optional[str] = None        # Glob on the path of the file's folder, with "/" separators
+
+    @property
+    def needs_stat(self) -> bool:
+        return any(value is not None for value in (
+            self.min_size, self.max_size, self.min_age_days, self.max_age_days
+        ))
+
+    @property
+    def extension_only(self) -> bool:
+        """A plain list of extensions for a category."""
+        return (
+            self.priority == 0 and bool(self.extensions) and self.name is None
+            and self.parent is None and not self.needs_stat
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rule":
+        unknown = set(data) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Campos desconhecidos na regra: {', '.join(sorted(unknown))}")
+        if not data.get("category"):
+            raise ValueError("Toda regra precisa de uma categoria")
+        extensions = data.get("extensions", [])
+        if isinstance(extensions, str):
+            extensions = [extensions]
+        name = data.get("name")
+        if name is not None:
+            try:
+                re.compile(name)
+            except re.error as error:
+                raise ValueError(f"Expressão regular inválida em {data['category']}: {error}")
+        return cls(
+            category=str(data["category"]),
+            priority=int(data.get("priority", 0)),
+            extensions=frozenset(normalize_extension(extension) for extension in extensions),
+            name=name,
+            min_size=parse_size(data["min_size"]) if "min_size" in data else None,
+            max_size=parse_size(data["max_size"]) if "max_size" in data else None,
+            min_age_days=float(data["min_age_days"]) if "min_age_days" in data else None,
+            max_age_days=float(data["max_age_days"]) if "max_age_days" in data else None,
+            parent=data.get("parent"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {"category": self.category}
+        if self.priority:
+            data["priority"] = self.priority
+        if self.extensions:
+            data["extensions"] = sorted(self.extensions)
+        for key in ("name", "min_size", "max_size", "min_age_days", "max_age_days", "parent"):
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+
+def normalize_extension(extension: str) -> str:
+    extension = extension.strip().lower()
+    return extension if extension.startswith(".") else f".{extension}"
+
+
+def load_rules_file(path: Path) -> List[Rule]:
+    """Rules of a TOML or JSON file."""
+    if path.suffix.lower() == ".toml":
+        import tomllib
+
+        with open(path, "rb") as file:
+            data = tomllib.load(file)
+    else:
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+    return [Rule.from_dict(rule) for rule in data.get("rules", [])]
+
+
+def _toml_value(value: Any) -> str:
+    if isinstance(value, list):
+        return "[" + ", ".join(_toml_value(item) for item in value) + "]"
+    if isinstance(value, str):
+        # A JSON string is a valid TOML basic string
+        return json.dumps(value, ensure_ascii=False)
+    return repr(value)
+
+
+def save_rules_file(path: Path, rules: Iterable[Rule]) -> None:
+    """
+    Write rules in the format of the file's extension, replacing it atomically.
+    Comments of a TOML file are not kept.
+    """
+    records = [rule.to_dict() for rule in rules]
+    if path.suffix.lower() == ".toml":
+        text = "".join(
+            "[[rules]]\n" + "".join(f"{key} = {_toml_value(value)}\n" for key, value in record.items()) + "\n"
+            for record in records
+        )
+    else:
+        text = json.dumps({"rules": records}, ensure_ascii=False, indent=2) + "\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + ".tmp")
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+
+class _CompiledRule(NamedTuple):
+    category: str
+    name: Optional[Any]    # Bound `search` of the name regex
+    parent: Optional[Any]  # Bound `match` of the parent glob
+    min_size: Optional[int]
+    max_size: Optional[int]
+    # Bounds on the modification time, as ages in nanoseconds
+    min_age_ns: Optional[int]
+    max_age_ns: Optional[int]
+    needs_stat: bool
+    plain: bool            # No predicate besides the extension
+
+
+class RuleMatcher:
+    """
+    Rules compiled into a decision structure. For each extension, the rules
+    that may apply are kept in evaluation order; when the first of them has
+    no other predicate, its category is stored directly, so most files are
+    classified by a single dict lookup. Files are DirEntry-like objects
+    (`name`, `path`, `stat()`): the scanner's entries, whose stat results
+    are already known, are used as they are.
+    """
+
+    def __init__(self, rules: Sequence[Rule], default: str = DEFAULT_CATEGORY):
+        self.default = default
+        ordered = [rule for _, rule in sorted(enumerate(rules), key=lambda item: (-item[1].priority, item[0]))]
+        compiled = [(self._compile(rule), rule.extensions) for rule in ordered]
+        self.needs_stat = any(rule.needs_stat for rule in ordered)
+        self.needs_path = any(rule.parent is not None for rule in ordered)
+
+        # Rules without extensions apply to every file
+        self._wildcard: Tuple[_CompiledRule, ...] = tuple(rule for rule, extensions in compiled if not extensions)
+        self._candidates: Dict[str, Tuple[_CompiledRule, ...]] = {}
+        # Extension -> category, or None when the rules must be evaluated
+        self._direct: Dict[str, Optional[str]] = {}
+        for extension in {extension for rule in ordered for extension in rule.extensions}:
+            candidates = tuple(rule for rule, extensions in compiled if not extensions or extension in extensions)
+            self._candidates[extension] = candidates
+            self._direct[extension] = candidates[0].category if candidates[0].plain else None
+        # Category of the extensions no rule lists, or None when the wildcard rules must be evaluated
+        self._unlisted: Optional[str] = self._wildcard[0].category if (
+            self._wildcard and self._wildcard[0].plain
+        ) else (None if self._wildcard else default)
+
+    @property
+    def needs_entry(self) -> bool:
+        """Whether some rule looks beyond the file name."""
+        return self.needs_stat or self.needs_path
+
+    @staticmethod
+    def _compile(rule: Rule) -> _CompiledRule:
+        parent = compile_globs([rule.parent]) if rule.parent is not None else None
+        return _CompiledRule(
+            category=rule.category,
+            name=re.compile(rule.name).search if rule.name is not None else None,
+            parent=parent.match if parent is not None else None,
+            min_size=rule.min_size,
+            max_size=rule.max_size,
+            min_age_ns=int(rule.min_age_days * DAY * 1e9) if rule.min_age_days is not None else None,
+            max_age_ns=int(rule.max_age_days * DAY * 1e9) if rule.max_age_days is not None else None,
+            needs_stat=rule.needs_stat,
+            plain=rule.name is None and rule.parent is None and not rule.needs_stat,
+        )
+
+    def classify(self, entry) -> str:
+        """Category of a DirEntry-like file."""
+        name = entry.name
+        extension = split_suffix(name).lower()
+        category = self._direct.get(extension, self._unlisted)
+        if category is not None:
+            return category
+        return self._evaluate(self._candidates.get(extension, self._wildcard), name, entry)
+
+    def classify_name(self, name: str) -> str:
+        """Category from the name alone; rules on size, age or folder never match."""
+        extension = split_suffix(name).lower()
+        category = self._direct.get(extension, self._unlisted)
+        if category is not None:
+            return category
+        return self._evaluate(self._candidates.get(extension, self._wildcard), name, None)
+
+    def _evaluate(self, candidates: Sequence[_CompiledRule], name: str, entry) -> str:
+        stat = None
+        now_ns = None
+        for rule in candidates:
+            if rule.name is not None and rule.name(name) is None:
+                continue
+            if rule.parent is not None:
+                if entry is None:
+                    continue
+                folder = os.path.dirname(entry.path).replace(os.sep, "/")
+                if rule.parent(folder) is None:
+                    continue
+            if rule.needs_stat:
+                if entry is None:
+                    continue
+                if stat is None:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                if rule.min_size is not None and stat.st_size < rule.min_size:
+                    continue
+                if rule.max_size is not None and stat.st_size > rule.max_size:
+                    continue
+                if rule.min_age_ns is not None or rule.max_age_ns is not None:
+                    if now_ns is None:
+                        now_ns = time.time_ns()
+                    age = now_ns - stat.st_mtime_ns
+                    if rule.min_age_ns is not None and age < rule.min_age_ns:
+                        continue
+                    if rule.max_age_ns is not None and age > rule.max_age_ns:
+                        continue
+            return rule.category
+        return self.default
+
+
+class PathEntry:
+    """A DirEntry look-alike for a path, stat'ed at most once."""
+    __slots__ = ("name", "path", "_stat")
+
+    def __init__(self, path: Path):
+        self.path = os.fspath(path)
+        self.name = os.path.basename(self.path)
+        self._stat = None
+
+    def stat(self, follow_symlinks: bool = True):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
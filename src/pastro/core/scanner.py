@@ -0,0 +1,189 @@
+"""
+Streaming directory scanner built on ``os.scandir``.
+"""
+
+import fnmatch
+import os
+import re
+import threading
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+# Symlink policies
+SYMLINKS_SKIP = "skip"      # Ignore every symbolic link
+SYMLINKS_FILES = "files"    # Follow links to files, never descend into linked folders
+SYMLINKS_FOLLOW = "follow"  # Follow every link, guarding against loops
+
+SYMLINK_POLICIES = (SYMLINKS_SKIP, SYMLINKS_FILES, SYMLINKS_FOLLOW)
+
+
+class ScanEntry(NamedTuple):
+    """A file found by the scanner, with its category."""
+    entry: os.DirEntry
+    depth: int
+    category: str
+
+    @property
+    def path(self) -> str:
+        return self.entry.path
+
+    @property
+    def name(self) -> str:
+        return self.entry.name
+
+
+def compile_globs(patterns: Sequence[str]) -> Optional[re.Pattern]:
+    """Compile glob patterns into a single regex, or None when there are none."""
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if os.path.normcase("A") == "a" else 0
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns), flags)
+
+
+class Scanner:
+    """
+    Walks a folder tree lazily with ``os.scandir``.
+
+    `max_depth` 0 only lists the root folder, None has no limit. Globs without
+    a "/" are matched against the entry name, the others against the path
+    relative to the root (always with "/" separators). Excluded folders are pruned.
+    `io_limit`, a semaphore shared with other scanners or executors, is held
+    while a folder is listed.
+    """
+
+    def __init__(
+        self,
+        max_depth: Optional[int] = 0,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = (),
+        symlinks: str = SYMLINKS_FILES,
+        on_error: Optional[Callable[[OSError], None]] = None,
+        io_limit: Optional[threading.Semaphore] = None,
+    ):
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Política de links simbólicos inválida: {symlinks}")
+        self.max_depth = max_depth
+        self.symlinks = symlinks
+        self.on_error = on_error
+        self._io = io_limit if io_limit is not None else nullcontext()
+        self._include_names, self._include_paths = self._split_globs(include)
+        self._exclude_names, self._exclude_paths = self._split_globs(exclude)
+
+    @staticmethod
+    def _split_globs(patterns: Sequence[str]) -> Tuple[Optional[re.Pattern], Optional[re.Pattern]]:
+        """Separate name globs from relative path globs."""
+        names = [pattern for pattern in patterns if "/" not in pattern]
+        paths = [pattern for pattern in patterns if "/" in pattern]
+        return compile_globs(names), compile_globs(paths)
+
+    def _excluded(self, name: str, relative: str) -> bool:
+        if self._exclude_names is not None and self._exclude_names.match(name):
+            return True
+        return self._exclude_paths is not None and self._exclude_paths.match(relative) is not None
+
+    def _included(self, name: str, relative: str) -> bool:
+        if self._include_names is None and self._include_paths is None:
+            return True
+        if self._include_names is not None and self._include_names.match(name):
+            return True
+        return self._include_paths is not None and self._include_paths.match(relative) is not None
+
+    def _list(self, folder: str):
+        """Open the listing of a folder; a context manager yielding DirEntry-like objects."""
+        return os.scandir(folder)
+
+    def walk(self, root: Union[str, Path]) -> Iterator[Tuple[os.DirEntry, int]]:
+        """
+        Yield (entry, depth) for every file under `root`, depth-first.
+        Only the stack of pending folders is kept in memory.
+        """
+        root = os.fspath(root)
+        visited = self.visited_root(root)
+        stack: List[Tuple[str, str, int]] = [(root, "", 0)]
+        while stack:
+            folder, prefix, depth = stack.pop()
+            subfolders: List[Tuple[str, str, int]] = []
+            try:
+                yield from self._files(folder, prefix, depth, subfolders, visited)
+            except OSError as error:
+                self._report(error)
+                continue
+            # Reversed so folders are visited in the order scandir returned them
+            stack.extend(reversed(subfolders))
+
+    def visited_root(self, root: str) -> Set[Tuple[int, int]]:
+        """The folders seen at the start of a walk: the root, when links are followed."""
+        visited: Set[Tuple[int, int]] = set()
+        if self.symlinks == SYMLINKS_FOLLOW:
+            root_stat = os.stat(root)
+            visited.add((root_stat.st_dev, root_stat.st_ino))
+        return visited
+
+    def list_folder(
+        self, folder: str, prefix: str, depth: int, visited: Set[Tuple[int, int]]
+    ) -> Tuple[List[Tuple[os.DirEntry, int]], List[Tuple[str, str, int]]]:
+        """
+        The (entry, depth) of the files in one folder, and the (folder, prefix,
+        depth) of its subfolders to visit, for callers listing folders
+        concurrently. Raises OSError if the folder cannot be listed.
+        """
+        subfolders: List[Tuple[str, str, int]] = []
+        files = list(self._files(folder, prefix, depth, subfolders, visited))
+        return files, subfolders
+
+    def _files(
+        self,
+        folder: str,
+        prefix: str,
+        depth: int,
+        subfolders: List[Tuple[str, str, int]],
+        visited: Set[Tuple[int, int]],
+    ) -> Iterator[Tuple[os.DirEntry, int]]:
+        """Files of a folder; the subfolders to visit are appended to `subfolders`."""
+        follow = self.symlinks == SYMLINKS_FOLLOW
+        # Read whole, so the permit is not held while the caller consumes the files
+        with self._io, self._list(folder) as listing:
+            entries = list(listing)
+        for entry in entries:
+            relative = prefix + entry.name
+            if self._excluded(entry.name, relative):
+                continue
+            try:
+                is_link = entry.is_symlink()
+                if is_link and self.symlinks == SYMLINKS_SKIP:
+                    continue
+                # is_file/is_dir use the type cached by scandir, except for links
+                if entry.is_file():
+                    if self._included(entry.name, relative):
+                        yield entry, depth
+                elif entry.is_dir():
+                    if self.max_depth is not None and depth >= self.max_depth:
+                        continue
+                    if is_link and not follow:
+                        continue
+                    if follow:
+                        stat = entry.stat()
+                        key = (stat.st_dev, stat.st_ino)
+                        if key in visited:
+                            continue
+                        visited.add(key)
+                    subfolders.append((entry.path, relative + "/", depth + 1))
+            except OSError as error:
+                self._report(error)
+
+    def scan(self, root: Union[str, Path], classify: Callable, by_entry: bool = False) -> Iterator[ScanEntry]:
+        """
+        Yield every file under `root` with the category given by `classify(name)`,
+        or `classify(entry)` with `by_entry`, for rules that need its metadata.
+        """
+        if by_entry:
+            for entry, depth in self.walk(root):
+                yield ScanEntry(entry, depth, classify(entry))
+            return
+        for entry, depth in self.walk(root):
+            yield ScanEntry(entry, depth, classify(entry.name))
+
+    def _report(self, error: OSError) -> None:
+        if self.on_error is not None:
+            self.on_error(error)
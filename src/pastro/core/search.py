@@ -0,0 +1,274 @@
+"""
+Search index over the files of a `FileTable`, for filtering lists of
+millions of files as the user types. Every trigram of a lowercased name
+points to the rows holding it, so a substring only has to be checked on the
+rows of its rarest trigram.
+
+A query is a list of terms, all of which must match:
+
+- ``foto``: part of the name, in any case;
+- ``*.jp?g``, ``img_2024*``: a glob on the whole name;
+- ``ext:pdf``: the extension;
+- ``cat:imagens`` (or ``categoria:``): part of the category;
+- ``>10MB``, ``<=500KB``: the size.
+"""
+
+import fnmatch
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .filetable import UNKNOWN_SIZE, FileGroup, FileTable
+from .rules import parse_size
+
+# Rows checked between two looks at the cancellation of a query
+QUERY_CHUNK = 16384
+GLOB_CHARACTERS = re.compile(r"[*?\[\]]")
+# Wildcards and bracket sets, between the literal parts of a glob
+GLOB_WILDCARDS = re.compile(r"\[[^\]]*\]?|[*?]")
+SIZE_TERM = re.compile(r"([<>]=?)\s*(.+)")
+CATEGORY_PREFIXES = ("cat:", "categoria:")
+EXTENSION_PREFIX = "ext:"
+
+Rows = Sequence  # Of row numbers
+RowFilter = Callable[[Rows], List[int]]
+
+
+class SearchIndex:
+    """
+    Trigram index of the names of a `FileTable`, which may keep growing:
+    `update` indexes the rows added since the previous call. Rows can be
+    dropped with `discard`, e.g. once their file has moved away.
+
+    One thread at a time may add rows, while any number of threads query:
+    a query only looks at the rows indexed when it started.
+    """
+
+    def __init__(self, table: Optional[FileTable] = None):
+        self.table = table if table is not None else FileTable()
+        self._folded: List[str] = []  # Lowercased names, by row
+        self._grams: Dict[str, array] = {}
+        self._alive = bytearray()
+        self._discarded = 0
+        self._indexed = 0
+        self._rows_by_path: Optional[Dict[str, int]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._indexed - self._discarded
+
+    @classmethod
+    def from_groups(
+        cls, groups: Dict[str, Sequence], cancelled: Optional[Callable[[], bool]] = None
+    ) -> Optional["SearchIndex"]:
+        """
+        An index of files by category, as paths or `FileGroup`s (whose sizes
+        are kept); None if `cancelled` returns True before it is built.
+        """
+        index = cls()
+        table = index.table
+        for category, files in groups.items():
+            if cancelled is not None and cancelled():
+                return None
+            if isinstance(files, FileGroup):
+                sizes = files.table.sizes
+                for row, folder, name in files.items():
+                    table.add(folder, name, category, sizes[row])
+            else:
+                for path in files:
+                    table.add_path(path, category)
+            index.update()
+        return index
+
+    def add(self, folder: str, name: str, category: str, size: int = UNKNOWN_SIZE) -> int:
+        """Add a file to the table and index it; returns its row."""
+        with self._lock:
+            row = self.table.add(folder, name, category, size)
+            self._index_rows()
+            if self._rows_by_path is not None:
+                self._rows_by_path[os.path.join(folder, name)] = row
+        return row
+
+    def update(self) -> int:
+        """Index the rows added to the table since the last update; returns the rows indexed in all."""
+        with self._lock:
+            self._index_rows()
+            if self._rows_by_path is not None:
+                self._rows_by_path = None  # Rebuilt on the next lookup
+        return self._indexed
+
+    def _index_rows(self) -> None:
+        names = self.table.names
+        start, end = len(self._folded), len(names)
+        folded_names = self._folded
+        grams = self._grams
+        for row in range(start, end):
+            name = names[row]
+            folded = name.lower()
+            # The same string object when the name already is lowercase
+            folded_names.append(name if folded == name else folded)
+            for gram in {folded[i:i + 3] for i in range(len(folded) - 2)}:
+                posting = grams.get(gram)
+                if posting is None:
+                    posting = grams[gram] = array("I")
+                posting.append(row)
+        self._alive.extend(b"\x01" * (end - start))
+        # Published last: queries only read the rows below it
+        self._indexed = end
+
+    def discard(self, row: int) -> None:
+        """Leave a row out of every query and of `names`."""
+        if self._alive[row]:
+            self._alive[row] = 0
+            self._discarded += 1
+
+    def discard_path(self, path) -> bool:
+        """Leave the file at `path` out; False if it is not in the index."""
+        with self._lock:
+            if self._rows_by_path is None:
+                table = self.table
+                self._rows_by_path = {table.path(row): row for row in range(self._indexed) if self._alive[row]}
+            row = self._rows_by_path.pop(os.fspath(path), None)
+        if row is None:
+            return False
+        self.discard(row)
+        return True
+
+    # Queries
+
+    def rows(self) -> Rows:
+        """Every row not discarded."""
+        if not self._discarded:
+            return range(self._indexed)
+        alive = self._alive
+        return array("I", (row for row in range(self._indexed) if alive[row]))
+
+    def names(self, rows: Optional[Rows] = None) -> Sequence:
+        """Names of `rows`, or of every row not discarded, read when accessed."""
+        if rows is None and not self._discarded:
+            # Grows with the table, for a list shown while it is filled
+            return self.table.names
+        return NameView(self.table.names, self.rows() if rows is None else rows)
+
+    def groups(self, rows: Iterable[int]) -> Dict[str, FileGroup]:
+        """Rows by category, as `FileGroup`s; categories without rows are left out."""
+        codes = self.table.codes
+        by_code: Dict[int, array] = {}
+        for row in rows:
+            code = codes[row]
+            group = by_code.get(code)
+            if group is None:
+                group = by_code[code] = array("I")
+            group.append(row)
+        categories = self.table.categories
+        return {categories[code]: FileGroup(self.table, by_code[code]) for code in sorted(by_code)}
+
+    def query(self, text: str, cancelled: Optional[Callable[[], bool]] = None) -> Optional[array]:
+        """
+        Rows matching every term of `text`, in table order; every row for an
+        empty text. None if `cancelled` returns True before the end.
+        """
+        bound = self._indexed
+        filters: List[RowFilter] = []
+        literals: List[str] = []
+        for term in text.split():
+            row_filter, literal = self._compile(term)
+            filters.append(row_filter)
+            if literal:
+                literals.append(literal)
+        if self._discarded:
+            alive = self._alive
+            filters.append(lambda rows: [row for row in rows if alive[row]])
+
+        candidates = self._candidates(literals, bound)
+        result = array("I")
+        for start in range(0, len(candidates), QUERY_CHUNK):
+            if cancelled is not None and cancelled():
+                return None
+            chunk = candidates[start:start + QUERY_CHUNK]
+            for row_filter in filters:
+                chunk = row_filter(chunk)
+                if not chunk:
+                    break
+            result.extend(chunk)
+        return result
+
+    def _candidates(self, literals: List[str], bound: int) -> Rows:
+        """
+        The rows of the rarest trigram among the literals of the terms, all
+        of which a match holds; every row when no literal is long enough.
+        """
+        best: Optional[array] = None
+        for literal in literals:
+            for i in range(len(literal) - 2):
+                posting = self._grams.get(literal[i:i + 3])
+                if posting is None:
+                    return ()
+                if best is None or len(posting) < len(best):
+                    best = posting
+        if best is None:
+            return range(bound)
+        # Postings are in row order; rows indexed after the query started are left out
+        return best[:bisect_left(best, bound)]
+
+    def _compile(self, term: str):
+        """The filter of one term, and a literal (at least 3 characters) every match contains."""
+        folded_term = term.lower()
+        names = self._folded
+        if folded_term.startswith(CATEGORY_PREFIXES):
+            part = folded_term.split(":", 1)[1]
+            wanted = {code for code, category in enumerate(self.table.categories) if part in category.lower()}
+            codes = self.table.codes
+            return (lambda rows: [row for row in rows if codes[row] in wanted]), None
+
+        if folded_term.startswith(EXTENSION_PREFIX):
+            suffix = "." + folded_term[len(EXTENSION_PREFIX):].lstrip(".")
+            return (lambda rows: [row for row in rows if names[row].endswith(suffix)]), suffix
+
+        match = SIZE_TERM.fullmatch(term)
+        if match:
+            try:
+                size = parse_size(match.group(2))
+            except ValueError:
+                pass  # A name with "<" or ">", searched as such
+            else:
+                return self._size_filter(match.group(1), size), None
+
+        if GLOB_CHARACTERS.search(folded_term):
+            pattern = re.compile(fnmatch.translate(folded_term))
+            literal = max(GLOB_WILDCARDS.split(folded_term), key=len)
+            return (lambda rows: [row for row in rows if pattern.match(names[row])]), literal
+
+        return (lambda rows: [row for row in rows if folded_term in names[row]]), folded_term
+
+    def _size_filter(self, operator: str, size: int) -> RowFilter:
+        sizes = self.table.sizes
+        # Files of unknown size match no size term
+        if operator == ">":
+            return lambda rows: [row for row in rows if sizes[row] > size]
+        if operator == ">=":
+            return lambda rows: [row for row in rows if sizes[row] >= size]
+        if operator == "<":
+            return lambda rows: [row for row in rows if 0 <= sizes[row] < size]
+        return lambda rows: [row for row in rows if 0 <= sizes[row] <= size]
+
+
+class NameView(Sequence):
+    """Names of some rows of a table, read when accessed."""
+    __slots__ = ("names", "rows")
+
+    def __init__(self, names: List[str], rows: Rows):
+        self.names = names
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return NameView(self.names, self.rows[index])
+        return self.names[self.rows[index]]
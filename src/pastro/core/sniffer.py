@@ -0,0 +1,270 @@
+"""
+Content sniffing: recognizes files by their magic bytes when the extension is unknown.
+"""
+
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .filetable import FileTable
+
+# Bytes read from each file at most
+DEFAULT_BUDGET = 2048
+# Files handed to a pool thread at once; one future per file costs more than the read
+CHUNK_SIZE = 256
+
+
+class Signature(NamedTuple):
+    """Magic bytes at an offset, mapped to a canonical extension."""
+    offset: int
+    magic: bytes
+    extension: str
+    # Optional check of the rest of the header; returns a better extension or None
+    refine: Optional[Callable[[bytearray, int], Optional[str]]] = None
+
+
+def _riff(buffer: bytearray, size: int) -> Optional[str]:
+    kinds = {b"WEBP": ".webp", b"AVI ": ".avi", b"WAVE": ".wav"}
+    return kinds.get(bytes(buffer[8:12])) if size >= 12 else None
+
+
+# Sizes of the known BMP info headers, from BITMAPCOREHEADER to BITMAPV5HEADER
+_BMP_HEADER_SIZES = {12, 16, 40, 52, 56, 64, 108, 124}
+# Offset of the PE header's offset in the DOS header of an executable
+_PE_OFFSET = 0x3C
+
+
+def _bmp(buffer: bytearray, size: int) -> Optional[str]:
+    """"BM" starts plenty of text too: the reserved bytes must be zero, the info header known."""
+    if size < 18 or any(buffer[6:10]):
+        return None
+    return ".bmp" if struct.unpack_from("<I", buffer, 14)[0] in _BMP_HEADER_SIZES else None
+
+
+def _pe(buffer: bytearray, size: int) -> Optional[str]:
+    """Windows executables: the DOS header points to a "PE" header, within the bytes read."""
+    if size < _PE_OFFSET + 4:
+        return None
+    offset = struct.unpack_from("<I", buffer, _PE_OFFSET)[0]
+    if offset + 4 > size or buffer[offset:offset + 4] != b"PE\0\0":
+        return None
+    return ".exe"
+
+
+def _ftyp(buffer: bytearray, size: int) -> Optional[str]:
+    """ISO media files; the brand tells audio, QuickTime and MP4 apart."""
+    if size < 12:
+        return None
+    brand = bytes(buffer[8:12])
+    if brand in (b"M4A ", b"M4B "):
+        return ".m4a"
+    if brand == b"qt  ":
+        return ".mov"
+    return ".mp4"
+
+
+def _zip(buffer: bytearray, size: int) -> str:
+    """Office documents are zip files; their first member names give them away."""
+    if buffer.startswith(b"mimetypeapplication/vnd.oasis.opendocument.", 30, size):
+        kind_start = 30 + len(b"mimetypeapplication/vnd.oasis.opendocument.")
+        kind = bytes(buffer[kind_start:kind_start + 12])
+        if kind.startswith(b"spreadsheet"):
+            return ".ods"
+        if kind.startswith(b"presentation"):
+            return ".odp"
+        return ".odt"
+    if buffer.find(b"word/", 0, size) != -1:
+        return ".docx"
+    if buffer.find(b"xl/", 0, size) != -1:
+        return ".xlsx"
+    if buffer.find(b"ppt/", 0, size) != -1:
+        return ".pptx"
+    return ".zip"
+
+
+def _shebang(buffer: bytearray, size: int) -> str:
+    end = buffer.find(b"\n", 0, size)
+    line = bytes(buffer[:end if end != -1 else size])
+    return ".py" if b"python" in line else ".sh"
+
+
+def _markup(buffer: bytearray, size: int) -> Optional[str]:
+    header = bytes(buffer[:size]).lower()
+    if b"<svg" in header:
+        return ".svg"
+    if b"<html" in header or b"<!doctype html" in header:
+        return ".html"
+    return None
+
+
+# Formats of the default categories
+SIGNATURES: Tuple[Signature, ...] = (
+    # Imagens
+    Signature(0, b"\xff\xd8\xff", ".jpg"),
+    Signature(0, b"\x89PNG\r\n\x1a\n", ".png"),
+    Signature(0, b"GIF87a", ".gif"),
+    Signature(0, b"GIF89a", ".gif"),
+    Signature(0, b"BM", ".bmp", _bmp),
+    Signature(0, b"RIFF", "", _riff),
+    Signature(0, b"<", "", _markup),
+    Signature(0, b"\xef\xbb\xbf<", "", _markup),
+    # Documentos, planilhas e apresentações
+    Signature(0, b"%PDF-", ".pdf"),
+    Signature(0, b"{\\rtf", ".rtf"),
+    Signature(0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", ".doc"),
+    Signature(0, b"PK\x03\x04", ".zip", _zip),
+    # Vídeos e áudios
+    Signature(4, b"ftyp", ".mp4", _ftyp),
+    Signature(0, b"\x1a\x45\xdf\xa3", ".mkv"),
+    Signature(0, b"\x30\x26\xb2\x75\x8e\x66\xcf\x11", ".wmv"),
+    Signature(0, b"ID3", ".mp3"),
+    Signature(0, b"\xff\xfb", ".mp3"),
+    Signature(0, b"\xff\xf3", ".mp3"),
+    Signature(0, b"\xff\xf2", ".mp3"),
+    Signature(0, b"OggS", ".ogg"),
+    # Compactados
+    Signature(0, b"Rar!\x1a\x07", ".rar"),
+    Signature(0, b"7z\xbc\xaf\x27\x1c", ".7z"),
+    Signature(0, b"\x1f\x8b", ".gz"),
+    Signature(257, b"ustar", ".tar"),
+    # Executáveis e códigos
+    Signature(0, b"MZ", ".exe", _pe),
+    Signature(0, b"#!", ".sh", _shebang),
+)
+
+
+class SignatureTable:
+    """
+    Signatures compiled for lookup: for each value of the first byte, the
+    offset-0 signatures starting with it, then the ones at other offsets.
+    """
+
+    def __init__(self, signatures: Iterable[Signature] = SIGNATURES):
+        signatures = list(signatures)
+        by_first_byte: Dict[int, List[Signature]] = {}
+        other_offsets: List[Signature] = []
+        for signature in signatures:
+            if signature.offset == 0:
+                by_first_byte.setdefault(signature.magic[0], []).append(signature)
+            else:
+                other_offsets.append(signature)
+        # Longest magic first, so specific signatures win over their prefixes
+        for candidates in by_first_byte.values():
+            candidates.sort(key=lambda signature: len(signature.magic), reverse=True)
+        self.candidates: List[Tuple[Signature, ...]] = [
+            tuple(by_first_byte.get(byte, ())) + tuple(other_offsets) for byte in range(256)
+        ]
+        self.min_budget = max(
+            (signature.offset + len(signature.magic) for signature in signatures), default=0
+        )
+
+    def match(self, buffer: bytearray, size: int) -> Optional[str]:
+        """Canonical extension for a header of `size` bytes, or None."""
+        if size == 0:
+            return None
+        for signature in self.candidates[buffer[0]]:
+            end = signature.offset + len(signature.magic)
+            if end > size or not buffer.startswith(signature.magic, signature.offset, end):
+                continue
+            if signature.refine is None:
+                return signature.extension
+            refined = signature.refine(buffer, size)
+            if refined:
+                return refined
+        return None
+
+
+class ContentSniffer:
+    """
+    Reads at most `budget` bytes from files into a per-thread buffer reused for
+    every file, and matches them against a `SignatureTable`. `io_limit`, a
+    semaphore shared with scanners and executors, is held during each read.
+    """
+
+    def __init__(
+        self,
+        budget: int = DEFAULT_BUDGET,
+        workers: int = 8,
+        table: Optional[SignatureTable] = None,
+        io_limit: Optional[threading.Semaphore] = None,
+    ):
+        self.table = table or SignatureTable()
+        self.budget = max(budget, self.table.min_budget)
+        self.workers = workers
+        self.bytes_read = 0
+        self._local = threading.local()
+        self._io = io_limit if io_limit is not None else nullcontext()
+
+    def _buffer(self) -> bytearray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray(self.budget)
+        return buffer
+
+    def _sniff(self, path: Path) -> Tuple[Optional[str], int]:
+        buffer = self._buffer()
+        try:
+            # Unbuffered, so nothing beyond the budget is read
+            with self._io, open(path, "rb", buffering=0) as file:
+                size = file.readinto(buffer) or 0
+        except OSError:
+            return None, 0
+        return self.table.match(buffer, size), size
+
+    def sniff(self, path: Path) -> Optional[str]:
+        """Canonical extension of a file from its content, or None."""
+        extension, size = self._sniff(path)
+        self.bytes_read += size
+        return extension
+
+    def _sniff_chunk(self, paths: List[Path]) -> List[Tuple[Optional[str], int]]:
+        return [self._sniff(path) for path in paths]
+
+    def sniff_many(self, paths: Iterable[Path]) -> Iterator[Tuple[Path, Optional[str]]]:
+        """Sniff files in a thread pool, so reads overlap; results keep the input order."""
+        paths = list(paths)
+        chunks = [paths[start:start + CHUNK_SIZE] for start in range(0, len(paths), CHUNK_SIZE)]
+        if self.workers <= 1 or len(chunks) <= 1:
+            results = map(self._sniff_chunk, chunks)
+            pool = None
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pastro-sniff")
+            results = pool.map(self._sniff_chunk, chunks)
+        try:
+            for chunk, sniffed in zip(chunks, results):
+                for path, (extension, size) in zip(chunk, sniffed):
+                    self.bytes_read += size
+                    yield path, extension
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def reclassify(
+        self, classification: Dict[str, List[Path]], classify: Callable[[str], str], unknown: str = "Outros"
+    ) -> Dict[str, List[Path]]:
+        """
+        Move the files of the `unknown` category that are recognized by content
+        to the category `classify` gives to a name with their real extension.
+        """
+        unrecognized: List[Path] = []
+        for path, extension in self.sniff_many(classification.get(unknown, ())):
+            category = classify("_" + extension) if extension else unknown
+            if category == unknown:
+                unrecognized.append(path)
+            else:
+                classification.setdefault(category, []).append(path)
+        if unknown in classification:
+            classification[unknown] = unrecognized
+        return classification
+
+    def reclassify_table(self, table: FileTable, classify: Callable[[str], str], unknown: str = "Outros") -> None:
+        """`reclassify` for the rows of a `FileTable`, whose categories are changed in place."""
+        rows = table.rows_in(unknown)
+        for row, (_, extension) in zip(rows, self.sniff_many(table.path(row) for row in rows)):
+            if extension:
+                category = classify("_" + extension)
+                if category != unknown:
+                    table.set_category(row, category)
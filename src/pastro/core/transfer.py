@@ -0,0 +1,224 @@
+"""
+File moves across filesystems without copying the data through Python: a
+reflink clone where the target filesystem can share blocks with the source,
+else ``os.copy_file_range`` or ``os.sendfile`` in the kernel, else a buffered
+copy. Data and metadata are written to a partial file next to the target,
+renamed into place once complete, and only then is the source removed.
+
+With `verify`, the data goes through a buffer instead, hashed in the same
+pass; the copy is flushed, read back and compared before the source goes.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import stat
+from typing import Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+METHOD_REFLINK = "reflink"
+METHOD_COPY_FILE_RANGE = "copy_file_range"
+METHOD_SENDFILE = "sendfile"
+METHOD_BUFFERED = "buffered"
+METHOD_VERIFIED = "verified"
+# Anything that is not a regular file, moved by ``shutil.move``
+METHOD_SHUTIL = "copy"
+
+# Partial copies are written as "<name><suffix>" in the target folder
+PARTIAL_SUFFIX = ".pastro-part"
+# Bytes per copy_file_range or sendfile call
+KERNEL_CHUNK_SIZE = 1024 * 1024 * 1024
+# Buffer of the copies done in Python
+BUFFER_SIZE = 1024 * 1024
+# ioctl cloning a whole file on Linux (btrfs, XFS, bcachefs...)
+FICLONE = 0x40049409
+
+# Errors meaning a method cannot be used for this pair of files, so the next one is tried
+UNSUPPORTED = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTTY, errno.EBADF, errno.EPERM}
+
+
+class VerificationError(OSError):
+    """The copy read back differs from the source; the source is kept."""
+
+
+def _clone(source_fd: int, target_fd: int, size: int) -> bool:
+    """Share the source blocks with the target; False where the filesystem cannot."""
+    if fcntl is None or not size:
+        return False
+    try:
+        fcntl.ioctl(target_fd, FICLONE, source_fd)
+    except OSError as error:
+        if error.errno in UNSUPPORTED:
+            return False
+        raise
+    return True
+
+
+def _kernel_copy(copy: Callable[[int, int, int], int], source_fd: int, target_fd: int, size: int) -> bool:
+    """
+    Copy with `copy(source_fd, target_fd, count)` from the current offsets
+    until the end of the source; False if the first call finds it unsupported,
+    or copies nothing from a source of `size` bytes, as on some FUSE and
+    network filesystems.
+    """
+    started = False
+    while True:
+        try:
+            copied = copy(source_fd, target_fd, KERNEL_CHUNK_SIZE)
+        except OSError as error:
+            if not started and error.errno in UNSUPPORTED:
+                return False
+            raise
+        if not copied:
+            return started or not size
+        started = True
+
+
+def _copy_file_range(source_fd: int, target_fd: int, count: int) -> int:
+    return os.copy_file_range(source_fd, target_fd, count)
+
+
+def _sendfile(source_fd: int, target_fd: int, count: int) -> int:
+    return os.sendfile(target_fd, source_fd, None, count)
+
+
+def _write_all(target_fd: int, data: memoryview) -> None:
+    while data:
+        data = data[os.write(target_fd, data):]
+
+
+def _reader(fd: int):
+    """Unbuffered reads into a buffer from a descriptor left open."""
+    return open(fd, "rb", buffering=0, closefd=False).readinto
+
+
+def _buffered_copy(source_fd: int, target_fd: int, digest=None) -> None:
+    """Copy through a buffer, hashing what is read into `digest` if given."""
+    read = _reader(source_fd)
+    view = memoryview(bytearray(BUFFER_SIZE))
+    while True:
+        count = read(view)
+        if not count:
+            return
+        if digest is not None:
+            digest.update(view[:count])
+        _write_all(target_fd, view[:count])
+
+
+def _hash_fd(fd: int) -> bytes:
+    digest = hashlib.blake2b(digest_size=32)
+    read = _reader(fd)
+    view = memoryview(bytearray(BUFFER_SIZE))
+    while True:
+        count = read(view)
+        if not count:
+            return digest.digest()
+        digest.update(view[:count])
+
+
+def _copy_data(source_fd: int, target_fd: int, size: int) -> str:
+    """Copy a whole file with the cheapest method that works; returns its name."""
+    if _clone(source_fd, target_fd, size):
+        return METHOD_REFLINK
+    if hasattr(os, "copy_file_range") and _kernel_copy(_copy_file_range, source_fd, target_fd, size):
+        return METHOD_COPY_FILE_RANGE
+    if hasattr(os, "sendfile") and _kernel_copy(_sendfile, source_fd, target_fd, size):
+        return METHOD_SENDFILE
+    _buffered_copy(source_fd, target_fd)
+    return METHOD_BUFFERED
+
+
+def _verified_copy(source_fd: int, target_fd: int, partial: str) -> str:
+    """
+    Copy through a buffer, hashing the source as it is read, then compare
+    with the copy as read back from the disk rather than from the page cache
+    where the system allows dropping it.
+    """
+    digest = hashlib.blake2b(digest_size=32)
+    _buffered_copy(source_fd, target_fd, digest)
+    os.fsync(target_fd)
+    check_fd = os.open(partial, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(check_fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        if _hash_fd(check_fd) != digest.digest():
+            raise VerificationError(errno.EIO, "A cópia difere do original", partial)
+    finally:
+        os.close(check_fd)
+    return METHOD_VERIFIED
+
+
+def transfer_file(source, target, verify: bool = False) -> str:
+    """
+    Copy a regular file with its metadata (as ``shutil.copy2``), replacing
+    `target` only once the copy is complete and, with `verify`, checked.
+    Returns the copy method used.
+    """
+    source, target = os.fspath(source), os.fspath(target)
+    folder, name = os.path.split(target)
+    partial = os.path.join(folder, name + PARTIAL_SUFFIX)
+    binary = getattr(os, "O_BINARY", 0)
+    source_fd = os.open(source, os.O_RDONLY | binary)
+    try:
+        size = os.fstat(source_fd).st_size
+        target_fd = os.open(partial, os.O_RDWR | os.O_CREAT | os.O_TRUNC | binary, 0o600)
+        try:
+            try:
+                if verify:
+                    method = _verified_copy(source_fd, target_fd, partial)
+                else:
+                    method = _copy_data(source_fd, target_fd, size)
+                # A copy cut short must not replace the target, nor let the source go
+                copied = os.fstat(target_fd).st_size
+                if copied != size:
+                    raise OSError(errno.EIO, f"Cópia incompleta: {copied} de {size} bytes", partial)
+            finally:
+                os.close(target_fd)
+            # After the data, which would change the modification time
+            shutil.copystat(source, partial)
+            os.replace(partial, target)
+        except BaseException:
+            try:
+                os.unlink(partial)
+            except OSError:
+                pass
+            raise
+    finally:
+        os.close(source_fd)
+    return method
+
+
+def move_file(source, target, verify: bool = False) -> str:
+    """
+    Move a file to another filesystem: `transfer_file`, then remove the
+    source. Symlinks and special files are left to ``shutil.move``. Returns
+    the copy method used.
+    """
+    if not stat.S_ISREG(os.lstat(source).st_mode):
+        shutil.move(os.fspath(source), os.fspath(target))
+        return METHOD_SHUTIL
+    method = transfer_file(source, target, verify)
+    if verify:
+        _sync_folder(os.path.dirname(os.fspath(target)))
+    os.unlink(source)
+    return method
+
+
+def _sync_folder(folder: str) -> None:
+    """Make a rename in `folder` durable before the source is removed, where folders can be synced."""
+    try:
+        fd = os.open(folder or os.curdir, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
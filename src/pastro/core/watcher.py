@@ -0,0 +1,221 @@
+"""
+Watch mode: organizes files as they arrive in the watched folders.
+"""
+
+import argparse
+import logging
+import os
+import stat as stat_module
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from .classifier import AutoClassifier
+from .mover import MoveExecutor, MoveReport
+from .planner import plan_moves
+from .scanner import Scanner
+from .sniffer import ContentSniffer
+
+logger = logging.getLogger(__name__)
+
+# Suffixes of downloads still in progress; the final file shows up once they finish
+PARTIAL_DOWNLOAD_SUFFIXES = (".crdownload", ".part", ".download")
+
+
+class _EventCollector(FileSystemEventHandler):
+    """Forwards file events to the daemon; directories are ignored."""
+
+    def __init__(self, daemon: "WatchDaemon"):
+        super().__init__()
+        self.daemon = daemon
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.daemon.notify(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.daemon.notify(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.daemon.notify(event.dest_path)
+
+
+class WatchDaemon:
+    """
+    Watches the top level of some folders and moves new files into their
+    category folders.
+
+    Events only record the path and its time, so bursts of thousands of
+    events are coalesced: files are handled in one batch (at most `batch_limit`)
+    once the folders were quiet for `debounce` seconds, or when the oldest event
+    waited `max_delay` seconds during a long burst. Files modified less than
+    `settle` seconds ago wait for the next batch.
+    """
+
+    def __init__(
+        self,
+        folders: Sequence[Path],
+        classifier: Optional[AutoClassifier] = None,
+        executor: Optional[MoveExecutor] = None,
+        debounce: float = 0.5,
+        settle: float = 1.0,
+        max_delay: float = 5.0,
+        batch_limit: int = 10000,
+    ):
+        self.folders = [Path(folder).resolve() for folder in folders]
+        if classifier is None:
+            classifier = AutoClassifier()
+            classifier.load_rules()
+        self.classifier = classifier
+        self.executor = executor or MoveExecutor()
+        self.sniffer = ContentSniffer()
+        self.debounce = debounce
+        self.settle = settle
+        self.max_delay = max_delay
+        self.batch_limit = batch_limit
+
+        # Path -> time of its first pending event
+        self._pending: Dict[str, float] = {}
+        self._last_event = 0.0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._observer = Observer()
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self, path: str) -> None:
+        """Record an event for a path; called from the observer thread."""
+        now = time.monotonic()
+        with self._lock:
+            self._pending.setdefault(path, now)
+            self._last_event = now
+        self._wakeup.set()
+
+    def start(self, process_existing: bool = False) -> None:
+        """Start watching; optionally queue the files already in the folders."""
+        handler = _EventCollector(self)
+        for folder in self.folders:
+            self._observer.schedule(handler, str(folder), recursive=False)
+        self._observer.start()
+        if process_existing:
+            for folder in self.folders:
+                for entry, _ in Scanner().walk(folder):
+                    self.notify(entry.path)
+        self._thread = threading.Thread(target=self._run, name="pastro-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        self._observer.stop()
+        self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run_forever(self, process_existing: bool = False) -> None:
+        """Watch until interrupted with Ctrl+C."""
+        self.start(process_existing)
+        try:
+            while not self._stopping.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            # Wake up on new events, and periodically for files still settling
+            self._wakeup.wait(timeout=self.debounce)
+            self._wakeup.clear()
+            batch = self._take_ready()
+            if batch:
+                try:
+                    self.process(batch)
+                except Exception:
+                    logger.exception("Erro ao organizar lote de %d arquivo(s)", len(batch))
+
+    def _take_ready(self) -> List[str]:
+        """Remove and return the next batch, once the burst of events is over."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._pending:
+                return []
+            if now - self._last_event < self.debounce:
+                # Dicts keep insertion order, so the first path is the oldest one
+                oldest = next(iter(self._pending.values()))
+                if now - oldest < self.max_delay:
+                    return []
+            ready = list(self._pending)[:self.batch_limit]
+            for path in ready:
+                del self._pending[path]
+        return ready
+
+    def process(self, paths: List[str]) -> Optional[MoveReport]:
+        """Classify and move a batch of paths, re-queueing files that are not complete yet."""
+        now = time.time()
+        by_folder: Dict[Path, List[Path]] = {}
+        for path in paths:
+            file_path = Path(path)
+            folder = file_path.parent
+            if folder not in self.folders or file_path.name.lower().endswith(PARTIAL_DOWNLOAD_SUFFIXES):
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Already gone, e.g. a temporary file
+            if not stat_module.S_ISREG(stat.st_mode):
+                continue
+            if now - stat.st_mtime < self.settle or self._download_in_progress(path):
+                self._requeue(path)
+                continue
+            by_folder.setdefault(folder, []).append(file_path)
+
+        operations = []
+        for folder, files in by_folder.items():
+            classification = self.classifier.classify_files(files)
+            self.sniffer.reclassify(classification, self.classifier.get_category_for_name)
+            operations.extend(plan_moves(classification, folder))
+        if not operations:
+            return None
+
+        report = self.executor.execute(operations)
+        logger.info(report.summary())
+        for result in report.failures:
+            logger.warning("Falha ao mover %s: %s", result.operation.source, result.error)
+        return report
+
+    def _requeue(self, path: str) -> None:
+        """Check a file again in a later batch, without counting as a new event."""
+        with self._lock:
+            self._pending.setdefault(path, time.monotonic())
+
+    @staticmethod
+    def _download_in_progress(path: str) -> bool:
+        """Browsers create the final file before the download finishes, next to a partial one."""
+        return any(os.path.exists(path + suffix) for suffix in PARTIAL_DOWNLOAD_SUFFIXES)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Run the watch mode without a graphical interface."""
+    parser = argparse.ArgumentParser(description="Organiza continuamente os arquivos que chegam nas pastas.")
+    parser.add_argument("folders", nargs="+", type=Path, help="pastas monitoradas")
+    parser.add_argument("--debounce", type=float, default=0.5, help="segundos sem eventos antes de tratar um arquivo")
+    parser.add_argument("--settle", type=float, default=1.0, help="segundos sem modificação antes de mover")
+    parser.add_argument("--existing", action="store_true", help="organiza também os arquivos já presentes")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    daemon = WatchDaemon(args.folders, debounce=args.debounce, settle=args.settle)
+    logger.info("Monitorando %s", ", ".join(str(folder) for folder in daemon.folders))
+    daemon.run_forever(process_existing=args.existing)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,32 @@
 """
 GUI module for the Pastro application.
 Contains all graphical interface related components.
+
+Components are imported on first access, so importing one of them does not
+load every dialog.
 """
 
-from .splash_screen import SplashScreen
-from .main_window import FolderOrganizer
-from .dialogs import CategoryDialog, PreviewDialog, ProgressDialog
-
-__all__ = [
-    'SplashScreen',
-    'FolderOrganizer',
-    'CategoryDialog',
-    'PreviewDialog',
-    'ProgressDialog'
-] 
\ No newline at end of file
+import importlib
+
+_EXPORTS = {
+    'SplashScreen': '.splash_screen',
+    'FolderOrganizer': '.main_window',
+    'CategoryDialog': '.dialogs',
+    'PreviewDialog': '.dialogs',
+    'ProgressDialog': '.dialogs',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -5,10 +5,13 @@ Dialog windows for the Pastro application.
 from datetime import datetime
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QLineEdit, QScrollArea, QTreeWidget,
-    QTreeWidgetItem, QProgressBar, QPlainTextEdit
+    QLabel, QLineEdit, QTreeView, QProgressBar, QPlainTextEdit,
+    QComboBox
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
+
+from ..core.dedup import DUPLICATES_LINK, DUPLICATES_MOVE, DUPLICATES_SKIP
+from .models import PreviewModel
 
 class CategoryDialog(QDialog):
     """Dialog for creating a new category."""
@@ -47,44 +50,64 @@ class CategoryDialog(QDialog):
 
 class PreviewDialog(QDialog):
     """Dialog for previewing the organization before applying."""
-    def __init__(self, classification, parent=None):
+    DUPLICATES_GROUP = "Duplicados"
+    DUPLICATE_CHOICES = (
+        ("Ignorar (manter no lugar)", DUPLICATES_SKIP),
+        ("Substituir por link para o original", DUPLICATES_LINK),
+        ("Mover normalmente", DUPLICATES_MOVE),
+    )
+
+    def __init__(self, plan, parent=None, duplicates=(), plan_with_duplicates=None):
+        """
+        `plan` is the `MovePlan` that leaves duplicates in place, and
+        `plan_with_duplicates` the one that moves them too.
+        """
         super().__init__(parent)
         self.setWindowTitle("Prévia da Organização")
         self.setModal(True)
-        self.setMinimumSize(600, 400)
+        self.setMinimumSize(700, 400)
+        self.plans = {
+            DUPLICATES_SKIP: plan,
+            DUPLICATES_LINK: plan,
+            DUPLICATES_MOVE: plan_with_duplicates or plan,
+        }
+        self.duplicate_files = [path for group in duplicates for path in group.duplicates]
         
         layout = QVBoxLayout(self)
         
         # Summary label
-        summary = QLabel("Resumo da Organização:")
-        layout.addWidget(summary)
-        
-        # Create scroll area for the tree
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        layout.addWidget(scroll)
-        
-        # Create tree widget
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["Categoria", "Arquivos"])
-        self.tree.setColumnCount(2)
-        scroll.setWidget(self.tree)
-        
-        # Populate tree
-        for category, files in classification.items():
-            if files:  # Only show categories with files
-                category_item = QTreeWidgetItem(self.tree)
-                category_item.setText(0, category)
-                category_item.setText(1, f"{len(files)} arquivo(s)")
-                
-                for file_path in files:
-                    file_item = QTreeWidgetItem(category_item)
-                    file_item.setText(0, file_path.name)
-                    file_item.setText(1, str(file_path.parent))
+        self.summary = QLabel()
+        layout.addWidget(self.summary)
+
+        # Filter over the files of the plan, answered in the background
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filtrar: parte do nome, *.jpg, ext:pdf, cat:imagens, >10MB")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.textChanged.connect(self.apply_filter)
+        layout.addWidget(self.filter_input)
+        self.search_worker = None
+        self.search_thread = None
+        self.groups = {}
+        self._builder = None
         
-        self.tree.expandAll()
-        self.tree.resizeColumnToContents(0)
-        self.tree.resizeColumnToContents(1)
+        # Tree view; file rows are only loaded when a category is expanded
+        self.tree = QTreeView()
+        self.tree.setUniformRowHeights(True)
+        self.model = None
+        layout.addWidget(self.tree)
+
+        # What to do with duplicates, only when there are any
+        self.duplicates_choice = None
+        if self.duplicate_files:
+            duplicates_row = QHBoxLayout()
+            duplicates_row.addWidget(QLabel(f"{len(self.duplicate_files)} arquivo(s) duplicado(s):"))
+            self.duplicates_choice = QComboBox()
+            for label, policy in self.DUPLICATE_CHOICES:
+                self.duplicates_choice.addItem(label, policy)
+            self.duplicates_choice.currentIndexChanged.connect(self.show_plan)
+            duplicates_row.addWidget(self.duplicates_choice)
+            layout.addLayout(duplicates_row)
+        self.show_plan()
         
         # Buttons
         buttons = QHBoxLayout()
@@ -96,8 +119,94 @@ class PreviewDialog(QDialog):
         buttons.addWidget(cancel_button)
         layout.addLayout(buttons)
 
+    def duplicate_policy(self):
+        """The chosen handling of duplicates."""
+        if self.duplicates_choice is None:
+            return DUPLICATES_MOVE
+        return self.duplicates_choice.currentData()
+
+    def plan(self):
+        """The plan for the chosen handling of duplicates."""
+        return self.plans[self.duplicate_policy()]
+
+    def show_plan(self):
+        """Show exactly the moves of the current plan, new names included."""
+        plan = self.plan()
+        groups = dict(plan.categories)
+        if self.duplicate_files and self.duplicate_policy() != DUPLICATES_MOVE:
+            groups[self.DUPLICATES_GROUP] = self.duplicate_files
+        self.groups = groups
+        if self.filter_input.text().strip():
+            # The filter is answered again on the files of this plan
+            self.apply_filter()
+        else:
+            self.show_groups(groups)
+
+        summary = f"Resumo da Organização: {len(plan)} arquivo(s) a mover"
+        if plan.renamed:
+            summary += f", {len(plan.renamed)} renomeado(s) por conflito de nome"
+        self.summary.setText(summary)
+
+    def show_groups(self, groups):
+        previous = self.model
+        self.model = PreviewModel(groups, self, self.plan().renamed)
+        self.tree.setModel(self.model)
+        self.tree.setColumnWidth(0, 300)
+        if previous is not None:
+            previous.deleteLater()
+
+    def apply_filter(self):
+        """
+        Filter the files of the plan in the background. The search index is
+        built on the first query for each plan shown, in the search thread.
+        """
+        text = self.filter_input.text().strip()
+        if not text:
+            if self.search_worker is not None:
+                self.search_worker.cancel()
+            self.show_groups(self.groups)
+            return
+        if self.search_worker is None:
+            from .worker import SearchWorker, start_worker
+
+            self.search_worker = SearchWorker()
+            self.search_worker.results.connect(self.show_filtered)
+            self.search_thread = start_worker(self.search_worker, self)
+        self.search_worker.submit(self.index_builder(), text)
+
+    def index_builder(self):
+        """Builder of the search index of the plan shown, the same one until the plan changes."""
+        from functools import partial
+        from ..core.search import SearchIndex
+
+        if self._builder is None or self._builder.args[0] is not self.groups:
+            self._builder = partial(SearchIndex.from_groups, self.groups)
+        return self._builder
+
+    def show_filtered(self, number, index, rows):
+        if self.search_worker is not None and number == self.search_worker.latest:
+            self.show_groups(index.groups(rows))
+            if self.model.rowCount() == 1:
+                self.tree.expandAll()
+
+    def done(self, result):
+        # The search thread must be done before the dialog goes
+        if self.search_worker is not None:
+            from .worker import stop_thread
+
+            self.search_worker.stop()
+            stop_thread(self.search_thread)
+            self.search_worker = None
+        super().done(result)
+
 class ProgressDialog(QDialog):
     """Dialog for showing organization progress."""
+    # Log lines kept by the view; older lines are discarded
+    LOG_LIMIT = 1000
+
+    pause_toggled = pyqtSignal(bool)
+    cancel_requested = pyqtSignal()
+
     def __init__(self, total_files, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Organizando Arquivos")
@@ -112,33 +221,111 @@ class ProgressDialog(QDialog):
         self.progress_bar.setValue(0)
         layout.addWidget(self.progress_bar)
         
-        # Log area
+        # Log area, a ring buffer of the last LOG_LIMIT lines
         self.log_area = QPlainTextEdit()
         self.log_area.setReadOnly(True)
+        self.log_area.setMaximumBlockCount(self.LOG_LIMIT)
         layout.addWidget(self.log_area)
         
         # Status label
         self.status_label = QLabel("Preparando...")
         layout.addWidget(self.status_label)
+
+        # Buttons
+        buttons = QHBoxLayout()
+        self.pause_button = QPushButton("Pausar")
+        self.pause_button.setCheckable(True)
+        self.pause_button.toggled.connect(self.toggle_pause)
+        self.cancel_button = QPushButton("Cancelar")
+        self.cancel_button.clicked.connect(self.request_cancel)
+        buttons.addWidget(self.pause_button)
+        buttons.addWidget(self.cancel_button)
+        layout.addLayout(buttons)
         
         self.current_progress = 0
         self.total_files = total_files
+        self.running = True
+        self.root_bars = []
+
+    def set_roots(self, labels, totals):
+        """Add a progress bar per destination, below the overall one; empty ones are left out."""
+        layout = self.layout()
+        for label, total in zip(labels, totals):
+            if not total:
+                self.root_bars.append(None)
+                continue
+            bar = QProgressBar()
+            bar.setMaximum(total)
+            bar.setValue(0)
+            bar.setFormat(f"{label}: %v/%m")
+            layout.insertWidget(1 + sum(1 for other in self.root_bars if other is not None), bar)
+            self.root_bars.append(bar)
+
+    def update_roots(self, done):
+        """Update the progress bar of each destination."""
+        for bar, count in zip(self.root_bars, done):
+            if bar is not None:
+                bar.setValue(count)
     
     def update_progress(self, file_name, category):
-        """Update progress bar and log."""
-        self.current_progress += 1
-        self.progress_bar.setValue(self.current_progress)
-        
-        # Add log entry with timestamp
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] Movendo '{file_name}' para categoria '{category}'"
-        self.log_area.appendPlainText(log_entry)
+        """Update progress bar and log for a single file."""
+        self.update_batch(self.current_progress + 1, [(file_name, category)])
+
+    def update_batch(self, done, entries):
+        """Update progress bar and log with the files handled since the last update."""
+        self.current_progress = done
+        self.progress_bar.setValue(done)
+
+        if entries:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            self.log_area.appendPlainText("\n".join(
+                f"[{timestamp}] Movendo '{file_name}' para categoria '{category}'"
+                for file_name, category in entries
+            ))
         
         # Update status
-        progress_percent = (self.current_progress / self.total_files) * 100
-        self.status_label.setText(f"Progresso: {progress_percent:.1f}% ({self.current_progress}/{self.total_files})")
-        
-        # Auto scroll to bottom
-        self.log_area.verticalScrollBar().setValue(
-            self.log_area.verticalScrollBar().maximum()
-        ) 
\ No newline at end of file
+        progress_percent = (done / self.total_files) * 100 if self.total_files else 100.0
+        self.status_label.setText(f"Progresso: {progress_percent:.1f}% ({done}/{self.total_files})")
+
+    def toggle_pause(self, paused):
+        """Pause or resume the organization."""
+        self.pause_button.setText("Continuar" if paused else "Pausar")
+        self.status_label.setText("Pausado" if paused else "Retomando...")
+        self.pause_toggled.emit(paused)
+
+    def request_cancel(self):
+        """Ask the organization to stop after the files in progress."""
+        self.cancel_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.status_label.setText("Cancelando...")
+        self.cancel_requested.emit()
+
+    def show_summary(self, text):
+        """Keep the dialog open once the work is done, showing the metrics of the run."""
+        self.running = False
+        self.status_label.setText("Concluído")
+        self.log_area.appendPlainText(f"\nMétricas da execução:\n{text}")
+        self.pause_button.hide()
+        self.cancel_button.clicked.disconnect()
+        self.cancel_button.clicked.connect(self.accept)
+        self.cancel_button.setText("Fechar")
+        self.cancel_button.setEnabled(True)
+
+    def finish(self):
+        """Allow the dialog to close once the work is done."""
+        self.running = False
+        self.close()
+
+    def reject(self):
+        # Escape or closing the window cancels the run instead of hiding the dialog
+        if self.running:
+            self.request_cancel()
+        else:
+            super().reject()
+
+    def closeEvent(self, event):
+        if self.running:
+            self.request_cancel()
+            event.ignore()
+        else:
+            super().closeEvent(event)
@@ -2,18 +2,19 @@
 Main window module for the Pastro application.
 """
 
-import shutil
+import os
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QListWidget, QLabel, QFileDialog,
-    QMessageBox
+    QPushButton, QListWidget, QListView, QLabel, QFileDialog,
+    QMessageBox, QCheckBox, QLineEdit
 )
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon
 
 from ..core.classifier import AutoClassifier
-from .dialogs import CategoryDialog, PreviewDialog, ProgressDialog
+from ..core.scanner import Scanner
+from .models import FileListModel
 
 class FolderOrganizer(QMainWindow):
     """Main window of the application."""
@@ -42,6 +43,10 @@ class FolderOrganizer(QMainWindow):
         select_button = QPushButton("Selecionar Pasta")
         select_button.clicked.connect(self.select_folder)
         top_section.addWidget(select_button)
+        # More folders organized in the same run, each into itself or another destination
+        add_folder_button = QPushButton("Adicionar Pasta")
+        add_folder_button.clicked.connect(self.add_folder)
+        top_section.addWidget(add_folder_button)
         layout.addLayout(top_section)
         
         # Create main section with categories and files
@@ -60,7 +65,15 @@ class FolderOrganizer(QMainWindow):
         # Files section
         files_section = QVBoxLayout()
         files_section.addWidget(QLabel("Arquivos:"))
-        self.files_list = QListWidget()
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filtrar: parte do nome, *.jpg, ext:pdf, cat:imagens, >10MB")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.textChanged.connect(self.apply_filter)
+        files_section.addWidget(self.filter_input)
+        self.files_model = FileListModel(self)
+        self.files_list = QListView()
+        self.files_list.setUniformItemSizes(True)
+        self.files_list.setModel(self.files_model)
         files_section.addWidget(self.files_list)
         main_section.addLayout(files_section)
         
@@ -68,18 +81,56 @@ class FolderOrganizer(QMainWindow):
         
         # Create bottom section with organize button
         bottom_section = QHBoxLayout()
-        organize_button = QPushButton("Organizar")
-        organize_button.clicked.connect(self.organize_files)
-        bottom_section.addWidget(organize_button)
+        self.organize_button = QPushButton("Organizar")
+        self.organize_button.clicked.connect(self.organize_files)
+        bottom_section.addWidget(self.organize_button)
+        self.undo_button = QPushButton("Desfazer")
+        self.undo_button.clicked.connect(self.undo_last_run)
+        bottom_section.addWidget(self.undo_button)
+        self.extract_button = QPushButton("Extrair Compactado")
+        self.extract_button.clicked.connect(self.extract_archive)
+        bottom_section.addWidget(self.extract_button)
+        # Metrics of each run, also enabled by PASTRO_METRICS (e.g. "1" or "profile,memory")
+        metrics_setting = os.environ.get("PASTRO_METRICS", "").lower()
+        self.metrics_check = QCheckBox("Medir desempenho")
+        self.metrics_check.setChecked(metrics_setting not in ("", "0"))
+        bottom_section.addWidget(self.metrics_check)
+        self.profile_check = QCheckBox("Perfilar (cProfile e tracemalloc)")
+        self.profile_check.setChecked("profile" in metrics_setting or "memory" in metrics_setting)
+        self.profile_check.setEnabled(self.metrics_check.isChecked())
+        self.metrics_check.toggled.connect(self.profile_check.setEnabled)
+        bottom_section.addWidget(self.profile_check)
+        # Copies to another disk are read back and compared before the original is deleted
+        self.verify_check = QCheckBox("Conferir cópias entre discos")
+        bottom_section.addWidget(self.verify_check)
+        # Zip and tar archives go with the category of most of their content
+        self.archives_check = QCheckBox("Classificar compactados pelo conteúdo")
+        bottom_section.addWidget(self.archives_check)
         layout.addLayout(bottom_section)
         
-        # Load default categories
-        self.load_default_categories()
-        self.selected_folder = None
+        # Load the user's rules, or the default categories
+        self.load_rules()
+        # Folders to organize, as `OrganizeRoot`s
+        self.roots = []
+        self.progress_dialog = None
+        self.workers = set()
+        self._scan_cache = None
+        # Files of the selected folders, indexed for the filter as they are listed
+        self.search_index = None
+        self.list_worker = None
+        self.list_thread = None
+        self.search_worker = None
+        self.search_thread = None
     
-    def load_default_categories(self):
-        """Load default categories from the classifier."""
-        self.classifier.load_default_categories()
+    def load_rules(self):
+        """Load the categories from the user's rules file, falling back to the defaults."""
+        try:
+            self.classifier.load_rules()
+        except (OSError, ValueError) as error:
+            self.classifier.load_default_categories()
+            QMessageBox.warning(
+                self, "Aviso", f"Não foi possível ler as regras; usando as categorias padrão.\n{error}"
+            )
         self.update_categories_list()
     
     def update_categories_list(self):
@@ -89,77 +140,480 @@ class FolderOrganizer(QMainWindow):
             self.categories_list.addItem(category)
     
     def select_folder(self):
-        """Open dialog to select a folder."""
+        """Open dialog to select a folder, in place of the selected ones."""
         folder = QFileDialog.getExistingDirectory(self, "Selecionar Pasta")
         if folder:
-            self.selected_folder = Path(folder)
-            self.folder_label.setText(str(self.selected_folder))
-            self.update_files_list()
-    
+            from ..core.roots import OrganizeRoot
+
+            self.roots = [OrganizeRoot(Path(folder))]
+            self.update_roots()
+
+    def add_folder(self):
+        """Add a folder to the selected ones, organized into itself or into a chosen destination."""
+        folder = QFileDialog.getExistingDirectory(self, "Adicionar Pasta")
+        if not folder:
+            return
+        from ..core.roots import OrganizeRoot
+
+        target = QFileDialog.getExistingDirectory(
+            self, "Destino das categorias (cancele para organizar na própria pasta)"
+        )
+        root = OrganizeRoot(Path(folder), Path(target) if target else None)
+        if root not in self.roots:
+            self.roots.append(root)
+        self.update_roots()
+
+    @property
+    def selected_folder(self):
+        """The first selected folder, or None."""
+        return self.roots[0].folder if self.roots else None
+
+    def update_roots(self):
+        """Show the selected folders and their files."""
+        self.folder_label.setText("\n".join(
+            str(root.folder) if root.target is None else f"{root.folder} → {root.target}" for root in self.roots
+        ))
+        self.update_files_list()
+
+    def create_scanner(self, io_limit=None):
+        """Scanner for the selected folders, backed by the scan cache when available."""
+        scan_cache = self.scan_cache
+        if scan_cache is None:
+            return Scanner(io_limit=io_limit)
+        from ..core.cache import CachingScanner
+
+        return CachingScanner(
+            scan_cache, self.classifier.get_category_for_name, self.classifier.config_hash(), io_limit=io_limit
+        )
+
+    @property
+    def scan_cache(self):
+        """The scan cache, opened on first use; None if it cannot be opened."""
+        if self._scan_cache is None:
+            import sqlite3
+            from ..core.cache import ScanCache
+
+            try:
+                self._scan_cache = ScanCache()
+            except (OSError, sqlite3.Error):
+                # The application still works without the cache
+                self._scan_cache = False
+        return self._scan_cache or None
+
     def update_files_list(self):
-        """Update the files list widget."""
-        self.files_list.clear()
-        if self.selected_folder:
-            for file_path in self.selected_folder.glob("*"):
-                if file_path.is_file():
-                    self.files_list.addItem(file_path.name)
+        """List the files of the selected folders in the background, shown and filtered as they come."""
+        from functools import partial
+        from ..core.search import SearchIndex
+        from .worker import ListWorker
+
+        if self.list_worker is not None:
+            self.list_worker.cancel()
+        self.search_index = SearchIndex()
+        self.show_files()
+        worker = self.list_worker = ListWorker(
+            self.search_index, self.classifier, self.create_scanner(), [root.folder for root in self.roots]
+        )
+        worker.progress.connect(self.on_files_listed)
+        worker.finished.connect(self.on_listing_finished)
+        worker.failed.connect(partial(self.on_listing_failed, worker))
+        self.list_thread = self.start_worker(worker)
+
+    def on_files_listed(self, index, count):
+        """Show the files listed so far, and filter them again."""
+        if index is not self.search_index:
+            return  # A listing replaced by a newer one
+        if self.filter_input.text().strip():
+            self.apply_filter()
+        else:
+            self.files_model.names_added()
+
+    def on_listing_finished(self, index):
+        if index is self.search_index:
+            self.list_worker = None
+            self.on_files_listed(index, len(index))
+
+    def on_listing_failed(self, worker, message):
+        if worker is self.list_worker:
+            self.list_worker = None
+            QMessageBox.warning(self, "Aviso", f"Não foi possível listar os arquivos: {message}")
+
+    def update_files_after_moves(self, report):
+        """
+        Apply the moves of a run to the listed files, without listing the
+        folders again: moved files leave the list, and files moved into a
+        listed folder (as by an undo) join it.
+        """
+        index = self.search_index
+        if index is None or self.list_worker is not None:
+            self.update_files_list()
+            return
+        listed = {Path(root.folder) for root in self.roots}
+        for result in report.results:
+            if not result.ok:
+                continue
+            source, target = result.operation.source, result.operation.target
+            index.discard_path(source)
+            if target.parent in listed:
+                index.add(str(target.parent), target.name, self.classifier.get_category_for_name(target.name), result.size)
+        self.show_files()
+
+    def show_files(self):
+        """Show every listed file, or the ones matching the filter."""
+        if self.filter_input.text().strip():
+            self.apply_filter()
+        else:
+            self.files_model.set_names(self.search_index.names())
+
+    def apply_filter(self):
+        """Filter the listed files in the background; a query still running for older text is cancelled."""
+        if self.search_index is None:
+            return
+        text = self.filter_input.text().strip()
+        if not text:
+            if self.search_worker is not None:
+                self.search_worker.cancel()
+            self.files_model.set_names(self.search_index.names())
+            return
+        self.search().submit(self.search_index, text)
+
+    def search(self):
+        """The worker answering filter queries, started on first use."""
+        if self.search_worker is None:
+            from .worker import SearchWorker, start_worker
+
+            self.search_worker = SearchWorker()
+            self.search_worker.results.connect(self.show_filtered)
+            self.search_worker.failed.connect(self.show_error)
+            self.search_thread = start_worker(self.search_worker, self)
+        return self.search_worker
+
+    def show_filtered(self, number, index, rows):
+        """Show the answer to the latest filter query."""
+        if number == self.search_worker.latest and index is self.search_index:
+            self.files_model.set_names(index.names(rows))
+
+    def closeEvent(self, event):
+        # Background threads owned by the window must be done before it goes
+        from .worker import stop_thread
+
+        if self.list_worker is not None:
+            self.list_worker.cancel()
+            stop_thread(self.list_thread)
+        if self.search_worker is not None:
+            self.search_worker.stop()
+            stop_thread(self.search_thread)
+        super().closeEvent(event)
     
     def add_category(self):
         """Open dialog to add a new category."""
+        from .dialogs import CategoryDialog
+
         dialog = CategoryDialog(self)
         if dialog.exec():
             name, extensions = dialog.get_data()
             if name and extensions:
                 self.classifier.add_category(name, extensions)
                 self.update_categories_list()
+                if self.classifier.rules_path is None:
+                    return  # The rules file could not be read; it is not overwritten
+                try:
+                    self.classifier.save_rules()
+                except OSError as error:
+                    QMessageBox.warning(self, "Aviso", f"A categoria não foi salva: {error}")
     
     def auto_classify(self):
-        """Classify files in the selected folder."""
-        if not self.selected_folder:
+        """Classify files in the selected folders in the background, then show the preview."""
+        if not self.roots:
             QMessageBox.warning(self, "Erro", "Selecione uma pasta primeiro!")
-            return None
-        
-        files = [f for f in self.selected_folder.glob("*") if f.is_file()]
-        if not files:
-            QMessageBox.warning(self, "Erro", "Nenhum arquivo encontrado na pasta!")
-            return None
-        
-        return self.classifier.classify_files(files)
+            return
+
+        roots = list(self.roots)
+        metrics = self.create_metrics()
+        archives = self.archives_check.isChecked()
+        # Opened here, so the planning threads share one cache
+        self.scan_cache
+
+        def classify():
+            from ..core.roots import plan_roots
+
+            return plan_roots(self.classifier, roots, self.create_scanner, metrics, archives=archives), metrics
+
+        from .worker import TaskWorker
+
+        self.set_busy(True)
+        worker = TaskWorker(classify)
+        worker.finished.connect(self.show_preview)
+        worker.failed.connect(self.show_error)
+        self.start_worker(worker)
+
+    def show_preview(self, result):
+        """Show the combined preview of the plans and organize them if confirmed."""
+        self.set_busy(False)
+        from ..core.dedup import DUPLICATES_MOVE
+        from ..core.roots import combine_plans
+        from .dialogs import PreviewDialog
+
+        plans, metrics = result
+        failed = [root_plan for root_plan in plans if root_plan.error]
+        if failed:
+            QMessageBox.warning(self, "Aviso", "Pastas não organizadas:\n" + "\n".join(
+                f"{', '.join(map(str, root_plan.folders))}: {root_plan.error}" for root_plan in failed
+            ))
+        plans = [root_plan for root_plan in plans if root_plan.files]
+        if not plans:
+            if not failed:
+                QMessageBox.warning(self, "Erro", "Nenhum arquivo encontrado na pasta!")
+            return
+
+        plan, duplicates, plan_with_duplicates = combine_plans(plans)
+        with metrics.phase("prévia"):
+            preview = PreviewDialog(plan, self, duplicates, plan_with_duplicates)
+        if preview.exec():
+            policy = preview.duplicate_policy()
+            self.organize_plan(preview.plan(), duplicates if policy != DUPLICATES_MOVE else (), policy, metrics)
     
-    def organize_files_by_classification(self, classification):
-        """Organize files according to the classification."""
-        total_files = sum(len(files) for files in classification.values())
-        progress_dialog = ProgressDialog(total_files, self)
-        progress_dialog.show()
-        
+    def organize_plan(self, plan, duplicates=(), duplicate_policy=None, metrics=None):
+        """
+        Carry out a `MovePlan` in the background, exactly as previewed. The
+        destinations of a `CombinedPlan` are moved concurrently, one lane each.
+        """
+        import threading
+        from ..core.dedup import DUPLICATES_LINK, link_duplicates
+        from ..core.journal import MoveJournal
+        from ..core.mover import MoveOperation, MoveResult, RootsExecutor
+        from ..core.roots import DEFAULT_IO_LIMIT, CombinedPlan
+
+        metrics = metrics or self.create_metrics()
+        operations = list(plan)
+
+        finalize = None
+        if duplicates and duplicate_policy == DUPLICATES_LINK:
+            def finalize(report):
+                moved = {result.operation.source: result.operation.target for result in report.results if result.ok}
+                for duplicate, error in link_duplicates(duplicates, moved):
+                    report.add(MoveResult(MoveOperation(duplicate, duplicate, "Duplicados"), False, 0, "link", error))
+
+        # The journal allows resuming after a crash and undoing; without it, files still move
         try:
-            # Create category folders and move files
-            for category, files in classification.items():
-                if not files:
-                    continue
-                
-                # Create category folder
-                category_path = self.selected_folder / category
-                category_path.mkdir(exist_ok=True)
-                
-                # Move files
-                for file_path in files:
-                    target_path = category_path / file_path.name
-                    shutil.move(str(file_path), str(target_path))
-                    progress_dialog.update_progress(file_path.name, category)
-            
-            QMessageBox.information(self, "Sucesso", "Arquivos organizados com sucesso!")
+            with metrics.phase("diário"):
+                journal = MoveJournal.create()
+                journal.start(operations, plan.root)
+        except OSError:
+            journal = None
+        executor = None
+        if isinstance(plan, CombinedPlan) and len(plan.plans) > 1:
+            executor = RootsExecutor(
+                plan.roots, io_limit=threading.BoundedSemaphore(DEFAULT_IO_LIMIT), verify=self.verify_check.isChecked()
+            )
+        self.run_operations(operations, journal, finalize=finalize, metrics=metrics, executor=executor)
+
+    def run_operations(self, operations, journal=None, undo=False, finalize=None, metrics=None, executor=None):
+        """
+        Move files in the background, showing the progress dialog, with one
+        progress bar per destination for a `RootsExecutor`.
+        """
+        from functools import partial
+        from ..core.mover import MoveExecutor, RootsExecutor
+        from .dialogs import ProgressDialog
+        from .worker import OrganizeWorker
+
+        metrics = metrics or self.create_metrics()
+        executor = executor or MoveExecutor(verify=self.verify_check.isChecked())
+        self.progress_dialog = ProgressDialog(len(operations), self)
+        lane_of = None
+        if isinstance(executor, RootsExecutor):
+            lane_of = executor.lane_of
+            totals = [0] * (len(executor.roots) + 1)
+            for operation in operations:
+                totals[lane_of(operation)] += 1
+            self.progress_dialog.set_roots([str(root) for root in executor.roots] + ["Outros"], totals)
+        worker = OrganizeWorker(
+            operations, executor, finalize=finalize, journal=journal, undo=undo, metrics=metrics, lane_of=lane_of
+        )
+        worker.progress.connect(metrics.timed("interface", "atualização do progresso", self.progress_dialog.update_batch))
+        if lane_of is not None:
+            worker.lane_progress.connect(self.progress_dialog.update_roots)
+        worker.finished.connect(partial(self.on_organize_finished, undo=undo, metrics=metrics))
+        worker.failed.connect(self.show_error)
+        # Direct connections: the worker thread is busy moving files and only
+        # checks the executor flags, so these must not wait in its event queue
+        self.progress_dialog.pause_toggled.connect(
+            lambda paused: worker.pause() if paused else worker.resume(),
+            Qt.ConnectionType.DirectConnection
+        )
+        self.progress_dialog.cancel_requested.connect(worker.cancel, Qt.ConnectionType.DirectConnection)
+
+        self.set_busy(True)
+        self.progress_dialog.show()
+        self.start_worker(worker)
+
+    def check_interrupted_run(self):
+        """Offer to resume an organization that was interrupted, e.g. by a crash."""
+        self.find_journal_run(undo=False)
+
+    def undo_last_run(self):
+        """Offer to undo the latest organization."""
+        self.find_journal_run(undo=True)
+
+    def find_journal_run(self, undo):
+        """Look in the background for the latest run to resume or undo, and what is left of it."""
+        from ..core.journal import STATUS_FINISHED, STATUS_INTERRUPTED, latest_journal
+        from ..core.mover import MoveExecutor
+        from .worker import TaskWorker
+
+        statuses = (STATUS_FINISHED, STATUS_INTERRUPTED) if undo else (STATUS_INTERRUPTED,)
+
+        def find():
+            journal = latest_journal(statuses)
+            if journal is None:
+                return undo, None, [], []
+            if undo:
+                return (undo, journal) + journal.undo_operations()
+            operations = journal.resume_operations()
+            if not operations:
+                # Everything had moved already; only the end of the run was missing
+                journal.execute(MoveExecutor(), [])
+                return undo, None, [], []
+            return undo, journal, operations, []
+
+        self.set_busy(True)
+        worker = TaskWorker(find)
+        worker.finished.connect(self.confirm_journal_run)
+        worker.failed.connect(self.show_error)
+        self.start_worker(worker)
+
+    def confirm_journal_run(self, result):
+        """Ask before resuming or undoing a run found by `find_journal_run`."""
+        self.set_busy(False)
+        undo, journal, operations, conflicts = result
+        if journal is None or not (operations or conflicts):
+            if undo:
+                QMessageBox.information(self, "Desfazer", "Nenhuma organização para desfazer.")
+            return
+
+        folder = f" de {journal.root}" if journal.root else ""
+        if undo:
+            title = "Desfazer"
+            question = f"Desfazer a última organização{folder}?\n{len(operations)} arquivo(s) voltarão ao local original."
+            if conflicts:
+                question += f"\n{len(conflicts)} arquivo(s) não podem voltar: o local original está ocupado."
+        else:
+            title = "Organização interrompida"
+            question = f"A organização{folder} foi interrompida.\nRetomar com {len(operations)} arquivo(s) restante(s)?"
+        if QMessageBox.question(self, title, question) != QMessageBox.StandardButton.Yes:
+            if not undo:
+                # Not asked again at the next launch; the run can still be undone
+                try:
+                    journal.abandon()
+                    journal.close()
+                except OSError as e:
+                    self.show_error(str(e))
+            return
+
+        def finalize(report):
+            for conflict in conflicts:
+                report.add(conflict)
+
+        self.run_operations(operations, journal, undo, finalize if conflicts else None)
+
+    def extract_archive(self):
+        """Extract a zip or tar archive straight into the category folders, in the background."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Extrair Compactado", str(self.selected_folder or ""),
+            "Compactados (*.zip *.tar *.tgz *.tar.gz *.tbz2 *.tar.bz2 *.txz *.tar.xz);;Todos os arquivos (*)"
+        )
+        if not path:
+            return
+        from ..core.archives import extract_archive
+        from .worker import TaskWorker
+
+        # Into the categories of the selected folder, or next to the archive
+        target = self.roots[0].destination if self.roots else Path(path).parent
+        classify = self.classifier.get_category_for_name
+
+        self.set_busy(True)
+        worker = TaskWorker(lambda: extract_archive(path, classify, target))
+        worker.finished.connect(self.on_extract_finished)
+        worker.failed.connect(self.show_error)
+        self.start_worker(worker)
+
+    def on_extract_finished(self, report):
+        """Report the outcome of an extraction."""
+        self.set_busy(False)
+        failures = report.failures
+        summary = f"{len(report.extracted)} arquivo(s) extraído(s) nas categorias."
+        if failures:
+            details = "\n".join(f"{member.member}: {member.error}" for member in failures[:10])
+            QMessageBox.warning(self, "Atenção", f"{summary}\n\nArquivos não extraídos:\n{details}")
+        else:
+            QMessageBox.information(self, "Sucesso", summary)
+        if self.roots:
             self.update_files_list()
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Erro", f"Erro ao organizar arquivos: {str(e)}")
-        finally:
-            progress_dialog.close()
+
+    def create_metrics(self):
+        """Metrics for a new run, as chosen in the window; disabled unless asked for."""
+        from ..core.metrics import DISABLED, Metrics
+
+        if not self.metrics_check.isChecked():
+            return DISABLED
+        profile = self.profile_check.isChecked()
+        return Metrics(profile=profile, memory=profile)
+
+    def on_organize_finished(self, report, undo=False, metrics=None):
+        """Report the outcome of an organization run, or of its undo."""
+        if metrics is not None and metrics.enabled and self.progress_dialog is not None:
+            metrics.finish()
+            summary = metrics.summary()
+            try:
+                summary += f"\n\nMétricas gravadas em {metrics.dump()}"
+            except OSError as error:
+                summary += f"\n\nAs métricas não foram gravadas: {error}"
+            # The dialog stays open with the summary until the user closes it
+            self.progress_dialog.show_summary(summary)
+            self.progress_dialog = None
+        self.close_progress()
+        failures = report.failures
+        if report.cancelled:
+            QMessageBox.information(self, "Cancelado", f"Operação cancelada.\n{report.summary()}")
+        elif failures:
+            details = "\n".join(f"{result.operation.source.name}: {result.error}" for result in failures[:10])
+            QMessageBox.warning(
+                self, "Atenção",
+                f"{report.summary()}\n\nArquivos não movidos:\n{details}"
+            )
+        elif undo:
+            QMessageBox.information(self, "Sucesso", f"Organização desfeita.\n{report.summary()}")
+        else:
+            QMessageBox.information(self, "Sucesso", f"Arquivos organizados com sucesso!\n{report.summary()}")
+        self.update_files_after_moves(report)
+
+    def show_error(self, message):
+        """Report an error raised by a background task."""
+        self.close_progress()
+        QMessageBox.critical(self, "Erro", f"Erro ao organizar arquivos: {message}")
+
+    def close_progress(self):
+        """Close the progress dialog, if any, and re-enable the window."""
+        self.set_busy(False)
+        if self.progress_dialog is not None:
+            self.progress_dialog.finish()
+            self.progress_dialog = None
+
+    def set_busy(self, busy):
+        """Disable the actions that cannot run while a task is in progress."""
+        self.organize_button.setEnabled(not busy)
+        self.undo_button.setEnabled(not busy)
+        self.extract_button.setEnabled(not busy)
+
+    def start_worker(self, worker):
+        """Run a worker in a background thread, keeping it alive until it is done; returns the thread."""
+        from .worker import start_worker
+
+        self.workers.add(worker)
+        thread = start_worker(worker, self)
+        thread.finished.connect(lambda: self.workers.discard(worker))
+        return thread
     
     def organize_files(self):
         """Start the organization process."""
-        classification = self.auto_classify()
-        if classification:
-            preview = PreviewDialog(classification, self)
-            if preview.exec():
-                self.organize_files_by_classification(classification) 
\ No newline at end of file
+        self.auto_classify()
@@ -0,0 +1,169 @@
+"""
+Item models that load rows on demand, for folders with millions of files.
+"""
+
+import os
+from typing import Dict, List, Optional, Sequence
+
+from PyQt6.QtCore import QAbstractItemModel, QAbstractListModel, QModelIndex, Qt
+
+# Rows added to a view at a time by fetchMore
+FETCH_BATCH = 1000
+
+
+class FileListModel(QAbstractListModel):
+    """Flat list of file names, exposed to the view in batches."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._names: Sequence[str] = []
+        self._loaded = 0
+
+    def set_names(self, names: Sequence[str]):
+        """Replace the listed names."""
+        self.beginResetModel()
+        self._names = names
+        self._loaded = min(len(names), FETCH_BATCH)
+        self.endResetModel()
+
+    def names_added(self):
+        """Show more rows once the listed sequence has grown, up to a first batch."""
+        if self._loaded < FETCH_BATCH:
+            self.fetchMore()
+
+    def total(self) -> int:
+        """Number of names, including the ones not fetched yet."""
+        return len(self._names)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._names[index.row()]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._names)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        count = min(FETCH_BATCH, len(self._names) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+
+class _CategoryNode:
+    """A category row; its files are exposed only after it is expanded."""
+    __slots__ = ("name", "files", "loaded", "renamed")
+
+    def __init__(self, name: str, files: Sequence, renamed: int = 0):
+        self.name = name
+        self.files = files
+        self.loaded = 0
+        self.renamed = renamed
+
+
+class PreviewModel(QAbstractItemModel):
+    """
+    Two-level tree: categories with their file counts, then their files.
+    File rows are read straight from the classification lists (paths or path
+    strings), so no per-file item is created, and they are only fetched when
+    the category is expanded. `renamed` maps files to the name they get to
+    avoid a collision.
+    """
+    HEADERS = ("Categoria", "Arquivos", "Novo nome")
+
+    def __init__(self, classification: Dict[str, Sequence], parent=None, renamed: Optional[Dict] = None):
+        super().__init__(parent)
+        self._renamed = renamed or {}
+        # Only categories with files are shown
+        self._nodes: List[_CategoryNode] = [
+            _CategoryNode(category, files, self._count_renamed(files))
+            for category, files in classification.items() if files
+        ]
+        self._rows = {id(node): row for row, node in enumerate(self._nodes)}
+
+    def _count_renamed(self, files: Sequence) -> int:
+        renamed = self._renamed
+        return sum(1 for file_path in files if file_path in renamed) if renamed else 0
+
+    def _node(self, index: QModelIndex) -> Optional[_CategoryNode]:
+        """The category owning a file index, or None for category indexes."""
+        return index.internalPointer() if index.isValid() else None
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column, None)
+        # File rows point to their category node
+        return self.createIndex(row, column, self._nodes[parent.row()])
+
+    def parent(self, index):
+        node = self._node(index)
+        if node is None:
+            return QModelIndex()
+        return self.createIndex(self._rows[id(node)], 0, None)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._nodes)
+        if parent.column() != 0 or self._node(parent) is not None:
+            return 0
+        return self._nodes[parent.row()].loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.HEADERS)
+
+    def hasChildren(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return bool(self._nodes)
+        if self._node(parent) is not None:
+            return False
+        return bool(self._nodes[parent.row()].files)
+
+    def canFetchMore(self, parent):
+        if not parent.isValid() or self._node(parent) is not None:
+            return False
+        node = self._nodes[parent.row()]
+        return node.loaded < len(node.files)
+
+    def fetchMore(self, parent):
+        if not parent.isValid() or self._node(parent) is not None:
+            return
+        node = self._nodes[parent.row()]
+        count = min(FETCH_BATCH, len(node.files) - node.loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(parent.siblingAtColumn(0), node.loaded, node.loaded + count - 1)
+        node.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        node = self._node(index)
+        column = index.column()
+        if node is None:
+            category = self._nodes[index.row()]
+            if column == 0:
+                return category.name
+            if column == 1:
+                return f"{len(category.files)} arquivo(s)"
+            return f"{category.renamed} renomeado(s)" if category.renamed else ""
+        file_path = node.files[index.row()]
+        if column == 0:
+            return os.path.basename(file_path)
+        if column == 1:
+            return os.path.dirname(file_path)
+        return self._renamed.get(file_path, "")
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
@@ -91,4 +91,6 @@ class SplashScreen(QSplashScreen):
         if hasattr(self, 'status') and self.status is not None:
             self.status.setText(message)
             self.progress.setValue(value)
+            # O splash mostra uma imagem do widget, então ela precisa ser refeita
+            self.setPixmap(self.splash_widget.grab())
             self.repaint() 
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Background workers that keep classification and file moves off the Qt event loop.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, List, Optional, Sequence, Tuple
+
+from PyQt6.QtCore import QObject, QThread, pyqtSignal
+
+from ..core.classifier import AutoClassifier
+from ..core.journal import MoveJournal
+from ..core.metrics import DISABLED, Metrics
+from ..core.mover import MoveExecutor, MoveOperation, MoveReport, MoveResult
+from ..core.scanner import Scanner
+from ..core.search import SearchIndex
+
+# Minimum interval between two progress signals, in seconds
+PROGRESS_INTERVAL = 0.05
+# Maximum number of log entries carried by a single progress signal
+PROGRESS_LOG_LIMIT = 200
+
+
+class TaskWorker(QObject):
+    """Runs a callable in a background thread and emits its result."""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, task: Callable[[], object]):
+        super().__init__()
+        self.task = task
+
+    def run(self):
+        try:
+            result = self.task()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(result)
+
+
+class OrganizeWorker(QObject):
+    """
+    Moves files in a background thread.
+    Progress is coalesced: at most one signal every `PROGRESS_INTERVAL` seconds,
+    carrying the files handled since the previous one. With `lane_of`, giving
+    the lane (destination) of an operation, the files handled in each lane
+    follow every progress signal.
+    """
+    progress = pyqtSignal(int, list)  # files handled so far, [(file name, category)]
+    lane_progress = pyqtSignal(list)  # files handled so far in each lane
+    finished = pyqtSignal(object)     # MoveReport
+    failed = pyqtSignal(str)
+
+    def __init__(
+        self,
+        operations: List[MoveOperation],
+        executor: Optional[MoveExecutor] = None,
+        finalize: Optional[Callable[[MoveReport], None]] = None,
+        journal: Optional[MoveJournal] = None,
+        undo: bool = False,
+        metrics: Metrics = DISABLED,
+        lane_of: Optional[Callable[[MoveOperation], int]] = None,
+    ):
+        super().__init__()
+        self.operations = operations
+        self.executor = executor or MoveExecutor()
+        # Extra work on the report, still in the background thread
+        self.finalize = finalize
+        # Records the moves (or their reversal, with `undo`) when given
+        self.journal = journal
+        self.undo = undo
+        self.metrics = metrics
+        self.lane_of = lane_of
+        self._lane_done: List[int] = []
+        self._done = 0
+        self._last_emit = 0.0
+        self._pending: Deque[Tuple[str, str]] = deque(maxlen=PROGRESS_LOG_LIMIT)
+
+    # Called directly from the GUI thread; the executor only flips thread-safe events
+    def pause(self):
+        self.executor.pause()
+
+    def resume(self):
+        self.executor.resume()
+
+    def cancel(self):
+        self.executor.cancel()
+
+    def run(self):
+        try:
+            with self.metrics.phase("movimentação"):
+                if self.journal is not None:
+                    report = self.journal.execute(self.executor, self.operations, self._on_result, self.undo)
+                else:
+                    report = self.executor.execute(self.operations, self._on_result)
+            if self.finalize is not None and not report.cancelled:
+                with self.metrics.phase("finalização"):
+                    self.finalize(report)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self._flush()
+            self.finished.emit(report)
+
+    def _on_result(self, result: MoveResult):
+        self._done += 1
+        if self.metrics.enabled:
+            self._record(result)
+        operation = result.operation
+        if self.lane_of is not None:
+            lane = self.lane_of(operation)
+            if lane >= len(self._lane_done):
+                self._lane_done.extend([0] * (lane + 1 - len(self._lane_done)))
+            self._lane_done[lane] += 1
+        self._pending.append((operation.source.name, operation.category))
+        now = time.monotonic()
+        if now - self._last_emit >= PROGRESS_INTERVAL:
+            self._last_emit = now
+            self._flush()
+
+    def _flush(self):
+        self.metrics.count("interface", "sinais de progresso")
+        self.progress.emit(self._done, list(self._pending))
+        self._pending.clear()
+        if self.lane_of is not None:
+            self.lane_progress.emit(list(self._lane_done))
+
+    def _record(self, result: MoveResult):
+        metrics = self.metrics
+        if result.ok:
+            metrics.count("movimentação", "arquivos")
+            metrics.count("movimentação", "bytes", result.size)
+        else:
+            metrics.count("movimentação", "falhas")
+        metrics.observe("movimentação", f"latência ({result.method})", result.seconds)
+        metrics.observe("movimentação", "tamanho (bytes)", result.size, scale=1)
+
+
+class ListWorker(QObject):
+    """
+    Lists the files of some folders into a `SearchIndex` in a background
+    thread. The index is updated, and `progress` emitted, at most every
+    `PROGRESS_INTERVAL` seconds, so the list and its filter follow the scan.
+    """
+    progress = pyqtSignal(object, int)  # index, files indexed so far
+    finished = pyqtSignal(object)       # index
+    failed = pyqtSignal(str)
+
+    def __init__(self, index: SearchIndex, classifier: AutoClassifier, scanner: Scanner, folders: Sequence):
+        super().__init__()
+        self.index = index
+        self.classifier = classifier
+        self.scanner = scanner
+        self.folders = list(folders)
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop listing; called from the GUI thread when the folders change."""
+        self._cancelled = True
+
+    def run(self):
+        try:
+            add = self.index.table.add_entry
+            last_emit = time.monotonic()
+            for folder in self.folders:
+                for entry in self.classifier.scan(self.scanner, folder):
+                    if self._cancelled:
+                        break
+                    add(entry.entry, entry.category)
+                    now = time.monotonic()
+                    if now - last_emit >= PROGRESS_INTERVAL:
+                        last_emit = now
+                        self.progress.emit(self.index, self.index.update())
+                if self._cancelled:
+                    break
+            self.index.update()
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit(self.index)
+
+
+class SearchWorker(QObject):
+    """
+    Answers filter queries in a background thread, one at a time. Only the
+    latest query matters: submitting one makes the query running stop at
+    its next check, and its result is dropped. The worker keeps waiting for
+    queries until `stop`.
+
+    A query runs on a `SearchIndex`, or on the index returned by a builder
+    `build(cancelled)`, built once in the worker thread for all the queries
+    submitted with it.
+    """
+    results = pyqtSignal(int, object, object)  # query number, index, matching rows
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.latest = 0
+        self._request = None
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._built: Tuple[Optional[Callable], Optional[SearchIndex]] = (None, None)
+
+    def submit(self, index, text: str) -> int:
+        """Answer `text` on `index` (or on what it builds); returns the number of the query."""
+        with self._condition:
+            self.latest += 1
+            self._request = (self.latest, index, text)
+            self._condition.notify()
+            return self.latest
+
+    def cancel(self):
+        """Drop the query running or waiting, if any."""
+        with self._condition:
+            self.latest += 1
+            self._request = None
+
+    def stop(self):
+        """Cancel any query and end the worker; called from the GUI thread."""
+        with self._condition:
+            self.latest += 1
+            self._request = None
+            self._stopped = True
+            self._condition.notify()
+
+    def run(self):
+        try:
+            while True:
+                with self._condition:
+                    while self._request is None and not self._stopped:
+                        self._condition.wait()
+                    if self._stopped:
+                        break
+                    number, index, text = self._request
+                    self._request = None
+
+                def cancelled(number=number):
+                    return self.latest != number
+
+                if not isinstance(index, SearchIndex):
+                    builder, built = self._built
+                    if builder is not index:
+                        built = index(cancelled)
+                        if built is None:
+                            continue
+                        self._built = (index, built)
+                    index = built
+                rows = index.query(text, cancelled)
+                if rows is not None and not cancelled():
+                    self.results.emit(number, index, rows)
+        except Exception as e:
+            self.failed.emit(str(e))
+        else:
+            self.finished.emit()
+
+
+def stop_thread(thread: QThread) -> None:
+    """
+    Wait in the GUI thread for a thread whose worker was told to stop. Its
+    `quit` is called here: the one queued by the worker's `finished` would
+    only run once the GUI thread is free again.
+    """
+    thread.quit()
+    thread.wait()
+
+
+def start_worker(worker: QObject, parent: QObject) -> QThread:
+    """
+    Run `worker.run` in a new thread owned by `parent`.
+    The thread quits and both objects are released once the worker is done.
+    """
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    worker.finished.connect(thread.quit)
+    worker.failed.connect(thread.quit)
+    thread.finished.connect(worker.deleteLater)
+    thread.finished.connect(thread.deleteLater)
+    thread.start()
+    return thread
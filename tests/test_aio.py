@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from pastro.core.aio import AsyncOrganizer
+from pastro.core.classifier import AutoClassifier
+
+
+@pytest.fixture
+def classifier():
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+    return classifier
+
+
+def make_tree(root):
+    for folder in ("", "a", "a/b", "c"):
+        (root / folder).mkdir(parents=True, exist_ok=True)
+        (root / folder / "foto.jpg").write_bytes(b"x")
+        (root / folder / "nota.txt").write_bytes(b"y")
+
+
+def test_scan(tmp_path, classifier):
+    make_tree(tmp_path)
+    with AsyncOrganizer(classifier, concurrency=3, max_depth=None) as organizer:
+        table = asyncio.run(organizer.scan(tmp_path))
+    assert len(table) == 8
+    assert {category: len(paths) for category, paths in table.classification().items() if paths} == {
+        "Imagens": 4, "Documentos": 4,
+    }
+
+
+@pytest.mark.parametrize("concurrency", [1, 4])
+def test_scan_error_is_raised(tmp_path, classifier, monkeypatch, concurrency):
+    make_tree(tmp_path)
+
+    def classify(name):
+        if name == "nota.txt":
+            raise RuntimeError("falha ao classificar")
+        return "Imagens"
+
+    monkeypatch.setattr(classifier, "get_category_for_name", classify)
+    with AsyncOrganizer(classifier, concurrency=concurrency, max_depth=None) as organizer:
+        with pytest.raises(RuntimeError, match="falha ao classificar"):
+            asyncio.run(asyncio.wait_for(organizer.scan(tmp_path), 10))
@@ -0,0 +1,174 @@
+import io
+import os
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from pastro.core.archives import ArchiveInspector, extract_archive, list_archive
+from pastro.core.classifier import AutoClassifier
+from pastro.core.filetable import FileTable
+
+
+@pytest.fixture
+def classify():
+    classifier = AutoClassifier()
+    classifier.load_default_categories()
+    return classifier.get_category_for_name
+
+
+def write_zip(path: Path, members):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def write_tar(path: Path, members, mode="w"):
+    with tarfile.open(path, mode) as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+PHOTOS = {"fotos/praia.jpg": b"j" * 4000, "fotos/campo.png": b"p" * 3000, "leia-me.txt": b"oi"}
+DOCUMENTS = {"contrato.pdf": b"d" * 5000, "notas/ata.docx": b"x" * 2000}
+
+
+def test_zip_listed_by_extension(tmp_path, classify):
+    listing = list_archive(write_zip(tmp_path / "fotos.zip", PHOTOS))
+    assert listing.extensions == {".jpg": (1, 4000), ".png": (1, 3000), ".txt": (1, 2)}
+    assert listing.complete
+    assert listing.dominant(classify) == "Imagens"
+
+
+@pytest.mark.parametrize("name, mode", [("docs.tar", "w"), ("docs.tar.gz", "w:gz")])
+def test_tar_listed_by_extension(tmp_path, classify, name, mode):
+    listing = list_archive(write_tar(tmp_path / name, DOCUMENTS, mode))
+    assert listing.members == 2
+    assert listing.dominant(classify) == "Documentos"
+
+
+def test_mixed_archive_has_no_dominant_category(tmp_path, classify):
+    listing = list_archive(write_zip(tmp_path / "misto.zip", {"a.jpg": b"1" * 100, "b.pdf": b"2" * 100}))
+    assert listing.dominant(classify) is None
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "falso.zip"
+    path.write_bytes(b"nada aqui")
+    assert list_archive(path) is None
+    with pytest.raises(ValueError):
+        extract_archive(path, str, tmp_path)
+
+
+def test_member_cap(tmp_path):
+    members = {f"{number}.jpg": b"" for number in range(20)}
+    listing = list_archive(write_zip(tmp_path / "muitos.zip", members), max_members=5)
+    assert listing.members == 5
+    assert not listing.complete
+
+
+def test_tar_ending_with_a_zip_is_a_tar(tmp_path, classify):
+    photos = write_zip(tmp_path / "pics.zip", {"a.jpg": b"a" * 10, "b.jpg": b"b" * 10})
+    members = dict(DOCUMENTS, **{"pics.zip": photos.read_bytes()})
+    archive = write_tar(tmp_path / "pacote.tar", members)
+    listing = list_archive(archive)
+    assert set(listing.extensions) == {".pdf", ".docx", ".zip"}
+    assert listing.dominant(classify) == "Documentos"
+
+    target = tmp_path / "destino"
+    report = extract_archive(archive, classify, target, remove=True)
+    assert sorted(member.target.name for member in report.extracted) == ["ata.docx", "contrato.pdf", "pics.zip"]
+    assert (target / "Documentos" / "contrato.pdf").read_bytes() == DOCUMENTS["contrato.pdf"]
+    assert report.removed and not archive.exists()
+
+
+@pytest.mark.parametrize("prefix, is_zip", [(b"MZ" + b"\0" * 62, True), (b"texto antes do zip\n", False)])
+def test_zip_after_other_data(tmp_path, prefix, is_zip):
+    data = write_zip(tmp_path / "fotos.zip", PHOTOS).read_bytes()
+    path = tmp_path / "instalador.exe"
+    path.write_bytes(prefix + data)
+    listing = list_archive(path)
+    assert (listing is not None and listing.members == 3) == is_zip
+
+
+def test_inspector_reclassifies_archives(tmp_path, classify):
+    table = FileTable(["Compactados"])
+    for path in (
+        write_zip(tmp_path / "fotos.zip", PHOTOS),
+        write_tar(tmp_path / "docs.tar.gz", DOCUMENTS, "w:gz"),
+        write_zip(tmp_path / "misto.zip", {"a.jpg": b"1", "b.pdf": b"2"}),
+    ):
+        table.add_path(path, "Compactados")
+    with ArchiveInspector(processes=1) as inspector:
+        assert inspector.reclassify_table(table, classify) == 2
+    categories = {Path(path).name: category for category, paths in table.classification().items() for path in paths}
+    assert categories == {"fotos.zip": "Imagens", "docs.tar.gz": "Documentos", "misto.zip": "Compactados"}
+
+
+def test_extract_into_categories(tmp_path, classify):
+    archive = write_zip(tmp_path / "fotos.zip", PHOTOS)
+    target = tmp_path / "destino"
+    (target / "Imagens").mkdir(parents=True)
+    (target / "Imagens" / "praia.jpg").write_bytes(b"antiga")
+    report = extract_archive(archive, classify, target)
+    assert not report.failures and not report.removed
+    assert (target / "Imagens" / "praia.jpg").read_bytes() == b"antiga"
+    assert (target / "Imagens" / "praia (1).jpg").read_bytes() == PHOTOS["fotos/praia.jpg"]
+    assert (target / "Imagens" / "campo.png").exists()
+    assert (target / "Documentos" / "leia-me.txt").read_bytes() == b"oi"
+    assert not list(target.rglob("*.pastro-part"))
+    assert archive.exists()
+
+
+def test_zeroed_dates_and_foreign_partial_files(tmp_path, classify):
+    path = tmp_path / "datas.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr(zipfile.ZipInfo("sem-data.pdf", (1980, 0, 0, 0, 0, 0)), b"pdf")
+        archive.writestr("ocupado.pdf", b"novo")
+    target = tmp_path / "destino"
+    foreign = target / "Documentos" / "ocupado.pdf.pastro-part"
+    foreign.parent.mkdir(parents=True)
+    foreign.write_bytes(b"de outra copia")
+
+    report = extract_archive(path, classify, target, remove=True)
+    assert [member.target.name for member in report.extracted] == ["sem-data.pdf"]
+    assert [member.member for member in report.failures] == ["ocupado.pdf"]
+    assert foreign.read_bytes() == b"de outra copia"
+    assert not report.removed and path.exists()
+
+
+def test_tar_hard_links_are_extracted(tmp_path, classify):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "b.txt").write_bytes(b"mesmo conteudo")
+    os.link(source / "b.txt", source / "a.txt")
+    archive = tmp_path / "t.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(source, "src")
+    assert any(member.islnk() for member in tarfile.open(archive).getmembers())
+
+    target = tmp_path / "destino"
+    report = extract_archive(archive, classify, target, remove=True)
+    assert not report.failures
+    assert sorted(path.name for path in (target / "Documentos").iterdir()) == ["a.txt", "b.txt"]
+    assert (target / "Documentos" / "a.txt").read_bytes() == b"mesmo conteudo"
+    assert report.removed
+
+
+def test_tar_symlinks_keep_the_archive(tmp_path, classify):
+    source = tmp_path / "src"
+    source.mkdir()
+    (source / "b.txt").write_bytes(b"dados")
+    os.symlink("b.txt", source / "atalho.txt")
+    archive = tmp_path / "t.tar"
+    with tarfile.open(archive, "w") as tar:
+        tar.add(source, "src")
+
+    report = extract_archive(archive, classify, tmp_path / "destino", remove=True)
+    assert [member.member for member in report.failures] == ["src/atalho.txt"]
+    assert not report.removed and archive.exists()
@@ -0,0 +1,95 @@
+"""
+Differential test of the compiled rules in ``src/auto_classifier.py`` against
+the original category-by-category implementation, kept here as the oracle.
+"""
+
+import copy
+import mimetypes
+import random
+import re
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from auto_classifier import AutoClassifier
+
+
+def reference_classify(categories: Dict[str, Dict], file_path: Path) -> str:
+    """Original `classify_file`, kept verbatim as the oracle."""
+    file_ext = file_path.suffix.lower()
+    file_name = file_path.name.lower()
+
+    for category, rules in categories.items():
+        if file_ext in rules["extensions"]:
+            return category
+        for pattern in rules["patterns"]:
+            if re.search(pattern, file_name):
+                return category
+
+    mime_type, _ = mimetypes.guess_type(file_path)
+    if mime_type:
+        if mime_type.startswith("image/"):
+            return "Imagens"
+        elif mime_type.startswith("video/"):
+            return "Vídeos"
+        elif mime_type.startswith("audio/"):
+            return "Áudio"
+        elif mime_type.startswith("text/"):
+            return "Documentos"
+        elif mime_type.startswith("application/"):
+            if "compressed" in mime_type or "zip" in mime_type:
+                return "Compactados"
+            return "Documentos"
+    return "Outros"
+
+
+def rule_sets() -> Dict[str, Dict[str, Dict]]:
+    """Default rules plus variants exercising pattern precedence and the regex fallback."""
+    default = AutoClassifier().categories
+
+    early_patterns = copy.deepcopy(default)
+    early_patterns["Imagens"]["patterns"] = [r"^img[-_]\d+", r"screenshot"]
+    early_patterns["Códigos"]["patterns"] = [r"\.min\.", r"^setup"]
+
+    with_groups = copy.deepcopy(early_patterns)
+    with_groups["Vídeos"]["patterns"] = [r"(clip|movie)_(\d)\2"]
+
+    return {"padrão": default, "padrões antecipados": early_patterns, "com grupos": with_groups}
+
+
+def generate_names(count: int, seed: int) -> List[str]:
+    """Reproducible names mixing known, unknown, MIME-only and odd suffixes."""
+    rng = random.Random(seed)
+    stems = ["file", "download_12", "Download_7", "IMG_2024", "img-33", "Screenshot 1",
+             "setup", "app.min", "clip_11", "movie_23", ".hidden", "report.final", "a.", ""]
+    suffixes = [".jpg", ".JPG", ".png", ".pdf", ".txt", ".mp4", ".mp3", ".zip", ".tar.gz",
+                ".TAR.GZ", ".tgz", ".svgz", ".json", ".xml", ".flac", ".part", ".crdownload",
+                ".py", ".bak", ".unknown", ".gz", ".Z", ".bz2", ".", "", ".7z", ".webm", ".m3u"]
+    names = []
+    for number in range(count):
+        name = f"{rng.choice(stems)}{rng.choice(suffixes)}"
+        if rng.random() < 0.3:
+            name = f"{name}{rng.choice(suffixes)}"
+        names.append(name or f"empty{number}")
+    return names
+
+
+@pytest.mark.parametrize("label", list(rule_sets()))
+def test_compiled_rules_match_the_original(label):
+    categories = rule_sets()[label]
+    classifier = AutoClassifier()
+    classifier.categories = categories
+    mismatches = [
+        (path.name, expected, actual)
+        for path in map(Path, generate_names(20_000, 42))
+        if (expected := reference_classify(categories, path)) != (actual := classifier.classify_file(path))
+    ]
+    assert mismatches[:10] == []
+
+
+def test_new_categories_are_compiled_again():
+    classifier = AutoClassifier()
+    assert classifier.classify_file(Path("img-01.bmp")) == "Imagens"
+    classifier.categories = {"Capturas": {"extensions": set(), "patterns": [r"^img-\d+"]}, **classifier.categories}
+    assert classifier.classify_file(Path("img-01.bmp")) == "Capturas"
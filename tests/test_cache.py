@@ -0,0 +1,88 @@
+import json
+import os
+import time
+
+from pastro.core.cache import KIND_FILE, CachedEntry, CachedStat, CachingScanner, ScanCache
+from pastro.core.classifier import AutoClassifier
+
+RULES = {"rules": [
+    {"category": "Grandes", "extensions": [".bin"], "min_size": "1 KB", "priority": 10},
+    {"category": "Pequenos", "extensions": [".bin"]},
+]}
+
+
+def age(folder, seconds=60):
+    """Move a folder's mtime back, so its listing gets cached."""
+    past = time.time() - seconds
+    os.utime(folder, (past, past))
+
+
+def scan_table(tmp_path, classifier, root):
+    cache = ScanCache(tmp_path / "cache.sqlite3")
+    scanner = CachingScanner(cache, classifier.get_category_for_name, classifier.config_hash())
+    try:
+        return scanner, classifier.classify_table(scanner, root)
+    finally:
+        cache.close()
+
+
+def categories(table):
+    return {os.path.basename(path): category for category, paths in table.classification().items() for path in paths}
+
+
+def test_files_edited_in_place_are_stat_again(tmp_path):
+    rules = tmp_path / "regras.json"
+    rules.write_text(json.dumps(RULES))
+    classifier = AutoClassifier()
+    classifier.load_rules(rules)
+    root = tmp_path / "pasta"
+    root.mkdir()
+    (root / "dados.bin").write_bytes(b"pouco")
+    age(root)
+
+    scanner, table = scan_table(tmp_path, classifier, root)
+    assert scanner.cache_misses == 1
+    assert categories(table) == {"dados.bin": "Pequenos"}
+
+    # Editing a file in place leaves its folder's mtime alone
+    with open(root / "dados.bin", "ab") as file:
+        file.write(b"x" * 4096)
+    scanner, table = scan_table(tmp_path, classifier, root)
+    assert scanner.cache_hits == 1
+    assert categories(table) == {"dados.bin": "Grandes"}
+    assert list(table.sizes) == [4101]
+
+
+def test_unchanged_folders_fill_the_table_from_the_cache(tmp_path, monkeypatch):
+    classifier = AutoClassifier()
+    root = tmp_path / "pasta"
+    root.mkdir()
+    (root / "nota.txt").write_bytes(b"texto")
+    age(root)
+    scan_table(tmp_path, classifier, root)
+
+    stated = []
+    real_stat = os.stat
+
+    def stat(path, *args, **kwargs):
+        stated.append(os.fspath(path))
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", stat)
+    scanner, table = scan_table(tmp_path, classifier, root)
+    assert scanner.cache_hits == 1
+    assert list(table.sizes) == [5] and table.mtimes[0] == real_stat(root / "nota.txt").st_mtime_ns
+    assert str(root / "nota.txt") not in stated
+
+
+def test_expired_cached_entries_report_current_sizes(tmp_path):
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"antes")
+    stat = os.stat(path)
+    entry = CachedEntry(str(tmp_path), "a.txt", KIND_FILE, CachedStat(5, stat.st_mtime_ns, stat.st_ino, stat.st_dev), None)
+    path.write_bytes(b"depois de editar")
+    assert entry.stat().st_size == 5
+    entry.expire()
+    assert entry.stat().st_size == 16
+    assert entry.inode() == stat.st_ino
+
@@ -0,0 +1,35 @@
+import json
+import os
+
+from pastro import cli
+from pastro.cli import main
+
+
+def run(capsys, *argv):
+    status = main([str(arg) for arg in argv])
+    out, err = capsys.readouterr()
+    return status, [json.loads(line) for line in out.splitlines()], err
+
+
+def test_scan(tmp_path, capsys):
+    (tmp_path / "foto.jpg").write_bytes(b"12345")
+    status, records, _ = run(capsys, "scan", tmp_path, "--no-cache")
+    assert status == 0
+    assert records == [{"path": str(tmp_path / "foto.jpg"), "category": "Imagens", "size": 5, "depth": 0}]
+
+
+def test_scan_warns_about_files_it_cannot_stat(tmp_path, capsys, monkeypatch):
+    (tmp_path / "foto.jpg").write_bytes(b"12345")
+    listed = cli.scan_entries
+
+    def vanishing(args, classifier):
+        # Each file is deleted between its listing and its stat
+        for entry in listed(args, classifier):
+            os.unlink(entry.path)
+            yield entry
+
+    monkeypatch.setattr(cli, "scan_entries", vanishing)
+    status, records, err = run(capsys, "scan", tmp_path, "--no-cache")
+    assert status == 0
+    assert [record["size"] for record in records] == [None]
+    assert "aviso:" in err
@@ -0,0 +1,47 @@
+import os
+import time
+
+from pastro.core.dedup import find_duplicates, find_table_duplicates
+from pastro.core.filetable import FileTable
+
+
+def write(folder, contents):
+    paths = []
+    for name, data in contents.items():
+        path = folder / name
+        path.write_bytes(data)
+        paths.append(path)
+    return paths
+
+
+def test_find_duplicates(tmp_path):
+    paths = write(tmp_path, {"a.txt": b"igual", "b.txt": b"igual", "c.txt": b"outro", "vazio.txt": b""})
+    os.utime(paths[1], (time.time() - 100, time.time() - 100))
+    groups = find_duplicates(paths)
+    assert len(groups) == 1
+    assert groups[0].original == paths[1] and groups[0].duplicates == [paths[0]]
+
+
+def test_table_duplicates_use_current_sizes(tmp_path):
+    paths = write(tmp_path, {"a.txt": b"igual", "b.txt": b"igual", "c.txt": b"maior igual"})
+    table = FileTable(["Documentos"])
+    for path in paths:
+        table.add_entry(_Entry(path), "Documentos")
+    # Both grow after the scan, to the size of the third file, whose stored size was unique
+    for path in paths[:2]:
+        path.write_bytes(b"maior igual")
+    groups = find_table_duplicates(table)
+    assert len(groups) == 1 and groups[0].size == 11
+    assert sorted([groups[0].original] + groups[0].duplicates) == paths
+
+
+class _Entry:
+    """A DirEntry-like file stat'ed when the table is built."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.name = path.name
+        self._stat = os.stat(path)
+
+    def stat(self):
+        return self._stat
@@ -0,0 +1,25 @@
+import os
+from types import SimpleNamespace
+
+from pastro.core.filetable import FileTable
+
+
+class _Entry:
+    def __init__(self, path, size=0):
+        self.path = path
+        self.name = os.path.basename(path)
+        self._stat = SimpleNamespace(st_size=size, st_mtime_ns=0)
+
+    def stat(self):
+        return self._stat
+
+
+def test_entries_keep_their_folder():
+    root_file = os.path.join(os.sep, "notas.txt")
+    nested_file = os.path.join(os.sep, "pasta", "nota.txt")
+    table = FileTable(["Documentos"])
+    rows = [table.add_entry(_Entry(root_file, 5), "Documentos"), table.add_entry(_Entry(nested_file), "Documentos")]
+    # A file at the root keeps the separator as its folder, not an empty string
+    assert [table.folder(row) for row in rows] == [os.sep, os.path.dirname(nested_file)]
+    assert [table.path(row) for row in rows] == [root_file, nested_file]
+    assert table.sizes[rows[0]] == 5
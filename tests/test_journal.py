@@ -0,0 +1,123 @@
+import json
+import os
+from pathlib import Path
+
+from pastro.cli import main
+from pastro.core.journal import (
+    STATUS_FINISHED, STATUS_INTERRUPTED, STATUS_UNDONE, MoveJournal, latest_journal, list_journals,
+)
+from pastro.core.mover import MoveExecutor, MoveOperation
+
+
+def make_files(folder: Path, names):
+    folder.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        (folder / name).write_text(name)
+
+
+def operations_for(root: Path, names):
+    return [MoveOperation(root / name, root / "Documentos" / name, "Documentos") for name in names]
+
+
+def run_cli(capsys, *argv):
+    status = main([str(arg) for arg in argv])
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    return status, records
+
+
+def test_apply_then_undo_from_another_folder(tmp_path, monkeypatch, capsys):
+    root = tmp_path / "pasta"
+    make_files(root, ["a.txt", "b.pdf"])
+    monkeypatch.chdir(tmp_path)
+    status, records = run_cli(capsys, "apply", "pasta", "--no-cache")
+    assert status == 0
+    assert (root / "Documentos" / "a.txt").exists()
+    assert all(Path(record["source"]).is_absolute() for record in records[:-1])
+
+    elsewhere = tmp_path / "outra"
+    elsewhere.mkdir()
+    monkeypatch.chdir(elsewhere)
+    status, records = run_cli(capsys, "undo")
+    assert status == 0
+    assert records[-1]["summary"]["moved"] == 2
+    assert sorted(path.name for path in root.iterdir()) == ["a.txt", "b.pdf"]
+    assert MoveJournal(list_journals()[-1]).state().status == STATUS_UNDONE
+
+
+def test_undo_matching_nothing_keeps_run_undoable(tmp_path):
+    root = tmp_path / "pasta"
+    make_files(root, ["a.txt"])
+    journal = MoveJournal.create()
+    journal.start(operations_for(root, ["a.txt"]), root)
+    journal.execute(MoveExecutor(), operations_for(root, ["a.txt"]))
+
+    # Paths of the plan as seen from another folder, had they been relative
+    reversal = [MoveOperation(Path("Documentos/a.txt"), Path("a.txt"), "Documentos")]
+    MoveJournal(journal.path).execute(MoveExecutor(), reversal, undo=True)
+    assert MoveJournal(journal.path).state().status == STATUS_FINISHED
+
+    journal = MoveJournal(journal.path)
+    operations, conflicts = journal.undo_operations()
+    assert [operation.target for operation in operations] == [root / "a.txt"]
+    journal.execute(MoveExecutor(), [], undo=True)
+    assert MoveJournal(journal.path).state().status == STATUS_FINISHED
+
+
+def test_resume_interrupted_run(tmp_path):
+    root = tmp_path / "pasta"
+    names = ["a.txt", "b.txt", "c.txt"]
+    make_files(root, names)
+    operations = operations_for(root, names)
+    journal = MoveJournal.create()
+    journal.start(operations, root)
+    # Crash after the first move: recorded, but the run never ended
+    on_result = journal.recorder()
+    MoveExecutor().execute(operations[:1], on_result)
+    journal.close()
+    # A move done but not recorded before the crash
+    os.rename(operations[1].source, operations[1].target)
+
+    journal = latest_journal((STATUS_INTERRUPTED,))
+    assert journal is not None
+    remaining = journal.resume_operations()
+    assert remaining == operations[2:]
+    report = journal.execute(MoveExecutor(), remaining)
+    assert report.moved_files == 1
+    state = MoveJournal(journal.path).state()
+    assert state.status == STATUS_FINISHED
+    assert state.done == {0, 1, 2}
+
+
+def test_cancelled_run_is_not_resumed(tmp_path):
+    root = tmp_path / "pasta"
+    make_files(root, ["a.txt", "b.txt"])
+    operations = operations_for(root, ["a.txt", "b.txt"])
+    journal = MoveJournal.create()
+    journal.start(operations, root)
+    executor = MoveExecutor()
+    executor.cancel()
+    assert journal.execute(executor, operations).cancelled
+    assert latest_journal((STATUS_INTERRUPTED,)) is None
+    assert latest_journal((STATUS_FINISHED,)).path == journal.path
+
+
+def test_declined_resume_is_not_asked_again(tmp_path):
+    root = tmp_path / "pasta"
+    make_files(root, ["a.txt"])
+    journal = MoveJournal.create()
+    journal.start(operations_for(root, ["a.txt"]), root)
+    journal.close()
+    journal = latest_journal((STATUS_INTERRUPTED,))
+    journal.abandon()
+    journal.close()
+    assert latest_journal((STATUS_INTERRUPTED,)) is None
+
+
+def test_journal_names_sort_by_creation(tmp_path):
+    created = []
+    for _ in range(5):
+        journal = MoveJournal.create(tmp_path)
+        journal.start([], None)
+        journal.close()
+        created.append(journal.path)
+    assert list_journals(tmp_path) == created
@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pytest
+
+from pastro.core.filetable import FileTable
+from pastro.core.planner import MovePlan, plan_targets
+
+
+def make(root: Path, *names: str):
+    paths = []
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+        paths.append(path)
+    return paths
+
+
+def targets(plan):
+    return {str(operation.source): operation.target.name for operation in plan}
+
+
+def test_same_name_from_two_folders(tmp_path):
+    first, second = make(tmp_path, "a/foto.jpg", "b/foto.jpg")
+    # The first in path order keeps the name, whatever the input order
+    for files in ([first, second], [second, first]):
+        plan = plan_targets({"Imagens": files}, tmp_path, case_insensitive=False)
+        assert targets(plan) == {str(first): "foto.jpg", str(second): "foto (1).jpg"}
+        assert plan.renamed == {str(second): "foto (1).jpg"}
+
+
+def test_names_taken_in_the_target_folder(tmp_path):
+    make(tmp_path, "Imagens/foto.jpg", "Imagens/foto (1).jpg")
+    first, second = make(tmp_path, "a/foto.jpg", "b/foto.jpg")
+    plan = plan_targets({"Imagens": [first, second]}, tmp_path, case_insensitive=False)
+    assert targets(plan) == {str(first): "foto (2).jpg", str(second): "foto (3).jpg"}
+
+
+def test_compound_suffixes(tmp_path):
+    make(tmp_path, "Compactados/backup.tar.gz")
+    (source,) = make(tmp_path, "a/backup.tar.gz")
+    plan = plan_targets({"Compactados": [source]}, tmp_path, case_insensitive=False)
+    assert targets(plan) == {str(source): "backup (1).tar.gz"}
+
+
+@pytest.mark.parametrize("case_insensitive, renamed", [(True, 1), (False, 0)])
+def test_case_of_names(tmp_path, case_insensitive, renamed):
+    files = make(tmp_path, "a/Foto.JPG", "b/foto.jpg")
+    plan = plan_targets({"Imagens": files}, tmp_path, case_insensitive=case_insensitive)
+    assert len(plan.renamed) == renamed
+
+
+def test_files_already_in_place_are_skipped(tmp_path):
+    in_place, other = make(tmp_path, "Imagens/foto.jpg", "a/foto.jpg")
+    plan = plan_targets({"Imagens": [in_place, other]}, tmp_path, case_insensitive=False)
+    assert targets(plan) == {str(other): "foto (1).jpg"}
+
+
+def test_table_groups_plan_like_paths(tmp_path):
+    files = make(tmp_path, "a/foto.jpg", "b/foto.jpg", "c/nota.txt")
+    table = FileTable(["Imagens", "Documentos"])
+    for path in files:
+        table.add_path(path, "Documentos" if path.suffix == ".txt" else "Imagens")
+    from_table = plan_targets(table.classification(), tmp_path, case_insensitive=False)
+    from_paths = plan_targets({"Imagens": files[:2], "Documentos": files[2:]}, tmp_path, case_insensitive=False)
+    assert list(from_table) == list(from_paths)
+    # Plans serialize with the renames
+    assert list(MovePlan.from_dict(from_table.to_dict())) == list(from_paths)
@@ -0,0 +1,107 @@
+import json
+import os
+import time
+
+import pytest
+
+from pastro.core.classifier import AutoClassifier
+from pastro.core.rules import PathEntry, Rule, RuleMatcher, load_rules_file, parse_size
+
+
+def load(tmp_path, rules, name="rules.json"):
+    path = tmp_path / name
+    if name.endswith(".json"):
+        path.write_text(json.dumps({"rules": rules}), encoding="utf-8")
+    else:
+        path.write_text(rules, encoding="utf-8")
+    classifier = AutoClassifier()
+    classifier.load_rules(path)
+    return classifier
+
+
+def test_rules_apply_in_file_order(tmp_path):
+    classifier = load(tmp_path, [
+        {"category": "Faturas", "name": "fatura", "extensions": [".pdf"]},
+        {"category": "Documentos", "extensions": [".pdf"]},
+    ])
+    assert classifier.get_category_for_name("fatura.pdf") == "Faturas"
+    assert classifier.get_category_for_name("contrato.pdf") == "Documentos"
+
+    classifier = load(tmp_path, [
+        {"category": "Documentos", "extensions": [".pdf"]},
+        {"category": "Faturas", "name": "fatura", "extensions": [".pdf"]},
+    ])
+    assert classifier.get_category_for_name("fatura.pdf") == "Documentos"
+
+
+def test_priority_comes_before_file_order(tmp_path):
+    classifier = load(tmp_path, [
+        {"category": "Documentos", "extensions": [".pdf"]},
+        {"category": "Faturas", "name": "fatura", "extensions": [".pdf"], "priority": 5},
+    ])
+    assert classifier.get_category_for_name("fatura.pdf") == "Faturas"
+
+
+@pytest.mark.parametrize("name", ["salvas.json", "salvas.toml"])
+def test_saving_keeps_the_order(tmp_path, name):
+    rules = [
+        Rule("Faturas", extensions=frozenset({".pdf"}), name="fatura"),
+        Rule("Documentos", extensions=frozenset({".pdf", ".txt"})),
+        Rule("Grandes", min_size=parse_size("1 GB")),
+    ]
+    classifier = load(tmp_path, [rule.to_dict() for rule in rules])
+    path = tmp_path / name
+    classifier.save_rules(path)
+    assert load_rules_file(path) == rules
+
+    reloaded = AutoClassifier()
+    reloaded.load_rules(path)
+    assert reloaded.ordered_rules() == rules
+    assert reloaded.config_hash() == classifier.config_hash()
+
+
+def test_toml_rules(tmp_path):
+    classifier = load(tmp_path, """
+[[rules]]
+category = "Imagens"
+extensions = ["JPG", ".png"]
+
+[[rules]]
+category = "Vídeos grandes"
+extensions = [".mp4"]
+min_size = "1 KB"
+priority = 10
+""", "rules.toml")
+    assert classifier.get_category_for_name("foto.jpg") == "Imagens"
+    assert classifier.get_category_for_name("nota.txt") == "Outros"
+    assert classifier.needs_entry
+
+
+def test_matcher_predicates(tmp_path):
+    old = tmp_path / "Downloads" / "antigo.mp4"
+    old.parent.mkdir()
+    old.write_bytes(b"x" * 2048)
+    past = time.time() - 40 * 24 * 60 * 60
+    os.utime(old, (past, past))
+    small = tmp_path / "pequeno.mp4"
+    small.write_bytes(b"x")
+    matcher = RuleMatcher([
+        Rule("Grandes", extensions=frozenset({".mp4"}), min_size=1024, max_age_days=30),
+        Rule("Antigos", min_age_days=30, parent="*/Downloads"),
+        Rule("Vídeos", extensions=frozenset({".mp4"})),
+    ])
+    assert matcher.classify(PathEntry(old)) == "Antigos"
+    assert matcher.classify(PathEntry(small)) == "Vídeos"
+    assert matcher.classify_name("filme.mp4") == "Vídeos"
+    assert matcher.classify_name("nota.txt") == "Outros"
+
+
+@pytest.mark.parametrize("text, size", [("10", 10), ("1 KB", 1024), ("1.5mb", 1572864), (2048, 2048)])
+def test_parse_size(text, size):
+    assert parse_size(text) == size
+
+
+def test_invalid_rules(tmp_path):
+    for rule in ({"category": "X", "cor": "azul"}, {"extensions": [".pdf"]}, {"category": "X", "name": "("}):
+        with pytest.raises(ValueError):
+            load(tmp_path, [rule])
@@ -0,0 +1,15 @@
+import threading
+
+from pastro.core.scanner import Scanner
+
+
+def test_io_permit_is_released_while_files_are_consumed(tmp_path):
+    for name in ("a.txt", "b.txt"):
+        (tmp_path / name).write_bytes(b"x")
+    permit = threading.Semaphore(1)
+    walk = Scanner(io_limit=permit).walk(tmp_path)
+    next(walk)
+    # Another scanner sharing the permit can list while this walk is paused
+    assert permit.acquire(blocking=False)
+    permit.release()
+    assert len(list(walk)) == 1
@@ -0,0 +1,47 @@
+import struct
+
+import pytest
+
+from pastro.core.sniffer import ContentSniffer
+
+
+def bmp_header(info_size=40):
+    return b"BM" + struct.pack("<IHHI", 70, 0, 0, 54) + struct.pack("<I", info_size) + b"\0" * 52
+
+
+def pe_header(offset=0x80):
+    header = bytearray(offset + 64)
+    header[:2] = b"MZ"
+    struct.pack_into("<I", header, 0x3C, offset)
+    header[offset:offset + 4] = b"PE\0\0"
+    return bytes(header)
+
+
+@pytest.mark.parametrize("data, extension", [
+    (b"\xff\xd8\xff\xe0" + b"\0" * 20, ".jpg"),
+    (b"%PDF-1.7\n", ".pdf"),
+    (bmp_header(), ".bmp"),
+    (bmp_header(124), ".bmp"),
+    (pe_header(), ".exe"),
+    (b"#!/usr/bin/env python3\nprint()\n", ".py"),
+    (b"RIFF\0\0\0\0WEBPVP8 ", ".webp"),
+])
+def test_known_formats(tmp_path, data, extension):
+    path = tmp_path / "arquivo"
+    path.write_bytes(data)
+    assert ContentSniffer().sniff(path) == extension
+
+
+@pytest.mark.parametrize("data", [
+    b"BMW notes\n",
+    b"BM" + b"\0" * 8 + b"text of some length here\n",
+    bmp_header(99),
+    b"MZ mystery\n",
+    b"MZ" + b" " * 200,
+    pe_header(4000),
+    b"",
+])
+def test_text_is_not_taken_for_binary_formats(tmp_path, data):
+    path = tmp_path / "notas"
+    path.write_bytes(data)
+    assert ContentSniffer().sniff(path) is None
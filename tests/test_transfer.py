@@ -0,0 +1,77 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from pastro.core import transfer
+from pastro.core.mover import MoveExecutor, MoveOperation
+from pastro.core.transfer import METHOD_BUFFERED, METHOD_VERIFIED, PARTIAL_SUFFIX, move_file
+
+SHM = Path("/dev/shm")
+
+
+@pytest.fixture
+def other_device(tmp_path):
+    """A folder on another filesystem than `tmp_path`."""
+    if not SHM.is_dir() or os.stat(SHM).st_dev == os.stat(tmp_path).st_dev:
+        pytest.skip("sem outro sistema de arquivos para testar")
+    folder = SHM / f"pastro-teste-{os.getpid()}-{tmp_path.name}"
+    folder.mkdir()
+    yield folder
+    shutil.rmtree(folder)
+
+
+def make_source(folder: Path, size: int = 3 * 1024 * 1024 + 17) -> Path:
+    source = folder / "dados.bin"
+    source.write_bytes(os.urandom(size))
+    os.utime(source, (1_600_000_000, 1_600_000_000))
+    return source
+
+
+@pytest.mark.parametrize("verify", [False, True])
+def test_move_across_filesystems(tmp_path, other_device, verify):
+    source = make_source(tmp_path)
+    data = source.read_bytes()
+    target = other_device / "dados.bin"
+    method = move_file(source, target, verify)
+    assert (method == METHOD_VERIFIED) == verify
+    assert not source.exists()
+    assert target.read_bytes() == data
+    assert target.stat().st_mtime == 1_600_000_000
+    assert not (other_device / ("dados.bin" + PARTIAL_SUFFIX)).exists()
+
+
+@pytest.mark.parametrize("verify", [False, True])
+def test_executor_moves_across_filesystems(tmp_path, other_device, verify):
+    source = make_source(tmp_path, 1000)
+    target = other_device / "Outros" / "dados.bin"
+    report = MoveExecutor(verify=verify).execute([MoveOperation(source, target, "Outros")])
+    assert report.moved_files == 1 and not report.failures
+    assert not source.exists() and target.stat().st_size == 1000
+
+
+def test_kernel_copy_of_nothing_falls_back(tmp_path, other_device, monkeypatch):
+    monkeypatch.setattr(transfer, "_copy_file_range", lambda source_fd, target_fd, count: 0)
+    monkeypatch.setattr(transfer, "_sendfile", lambda source_fd, target_fd, count: 0)
+    source = make_source(tmp_path)
+    data = source.read_bytes()
+    assert move_file(source, other_device / "dados.bin") == METHOD_BUFFERED
+    assert (other_device / "dados.bin").read_bytes() == data
+
+
+def test_short_copy_keeps_the_source(tmp_path, other_device, monkeypatch):
+    calls = []
+
+    def short_copy(source_fd, target_fd, count):
+        # Data stops coming after the first call, as if the source were cut short
+        calls.append(count)
+        return os.sendfile(target_fd, source_fd, None, 1000) if len(calls) == 1 else 0
+
+    monkeypatch.setattr(transfer, "_copy_file_range", short_copy)
+    monkeypatch.setattr(transfer, "_sendfile", short_copy)
+    source = make_source(tmp_path)
+    with pytest.raises(OSError, match="incompleta"):
+        move_file(source, other_device / "dados.bin")
+    assert source.exists()
+    assert not list(other_device.iterdir())